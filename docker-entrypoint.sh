@@ -41,6 +41,7 @@ echo ""
 echo "Starting Flask application..."
 echo "   Access: http://0.0.0.0:5000"
 echo "   Max file size: ${MAX_FILE_SIZE:-500}MB"
+echo "   Workers: ${WEB_WORKERS:-1}"
 echo ""
 
-exec python run_web.py --host 0.0.0.0 --port 5000
+exec python run_web.py --host 0.0.0.0 --port 5000 --workers "${WEB_WORKERS:-1}"
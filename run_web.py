@@ -28,6 +28,7 @@ Exemples:
   python run_web.py --port 8080               # Lance sur 0.0.0.0:8080
   python run_web.py --debug                   # Lance en mode debug
   python run_web.py --host localhost --port 8000 --debug
+  python run_web.py --workers 4               # Lance 4 processus partageant les sessions
         """
     )
     
@@ -43,6 +44,12 @@ Exemples:
         default=5000,
         help="Port d'écoute (défaut: 5000)"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Nombre de processus de service (défaut: WEB_WORKERS ou 1, nécessite gunicorn au-delà de 1)"
+    )
     parser.add_argument(
         "--debug",
         action="store_true",
@@ -64,4 +71,4 @@ Exemples:
     print()
     print("Appuyez sur CTRL+C pour arreter le serveur")
     
-    run_flask_app(host=args.host, port=args.port, debug=args.debug)
+    run_flask_app(host=args.host, port=args.port, debug=args.debug, workers=args.workers)
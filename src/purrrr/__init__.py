@@ -39,7 +39,7 @@
 - **Date Range**: Filter analysis to specific time periods
 - **Action Types**: Focus on specific operations (downloads, uploads, etc.)
 - **File Keywords**: Search for files containing specific keywords
-- **IP Filtering**: Include or exclude specific IP addresses with wildcard support
+- **IP Filtering**: Include or exclude specific IP addresses with wildcard and CIDR support
 
 ### Sign-in Analysis (from Entra ID sign-in logs)
 
@@ -63,13 +63,17 @@
 --end-date END_DATE                   end date for analysis (YYYY-MM-DD)
 --sort-by {filename,username,date}    sort results by filename, username, or date (default: date)
 --details                             show detailed file lists in operation summaries
---ips IPS                             filter by individual IPs (comma-separated, supports wildcards)
---exclude-ips IPS                     exclude specific IPs (comma-separated, supports wildcards)
+--ips IPS                             filter by individual IPs (comma-separated, wildcards or CIDR)
+--exclude-ips IPS                     exclude specific IPs (comma-separated, wildcards or CIDR)
 --do-ip-lookups                       perform IP geolocation lookups (takes a few seconds per IP)
 --timeline                            print a full timeline of file access events
 --full-urls                           print full URLs of accessed files
 --exchange                            output only Exchange activity in table format
 --export-exchange-csv OUTPUT_FILE     export Exchange activity to specified CSV file
+--stream                              summarize logs larger than memory by reading them in chunks
+--chunk-size ROWS                     rows per chunk in --stream mode (default: 100000)
+--workers N                           decode AuditData across N processes (default: 1)
+--no-cache                            always re-parse the log instead of reusing a cached copy
 ```
 
 ### Entra ID Log Analysis for Sign-In Activity
@@ -128,6 +132,23 @@ purrrr audit_log.csv --exchange
 purrrr audit_log.csv --export-exchange-csv email_activity.csv
 ```
 
+#### Large Logs
+
+```bash
+# Summarize a month-long export without loading it all into memory
+purrrr audit_log.csv --stream --chunk-size 50000
+
+# Parsed logs are cached in ~/.cache/purrrr, so repeat runs on the same file start instantly
+purrrr audit_log.csv --no-cache  # Force a fresh parse
+
+# Spread JSON decoding across 8 cores
+purrrr audit_log.csv --workers 8
+
+# Read compressed exports directly, including zips of several daily CSVs
+purrrr audit_log.csv.gz
+purrrr daily_exports.zip --stream
+```
+
 #### Sign-in Analysis
 
 ```bash
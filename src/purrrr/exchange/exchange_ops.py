@@ -5,37 +5,76 @@
 from __future__ import annotations
 
 import csv
+import io
+from collections import Counter
 from dataclasses import dataclass
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, cast
+from typing import TYPE_CHECKING, Any, ClassVar, cast
 
 from polykit.text import print_color as printc
 
-from purrrr.tools import AuditAnalyzer
+from purrrr.ingest import extract_fields, parse_audit_record
+from purrrr.tools import AuditAnalyzer, value_counts
 
 if TYPE_CHECKING:
-    from collections.abc import Sequence
+    from collections.abc import Iterable, Iterator, Sequence
     from datetime import datetime
 
     from pandas import DataFrame, Series
 
+    from purrrr.ingest.aggregates import ExchangeSummary
+
+# Exchange-specific fields extracted from AuditData
+EXCHANGE_FIELDS = ("Workload", "ResultStatus", "ExternalAccess", "ClientInfoString")
+
+# Columns of the Exchange activity CSV
+EXCHANGE_CSV_HEADERS = [
+    "Timestamp",
+    "User",
+    "Operation",
+    "Subject",
+    "Folder",
+    "Message ID",
+    "Attachments",
+    "Client IP",
+    "Client Info",
+]
+
+# Events turned into CSV rows at a time, and rows written between yields when streaming
+EXCHANGE_CSV_CHUNK_ROWS = 5000
+
 
 @dataclass
 class ExchangeOperations(AuditAnalyzer):
     """Analyze Exchange activity in the audit logs."""
 
+    required_columns: ClassVar[tuple[str, ...]] = (
+        "Operation",
+        "UserId",
+        "ClientIP",
+        *EXCHANGE_FIELDS,
+    )
+
     def process_exchange_events(self, df: DataFrame) -> DataFrame:
         """Process and format Exchange-specific events."""
-        # Filter for Exchange workload
-        exch_data = df[
-            df["AuditData"].apply(lambda x: isinstance(x, dict) and x.get("Workload") == "Exchange")
-        ]
+        # Filter for Exchange workload, using the decoded column when available
+        if "Workload" in df.columns:
+            exch_data = df[df["Workload"] == "Exchange"]
+        else:
+            exch_data = df[
+                df["AuditData"].apply(
+                    lambda x: isinstance(x, dict) and x.get("Workload") == "Exchange"
+                )
+            ]
 
         if exch_data.empty:
             return exch_data
 
         # Extract additional Exchange-specific fields
         exchange_events = exch_data.copy()
+
+        # Frames loaded from the cache keep AuditData as JSON, so decode just the Exchange rows
+        exchange_events["AuditData"] = exchange_events["AuditData"].map(parse_audit_record)
         exchange_events = self._extract_basic_fields(exchange_events)
 
         # Extract item subject and details
@@ -49,19 +88,12 @@ class ExchangeOperations(AuditAnalyzer):
         return exchange_events
 
     def _extract_basic_fields(self, exchange_events: DataFrame) -> DataFrame:
-        """Extract basic Exchange-specific fields."""
-        exchange_events["Workload"] = exchange_events["AuditData"].apply(
-            lambda x: x.get("Workload", "")
-        )
-        exchange_events["ResultStatus"] = exchange_events["AuditData"].apply(
-            lambda x: x.get("ResultStatus", "")
-        )
-        exchange_events["ExternalAccess"] = exchange_events["AuditData"].apply(
-            lambda x: x.get("ExternalAccess", False)
-        )
-        exchange_events["ClientInfoString"] = exchange_events["AuditData"].apply(
-            lambda x: x.get("ClientInfoString", "")
-        )
+        """Extract basic Exchange-specific fields not already decoded at ingest."""
+        missing = [name for name in EXCHANGE_FIELDS if name not in exchange_events.columns]
+        if missing:
+            records = exchange_events["AuditData"].tolist()
+            for name, values in extract_fields(records, missing).items():
+                exchange_events[name] = values
         return exchange_events
 
     def _extract_item_subject(self, audit_data: dict[str, Any] | None) -> str:
@@ -145,13 +177,43 @@ class ExchangeOperations(AuditAnalyzer):
         self._analyze_folder_access(events_df)
         self._analyze_email_details(events_df, show_details)
 
+    def display_summary(self, summary: ExchangeSummary) -> None:
+        """Display Exchange activity totals accumulated from a streamed log."""
+        if not summary.events:
+            return
+
+        self.out.print_header("Exchange Activity Analysis", "blue")
+        self.logger.info(
+            "Found %d Exchange event%s from %s to %s.",
+            summary.events,
+            "s" if summary.events > 1 else "",
+            summary.start.strftime("%Y-%m-%d"),
+            summary.end.strftime("%Y-%m-%d"),
+        )
+
+        printc("\nExchange Activity by User:", "yellow")
+        for user, count in summary.users.most_common():
+            printc(f"  {user} ", "cyan", end="")
+            print(f"{count} total event{'s' if count > 1 else ''}")
+
+            user_ops = [(op, n) for (u, op), n in summary.user_operations.items() if u == user]
+            for op, op_count in sorted(user_ops, key=lambda x: x[1], reverse=True):
+                print(f"    - {op}: {op_count}")
+
+        printc("\nClient Applications Used:", "yellow")
+        client_counts: Counter[str] = Counter()
+        for client_string, count in summary.client_info.items():
+            client_counts[self._extract_client(client_string)] += count
+        for client, count in client_counts.most_common():
+            print(f"  {client}: {count} event{'s' if count > 1 else ''}")
+
     def _summarize_user_activity(self, events_df: DataFrame) -> None:
         """Summarize activity by user with operation breakdowns."""
         printc("\nExchange Activity by User:", "yellow")
-        user_counts = events_df["UserId"].value_counts()
+        user_counts = value_counts(events_df["UserId"])
 
         for user, count in user_counts.items():
-            user_ops = events_df[events_df["UserId"] == user]["Operation"].value_counts()
+            user_ops = value_counts(events_df[events_df["UserId"] == user]["Operation"])
 
             printc(f"  {user} ", "cyan", end="")
             print(f"{count} total event{'s' if count > 1 else ''}")
@@ -207,13 +269,13 @@ class ExchangeOperations(AuditAnalyzer):
         if not interesting_events.empty:
             printc("\nNoteworthy Exchange Operations:", "yellow")
 
-            for op, group in interesting_events.groupby("Operation"):
+            for op, group in interesting_events.groupby("Operation", observed=True):
                 printc(
                     f"\n  {op} Operations ({len(group)} event{'s' if len(group) != 1 else ''}):",
                     "yellow",
                 )
 
-                for user, user_group in group.groupby("UserId"):
+                for user, user_group in group.groupby("UserId", observed=True):
                     printc(f"    {user} ", "cyan", end="")
                     print(f"({len(user_group)} event{'s' if len(user_group) > 1 else ''})")
 
@@ -250,9 +312,9 @@ class ExchangeOperations(AuditAnalyzer):
                 print(f"  {folder}: accessed {count} times")
 
                 # Show users accessing this folder
-                folder_users = folder_access_data[folder_access_data["Folder"] == folder][
-                    "UserId"
-                ].value_counts()
+                folder_users = value_counts(
+                    folder_access_data[folder_access_data["Folder"] == folder]["UserId"]
+                )
                 for user, user_count in folder_users.items():
                     printc(f"    - {user} ", "cyan", end="")
                     print(f"{user_count}")
@@ -669,7 +731,7 @@ class ExchangeOperations(AuditAnalyzer):
         self.out.print_header("Complete Exchange Activity Log", "blue")
 
         # Sort events by timestamp
-        events_sorted = exchange_events.sort_values("CreationDate")
+        events_sorted = exchange_events.sort_values("CreationDate", kind="stable")
 
         # Print the table header
         self._print_exchange_table_header()
@@ -1109,88 +1171,91 @@ class ExchangeOperations(AuditAnalyzer):
         )
 
         # Print operation counts
-        op_counts = events_df["Operation"].value_counts()
+        op_counts = value_counts(events_df["Operation"])
         print("\nOperation counts:")
         for op, count in op_counts.items():
             print(f"  {op}: {count}")
 
     def generate_exchange_activity_csv(self, exchange_events: DataFrame, output_file: str) -> None:
-        """Generate a comprehensive CSV file of all Exchange activity with full details."""
+        """Generate a comprehensive CSV file of all Exchange activity with full details.
+
+        Rows are written as they are generated, so memory doesn't grow with the number of rows.
+        """
         if exchange_events.empty:
             self.logger.info("Skipping Exchange; no events present in log data.")
             return
 
         # Sort events by timestamp
-        events_sorted = exchange_events.sort_values("CreationDate")
-
-        # Prepare data for CSV
-        csv_data = []
-        previous_message_id = None
-
-        # Process each event
-        for _, row in events_sorted.iterrows():
-            timestamp = cast("datetime", row["CreationDate"]).strftime("%Y-%m-%d %H:%M:%S")
-            user = row["UserId"]
-            operation = row["Operation"]
-
-            # For MailItemsAccessed with item details, include each item separately
-            if operation == "MailItemsAccessed" and row.get("ItemDetails"):
-                items = row.get("ItemDetails", [])
-                if not isinstance(items, list):
-                    items = []
-
-                for item in items:
-                    if isinstance(item, dict):
-                        csv_row = {
-                            "Timestamp": timestamp,
-                            "User": str(user),
-                            "Operation": str(operation),
-                            "Subject": item.get("Subject", "No subject"),
-                            "Folder": item.get("FolderPath", "Unknown folder"),
-                            "ClientIP": str(row.get("ClientIP", "")),
-                            "ClientApp": self._extract_client(str(row.get("ClientInfoString", ""))),
-                        }
-                        csv_data.append(csv_row)
-            else:
-                # For other operations, include the single event
-                csv_row = self._prepare_other_event_csv_row(timestamp, user, operation, row)
-
-                # Skip if this is an immediate duplicate by Message ID
-                current_message_id = csv_row["Message ID"]
-                if current_message_id and current_message_id == previous_message_id:
-                    continue
-
-                csv_data.append(csv_row)
-                previous_message_id = current_message_id
-
-        # Define CSV headers
-        headers = [
-            "Timestamp",
-            "User",
-            "Operation",
-            "Subject",
-            "Folder",
-            "Message ID",
-            "Attachments",
-            "Client IP",
-            "Client Info",
-        ]
+        events_sorted = exchange_events.sort_values("CreationDate", kind="stable")
+        chunks = (
+            events_sorted.iloc[start : start + EXCHANGE_CSV_CHUNK_ROWS]
+            for start in range(0, len(events_sorted), EXCHANGE_CSV_CHUNK_ROWS)
+        )
 
         # Write to CSV
         try:
+            total = 0
             with Path(output_file).open("w", newline="", encoding="utf-8") as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=headers)
+                writer = csv.DictWriter(csvfile, fieldnames=EXCHANGE_CSV_HEADERS)
                 writer.writeheader()
-                writer.writerows(csv_data)
+                for csv_row in self.exchange_activity_rows(chunks):
+                    writer.writerow(csv_row)
+                    total += 1
 
             self.logger.info("Exchange activity data exported to %s", output_file)
-            self.logger.info("Total records: %d", len(csv_data))
+            self.logger.info("Total records: %d", total)
 
         except Exception as e:
             self.logger.error("Failed to write CSV file: %s", str(e))
 
+    def exchange_activity_csv(self, chunks: Iterable[DataFrame]) -> Iterator[str]:
+        """Generate the text of the Exchange activity CSV, a block of rows at a time.
+
+        Takes the same chunks as `exchange_activity_rows`, for streaming the CSV as it is written.
+        """
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXCHANGE_CSV_HEADERS)
+        writer.writeheader()
+        for count, csv_row in enumerate(self.exchange_activity_rows(chunks), 1):
+            writer.writerow(csv_row)
+            if count % EXCHANGE_CSV_CHUNK_ROWS == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    def exchange_activity_rows(self, chunks: Iterable[DataFrame]) -> Iterator[dict[str, str]]:
+        """Generate the rows of the Exchange activity CSV, keyed by `EXCHANGE_CSV_HEADERS`.
+
+        Takes processed Exchange events already sorted by time, as successive frames, which are
+        only read as rows are needed. MailItemsAccessed events give a row per item accessed, and
+        other events a row each, skipping immediate duplicates by Message ID.
+        """
+        previous_message_id = None
+
+        for chunk in chunks:
+            for row in chunk.to_dict("records"):
+                timestamp = cast("datetime", row["CreationDate"]).strftime("%Y-%m-%d %H:%M:%S")
+                user = row["UserId"]
+                operation = row["Operation"]
+
+                # For MailItemsAccessed with item details, include each item separately
+                if operation == "MailItemsAccessed" and row.get("ItemDetails"):
+                    yield from self._prepare_mail_item_csv_row(timestamp, user, operation, row)
+                else:
+                    # For other operations, include the single event
+                    csv_row = self._prepare_other_event_csv_row(timestamp, user, operation, row)
+
+                    # Skip if this is an immediate duplicate by Message ID
+                    current_message_id = csv_row["Message ID"]
+                    if current_message_id and current_message_id == previous_message_id:
+                        continue
+
+                    yield csv_row
+                    previous_message_id = current_message_id
+
     def _prepare_other_event_csv_row(
-        self, timestamp: str, user: str, operation: str, row: Series
+        self, timestamp: str, user: str, operation: str, row: dict[str, Any]
     ) -> dict[str, str]:
         """Prepare a CSV row for a non-MailItemsAccessed event."""
         # Initialize the row with default values
@@ -1424,7 +1489,7 @@ class ExchangeOperations(AuditAnalyzer):
             csv_row["Subject"] = operation_labels.get(operation, operation)
 
     def _prepare_mail_item_csv_row(
-        self, timestamp: str, user: str, operation: str, row: Series
+        self, timestamp: str, user: str, operation: str, row: dict[str, Any]
     ) -> list[dict[str, str]]:
         """Prepare CSV rows for a MailItemsAccessed event with multiple items."""
         rows = []
@@ -1441,8 +1506,10 @@ class ExchangeOperations(AuditAnalyzer):
                     "Operation": str(operation),
                     "Subject": item.get("Subject", "No subject"),
                     "Folder": item.get("FolderPath", "Unknown folder"),
-                    "ClientIP": str(row.get("ClientIP", "")),
-                    "ClientApp": self._extract_client(str(row.get("ClientInfoString", ""))),
+                    "Message ID": "",
+                    "Attachments": "",
+                    "Client IP": str(row.get("ClientIP", "")),
+                    "Client Info": self._extract_client(str(row.get("ClientInfoString", ""))),
                 }
                 rows.append(csv_row)
 
@@ -7,20 +7,21 @@ from __future__ import annotations
 import re
 from dataclasses import dataclass
 from itertools import groupby
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, ClassVar
 
-from pandas import DataFrame
+from pandas import DataFrame, Series
 from polykit.text import color
 from polykit.text import print_color as printc
 from tabulate import tabulate
 
-from purrrr.tools import AuditAnalyzer
+from purrrr.tools import AuditAnalyzer, value_counts
 
 if TYPE_CHECKING:
     import numpy as np
     import pandas as pd
     from pandas import DataFrame
 
+    from purrrr.ingest.aggregates import FileSummary
     from purrrr.users import UserActions
 
 
@@ -28,6 +29,14 @@ if TYPE_CHECKING:
 class FileOperations(AuditAnalyzer):
     """Analyze file actions in SharePoint."""
 
+    required_columns: ClassVar[tuple[str, ...]] = (
+        "Operation",
+        "UserId",
+        "SourceFileName",
+        "ObjectId",
+        "CleanPath",
+    )
+
     users: UserActions
 
     def __post_init__(self) -> None:
@@ -55,30 +64,70 @@ class FileOperations(AuditAnalyzer):
         """Get overall statistics for file actions."""
         if len(actions_to_analyze) > 1:
             most_actioned_files = file_actions["SourceFileName"].value_counts().head(self.max_files)
+            self.print_most_actioned_files(most_actioned_files)
 
-            if most_actioned_files.empty:
-                return
+    def print_most_actioned_files(self, most_actioned_files: pd.Series[int]) -> None:
+        """Print a table of the most frequently actioned files."""
+        if most_actioned_files.empty:
+            return
 
-            self.out.print_header(f"Top {self.max_files} most frequently actioned files")
+        self.out.print_header(f"Top {self.max_files} most frequently actioned files")
 
-            headers = ["File Name", "Count"]
-            min_widths = [60, 10]
-            col_formats = [f"{{:<{width}}}" for width in min_widths]
+        headers = ["File Name", "Count"]
+        min_widths = [60, 10]
+        col_formats = [f"{{:<{width}}}" for width in min_widths]
 
-            formatted_headers = [
-                fmt.format(header) for fmt, header in zip(col_formats, headers, strict=False)
-            ]
-            formatted_table = [
-                [
-                    fmt.format(str(cell))
-                    for fmt, cell in zip(col_formats, [file, count], strict=False)
-                ]
-                for file, count in most_actioned_files.items()
-            ]
+        formatted_headers = [
+            fmt.format(header) for fmt, header in zip(col_formats, headers, strict=False)
+        ]
+        formatted_table = [
+            [fmt.format(str(cell)) for fmt, cell in zip(col_formats, [file, count], strict=False)]
+            for file, count in most_actioned_files.items()
+        ]
 
-            colored_headers = self.out.color_headers(formatted_headers)
+        colored_headers = self.out.color_headers(formatted_headers)
 
-            print(tabulate(formatted_table, headers=colored_headers, tablefmt="plain"))
+        print(tabulate(formatted_table, headers=colored_headers, tablefmt="plain"))
+
+    def display_summary(self, summary: FileSummary, actions_to_analyze: list[str] | None) -> None:
+        """Display file action totals accumulated from a streamed log."""
+        if not summary.events:
+            printc("\nNo file operations found.", "yellow")
+            return
+
+        actions = actions_to_analyze or list(summary.operations)
+
+        # Top users for each action
+        for action in actions:
+            user_counts = summary.users_for(action)
+            if user_counts:
+                top_users = Series(dict(user_counts.most_common(self.users.max_users)))
+                self.users.print_top_users(top_users, len(user_counts), action)
+
+        # Most actioned files
+        if len(actions) > 1:
+            self.print_most_actioned_files(Series(dict(summary.files.most_common(self.max_files))))
+
+        # Bulk operations by user
+        has_suspicious_activity = False
+        operation_key_map = {"Download": "mass_downloads", "Delete": "mass_deletions"}
+        for operation_type, config_key in operation_key_map.items():
+            threshold = int(self.suspicious_patterns[config_key])
+            suspicious = [
+                (user, count)
+                for user, count in summary.users_matching(operation_type).most_common()
+                if count >= threshold
+            ]
+            if suspicious:
+                if not has_suspicious_activity:
+                    self.out.print_header("Bulk Operations")
+                    has_suspicious_activity = True
+                print(f"\n  Users with bulk {operation_type.lower()}s:")
+                for user, count in suspicious:
+                    print(
+                        f"    {color(user, 'cyan')}: "
+                        f"{color(str(count), 'yellow')} {operation_type}s"
+                    )
 
     def get_detailed_file_actions(self, file_actions: DataFrame, keyword: str) -> None:
         """Get detailed actions for files containing the keyword."""
@@ -348,7 +397,9 @@ class FileOperations(AuditAnalyzer):
 
         # Group operations by user and date
         daily_ops = (
-            file_actions.groupby(["UserId", file_actions["CreationDate"].dt.date, "Operation"])
+            file_actions.groupby(
+                ["UserId", file_actions["CreationDate"].dt.date, "Operation"], observed=True
+            )
             .size()
             .reset_index(name="count")
         )
@@ -358,7 +409,7 @@ class FileOperations(AuditAnalyzer):
 
         # Analyze operations by user
         has_user_operations = False
-        for user, user_group in file_actions.groupby("UserId"):
+        for user, user_group in file_actions.groupby("UserId", observed=True):
             downloads = user_group[user_group["Operation"].str.contains("Download", na=False)]
             uploads = user_group[user_group["Operation"].str.contains("Upload", na=False)]
 
@@ -397,7 +448,7 @@ class FileOperations(AuditAnalyzer):
                 file_actions["Operation"].str.contains(operation_type, na=False)
             ]
             if not bulk_ops.empty:
-                user_counts = bulk_ops.groupby("UserId").size()
+                user_counts = bulk_ops.groupby("UserId", observed=True).size()
                 config_key = operation_key_map[operation_type]
                 suspicious = user_counts[
                     user_counts >= int(self.suspicious_patterns[config_key])
@@ -444,7 +495,8 @@ class FileOperations(AuditAnalyzer):
 
         if not high_volume_days.empty:
             printc("\nHigh Volume Days:", "yellow")
-            for (user, date), group in high_volume_days.groupby(["UserId", "CreationDate"]):
+            user_days = high_volume_days.groupby(["UserId", "CreationDate"], observed=True)
+            for (user, date), group in user_days:
                 total = group["count"].sum()
                 print(
                     f"\n  {color(user, 'cyan')} on {color(str(date), 'cyan')} - "
@@ -469,7 +521,7 @@ class FileOperations(AuditAnalyzer):
         if not unusual.empty:
             print(color("    Files with multiple operations:", "yellow"))
             for filename in unusual.index:
-                file_ops = group[group["SourceFileName"] == filename]["Operation"].value_counts()
+                file_ops = value_counts(group[group["SourceFileName"] == filename]["Operation"])
                 ops_list = [
                     f"{op}: {color(str(count), 'yellow')}" for op, count in file_ops.items()
                 ]
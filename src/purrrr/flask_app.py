@@ -2,15 +2,20 @@
 
 from __future__ import annotations
 
-import json
 import os
 import tempfile
 import secrets
+import threading
+import time
+from dataclasses import asdict
 from datetime import datetime, timedelta
+from functools import partial
+from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
+import numpy as np
 import pandas as pd
-from flask import Flask, render_template, request, session
+from flask import Flask, Response, render_template, request, session, url_for
 from polykit import PolyLog
 from werkzeug.utils import secure_filename
 
@@ -21,9 +26,57 @@ try:
 except ImportError:
     REDIS_AVAILABLE = False
 
-from purrrr.tools import AuditConfig
+from purrrr.ingest import (
+    FrameCache,
+    MultipartStream,
+    UploadPart,
+    UploadSpool,
+    is_supported_log,
+    read_audit_log,
+)
+from purrrr.exchange import ExchangeOperations
+from purrrr.network import IPFilter
+from purrrr.tools import OutputFormatter, grouped_counts, value_counts
+from purrrr.web import (
+    DEFAULT_PAGE_SIZE,
+    EXPORT_FORMATS,
+    MAX_PAGE_SIZE,
+    PARSING,
+    PRECOMPUTING,
+    READY,
+    STORED_ENCODING,
+    TIMELINE_FIELDS,
+    AnalysisSession,
+    ExchangeActivity,
+    FileSessionIndex,
+    Job,
+    JobQueue,
+    MemorySessionIndex,
+    RedisSessionIndex,
+    ResultCache,
+    SessionIndex,
+    SessionStore,
+    SharedFrameStore,
+    Timeline,
+    apply_filters,
+    as_list,
+    check_filters,
+    compress,
+    encode_json,
+    encoded_json_response,
+    exchange_chunks,
+    export_chunks,
+    filter_rows,
+    frame_chunks,
+    frame_memory,
+    has_filters,
+    install_responses,
+    serve,
+)
 
 if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
     from pandas import DataFrame
 
 # Initialize logger
@@ -41,12 +94,35 @@ app = Flask(
 
 # Configure Flask app
 app.config["MAX_CONTENT_LENGTH"] = 500 * 1024 * 1024
-app.config["UPLOAD_FOLDER"] = tempfile.gettempdir()
+app.config["UPLOAD_FOLDER"] = os.getenv("UPLOAD_FOLDER", tempfile.gettempdir())
+app.config["PARSE_WORKERS"] = int(os.getenv("PARSE_WORKERS", "1"))
+app.config["KEEP_UPLOADS"] = os.getenv("KEEP_UPLOADS", "").lower() in {"1", "true", "yes"}
 app.config["SECRET_KEY"] = os.getenv("SECRET_KEY", secrets.token_hex(32))
 app.config["SESSION_COOKIE_SECURE"] = False
 app.config["SESSION_COOKIE_HTTPONLY"] = True
 app.config["SESSION_COOKIE_SAMESITE"] = "Lax"
 app.config["PERMANENT_SESSION_LIFETIME"] = timedelta(hours=24)
+# Memory budget for uploaded logs; least recently used sessions beyond it are spilled to disk
+app.config["SESSION_MEMORY_MB"] = int(os.getenv("SESSION_MEMORY_MB", "2048"))
+app.config["SESSION_SPILL_DIR"] = os.getenv(
+    "SESSION_SPILL_DIR", os.path.join(tempfile.gettempdir(), "purrrr-sessions")
+)
+app.config["SESSION_SPILL_MB"] = int(os.getenv("SESSION_SPILL_MB", "20480"))
+# Worker processes to serve from; more than one keeps session data in a store they all share
+app.config["WEB_WORKERS"] = int(os.getenv("WEB_WORKERS", "1"))
+app.config["SHARED_SESSIONS"] = app.config["WEB_WORKERS"] > 1 or os.getenv(
+    "SHARED_SESSIONS", ""
+).lower() in {"1", "true", "yes"}
+# Memory budget for cached analysis results in each worker process, also cached in Redis
+app.config["RESULT_CACHE_MB"] = int(os.getenv("RESULT_CACHE_MB", "256"))
+# Threads parsing uploads and pre-computing analyses in the background, per worker process
+app.config["JOB_WORKERS"] = int(os.getenv("JOB_WORKERS", "2"))
+app.config["SESSION_SHARED_DIR"] = os.getenv(
+    "SESSION_SHARED_DIR", os.path.join(app.config["UPLOAD_FOLDER"], "purrrr-sessions")
+)
+# Serialize JSON responses with orjson and compress responses the client accepts compressed
+install_responses(app)
+
 # Disable Jinja2 template caching for development
 app.jinja_env.cache = None
 
@@ -66,221 +142,588 @@ else:
     app.config["SESSION_TYPE"] = "filesystem"
     logger.warning("Redis not available, using filesystem sessions")
 
-ALLOWED_EXTENSIONS = {"csv"}
+# Columns each web analysis type reads; uploads decode only their union from AuditData
+ANALYSIS_COLUMNS: dict[str, tuple[str, ...]] = {
+    "file_operations": ("Operation", "UserId", "SourceFileName", "ClientIP"),
+    "user_activity": ("Operation", "UserId", "SourceFileName", "ClientIP"),
+    "exchange": ("Operation", "UserId", "ClientIP", "Workload", "ClientInfoString"),
+    "summary": ("Operation", "UserId"),
+}
+WEB_COLUMNS = list(dict.fromkeys(c for columns in ANALYSIS_COLUMNS.values() for c in columns))
+
+# Entries listed by the file and user analyses; breakdowns are computed with grouped
+# aggregations, so these can be raised without a scan per entry
+TOP_FILES = 15
+FILES_DETAILED = 10
+USERS_PER_FILE = 5
+USERS_DETAILED = 10
+TOP_USERS = 15
+USERS_WITH_STATS = 20
+
+# Co-occurrence tables of the patterns analysis, by the timeline fields they combine
+PATTERN_TABLES = {
+    "user_ip": ("user", "ClientIP"),
+    "user_operation": ("user", "operation"),
+    "operation_ip": ("operation", "ClientIP"),
+    "user_operation_ip": ("user", "operation", "ClientIP"),
+}
+PATTERNS_LIMIT = 50
+
 
 
 def allowed_file(filename: str) -> bool:
-    """Check if file extension is allowed."""
-    return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
+    """Check if file extension is allowed (CSV, optionally gzip, zstd, or zip compressed)."""
+    return is_supported_log(filename)
 
 
-class AnalysisSession:
-    """Manages analysis session data."""
+def iter_upload_parts() -> Iterator[UploadPart]:
+    """Iterate over the parts of the current upload as they arrive."""
+    boundary = request.mimetype_params.get("boundary")
+    if request.mimetype != "multipart/form-data" or not boundary:
+        return iter(())
+    return MultipartStream(request.stream, boundary.encode()).parts()
 
-    def __init__(self, df: DataFrame, user_map_df: DataFrame | None = None):
-        """Initialize analysis session."""
-        self.df = df
-        self.user_map_df = user_map_df
-        self.config = AuditConfig()
 
-        # Set up user mapping if provided
-        if user_map_df is not None:
-            self._setup_user_mapping()
+def spool_upload(filename: str, job_id: str) -> UploadSpool:
+    """Open a spool in UPLOAD_FOLDER for an upload to be parsed in the background as it arrives.
 
-    def _setup_user_mapping(self) -> None:
-        """Set up user mapping from provided CSV."""
-        if self.user_map_df is None:
-            return
-        try:
-            for _, row in self.user_map_df.iterrows():
-                if len(row) >= 2:
-                    upn = str(row.iloc[0]).strip()
-                    name = str(row.iloc[1]).strip()
-                    if upn and name:
-                        self.config.user_mapping[upn] = name
-        except Exception as e:
-            logger.error(f"Error setting up user mapping: {e}")
+    With KEEP_UPLOADS the file keeps its name; otherwise it is created under a temporary name
+    and unlinked straight away, so it is gone as soon as the upload has been parsed.
+    """
+    if not app.config["KEEP_UPLOADS"]:
+        filename = f".purrrr-upload-{job_id}-{filename}"
+
+    path = Path(app.config["UPLOAD_FOLDER"]) / filename
+    return UploadSpool(path, app.config["KEEP_UPLOADS"], request.content_length or 0)
+
+
+def parse_upload(job: Job, spool: UploadSpool, filename: str) -> DataFrame:
+    """Parse a spooled upload chunk by chunk, publishing the rows and bytes read as it goes.
 
+    Parsing keeps up with the transfer, waiting for more of the upload when it catches up.
+    Compressed uploads are decompressed on the fly, and every CSV in a zip archive is merged.
+    """
+    jobs.update(job, state=PARSING)
+    with spool.open() as raw:
 
-# Global session storage (in production, use proper session management)
-sessions: dict[str, AnalysisSession] = {}
+        def report(rows: int) -> None:
+            jobs.update(
+                job, rows=rows, bytes_read=spool.bytes_read, total_bytes=spool.total_bytes
+            )
+
+        return read_audit_log(
+            raw,
+            fields=WEB_COLUMNS,
+            workers=app.config["PARSE_WORKERS"],
+            name=filename,
+            progress=report,
+        )
+
+
+def create_index(name: str, shared: bool = False) -> SessionIndex:
+    """Create an index of records that expire with the Flask session lifetime.
+
+    Shared indexes are kept in Redis when it is reachable and as files in SESSION_SHARED_DIR
+    otherwise, so every worker process sees the same records.
+    """
+    ttl = app.config["PERMANENT_SESSION_LIFETIME"].total_seconds()
+    if not shared:
+        return MemorySessionIndex(ttl)
+
+    if (client := reachable_redis()) is not None:
+        return RedisSessionIndex(client, ttl, prefix=f"purrrr:{name}:")
+    logger.warning(f"Redis unavailable, indexing shared {name} on disk")
+    return FileSessionIndex(Path(app.config["SESSION_SHARED_DIR"]) / name, ttl)
+
+
+def reachable_redis() -> Any:
+    """Get the Redis client if Redis is configured and answering, or None."""
+    if not REDIS_AVAILABLE or not app.config.get("SESSION_REDIS"):
+        return None
+    try:
+        app.config["SESSION_REDIS"].ping()
+    except Exception as e:
+        logger.debug(f"Redis ping failed: {e}")
+        return None
+    return app.config["SESSION_REDIS"]
+
+
+def create_session_store(shared: bool = False) -> SessionStore[AnalysisSession]:
+    """Create the store of uploaded logs by session ID, bounded in memory.
+
+    A local store spills sessions over budget to SESSION_SPILL_DIR and expires them with the Flask
+    session lifetime. A shared store keeps every session in SESSION_SHARED_DIR so several worker
+    processes can serve the same sessions.
+    """
+    max_bytes = app.config["SESSION_MEMORY_MB"] * 1024 * 1024
+
+    if shared:
+        directory = Path(app.config["SESSION_SHARED_DIR"])
+        return SessionStore(
+            max_bytes,
+            restore=partial(AnalysisSession.restore, logger=logger),
+            logger=logger,
+            shared=SharedFrameStore(directory, create_index("sessions", shared=True), logger),
+        )
+
+    # Sessions evicted from memory are spilled here as Parquet, unless SESSION_SPILL_DIR is empty
+    spill = None
+    if app.config["SESSION_SPILL_DIR"]:
+        spill_bytes = app.config["SESSION_SPILL_MB"] * 1024 * 1024
+        spill = FrameCache(Path(app.config["SESSION_SPILL_DIR"]), spill_bytes, logger)
+    return SessionStore(
+        max_bytes,
+        ttl=app.config["PERMANENT_SESSION_LIFETIME"],
+        spill=spill,
+        restore=partial(AnalysisSession.restore, logger=logger),
+        logger=logger,
+    )
+
+
+sessions = create_session_store(shared=app.config["SHARED_SESSIONS"])
+jobs = JobQueue(
+    create_index("jobs", shared=app.config["SHARED_SESSIONS"]), app.config["JOB_WORKERS"], logger
+)
+results = ResultCache(
+    app.config["RESULT_CACHE_MB"] * 1024 * 1024,
+    redis=reachable_redis(),
+    ttl=app.config["PERMANENT_SESSION_LIFETIME"],
+    logger=logger,
+)
 
 
 @app.route("/")
 def index() -> str:
     """Render home page."""
-    import time
-    # Force reload test
     return render_template("index.html", cache_bust=int(time.time()))
 
 
 @app.route("/api/upload", methods=["POST"])
-def upload_file() -> tuple[dict[str, Any], int] | dict[str, Any]:
-    """Handle file upload and initiate analysis."""
-    try:
-        if "file" not in request.files:
-            return {"error": "No file provided"}, 400
+def upload_file() -> tuple[dict[str, Any], int]:
+    """Receive an upload and load it into a new session in the background.
 
-        file = request.files["file"]
-        user_map_file = request.files.get("user_map_file")
+    The job parsing the file starts as soon as it begins to arrive, and its ID, which doubles as
+    the session ID once the job is ready, is returned once the whole request has been received.
+    """
+    spool = job = None
+    filename = ""
+    form: dict[str, Any] = {}  # The rest of the form, which may arrive after the file
+    received = threading.Event()
+    session_id = datetime.now().strftime("%Y%m%d%H%M%S%f")
 
-        if not file.filename:
-            return {"error": "No file selected"}, 400
+    def load(job: Job) -> dict[str, Any]:
+        df = parse_upload(job, spool, filename)
 
-        if not allowed_file(file.filename or ""):
-            return {"error": "Only CSV files are allowed"}, 400
+        received.wait()
+        if "error" in form:
+            raise ValueError(form["error"])
 
-        # Save uploaded file
-        filename = secure_filename(file.filename or "file.csv")
-        filepath = os.path.join(app.config["UPLOAD_FOLDER"], filename)
-        file.save(filepath)
+        # Detect log type from the header, before decoded columns are added
+        header = pd.DataFrame(columns=df.attrs["source_columns"])
 
-        # Load CSV
-        df = pd.read_csv(filepath)
+        session_obj = AnalysisSession(df, form.get("user_map_df"), logger)
+        sessions[job.id] = session_obj
 
-        # Load user mapping if provided
-        user_map_df = None
-        if user_map_file and user_map_file.filename:
-            user_map_filename = secure_filename(user_map_file.filename)
-            user_map_filepath = os.path.join(app.config["UPLOAD_FOLDER"], user_map_filename)
-            user_map_file.save(user_map_filepath)
-            user_map_df = pd.read_csv(user_map_filepath)
-
-        # Create session
-        session_id = datetime.now().strftime("%Y%m%d%H%M%S%f")
-        session_obj = AnalysisSession(df, user_map_df)
-        sessions[session_id] = session_obj
-
-        # Detect log type
-        log_type = detect_log_type(df)
-
-        # Pré-calculer l'analyse Exchange et la stocker dans Redis
-        try:
-            exchange_results = analyze_exchange(session_obj, {})
-            
-            # Stocker dans Redis si disponible
-            if REDIS_AVAILABLE and app.config.get("SESSION_REDIS"):
-                redis_client = app.config["SESSION_REDIS"]
-                redis_key = f"exchange_analysis:{session_id}"
-                redis_client.setex(
-                    redis_key,
-                    timedelta(hours=24),
-                    json.dumps(exchange_results, default=str)
-                )
-                logger.info(f"Exchange analysis cached in Redis: {redis_key}")
-        except Exception as e:
-            logger.warning(f"Failed to pre-compute Exchange analysis: {e}")
+        jobs.update(job, state=PRECOMPUTING)
+        precompute(job.id, session_obj)
 
         return {
-            "session_id": session_id,
-            "log_type": log_type,
+            "session_id": job.id,
+            "log_type": detect_log_type(header),
             "rows": len(df),
-            "columns": len(df.columns),
+            "columns": len(header.columns),
             "filename": filename,
         }
 
+    try:
+        for part in iter_upload_parts():
+            if part.name == "file" and spool is None:
+                if not part.filename:
+                    return {"error": "No file selected"}, 400
+
+                if not allowed_file(part.filename):
+                    return {"error": "Only .csv, .csv.gz, .csv.zst, or .zip files are allowed"}, 400
+
+                filename = secure_filename(part.filename)
+                spool = spool_upload(filename, session_id)
+                job = jobs.submit(
+                    session_id, load, filename=filename, total_bytes=spool.total_bytes
+                )
+                spool.fill(part)
+
+            # Load user mapping if provided
+            elif part.name == "user_map_file" and part.filename:
+                form["user_map_df"] = pd.read_csv(part)
+
+        if job is None:
+            return {"error": "No file provided"}, 400
+        return job_accepted(job), 202
+
     except Exception as e:
         logger.error(f"Upload error: {e}")
+        form["error"] = str(e)
         return {"error": str(e)}, 500
 
+    finally:
+        if spool is not None:
+            spool.finish(error="Upload interrupted")
+        received.set()
+
 
 @app.route("/api/upload/<session_id>", methods=["POST"])
-def upload_additional_file(session_id: str) -> tuple[dict[str, Any], int] | dict[str, Any]:
-    """Handle additional file upload and merge with existing session data."""
-    try:
-        if session_id not in sessions:
-            return {"error": "Session not found"}, 404
+def upload_additional_file(session_id: str) -> tuple[dict[str, Any], int]:
+    """Receive an additional upload and merge it into an existing session in the background.
 
-        if "file" not in request.files:
-            return {"error": "No file provided"}, 400
+    As with a first upload, the file is parsed as it arrives.
+    """
+    if jobs.running(session_id) is not None:
+        return {"error": "An upload is already being processed for this session"}, 409
 
-        file = request.files["file"]
+    if session_id not in sessions:
+        return {"error": "Session not found"}, 404
 
-        if not file.filename:
-            return {"error": "No file selected"}, 400
+    spool = job = None
+    filename = ""
 
-        if not allowed_file(file.filename or ""):
-            return {"error": "Only CSV files are allowed"}, 400
+    def merge(job: Job) -> dict[str, Any]:
+        new_df = parse_upload(job, spool, filename)
 
-        # Save uploaded file
-        filename = secure_filename(file.filename or "file.csv")
-        filepath = os.path.join(app.config["UPLOAD_FOLDER"], filename)
-        file.save(filepath)
+        # The file becomes a new segment, leaving the events already loaded untouched
+        session_obj = sessions[job.id]
+        session_obj.append(new_df)
+        sessions[job.id] = session_obj  # Re-measure and share the new segment
 
-        # Load CSV
-        new_df = pd.read_csv(filepath)
-        rows_added = len(new_df)
+        # Results of the previous version can no longer be served, so free them
+        results.invalidate(job.id)
 
-        # Get existing session
-        session_obj = sessions[session_id]
-        
-        # Merge dataframes
-        session_obj.df = pd.concat([session_obj.df, new_df], ignore_index=True)
-        
-        # Invalidate cache if Redis is available
-        if REDIS_AVAILABLE and app.config.get("SESSION_REDIS"):
-            try:
-                redis_client = app.config["SESSION_REDIS"]
-                redis_key = f"exchange_analysis:{session_id}"
-                redis_client.delete(redis_key)
-                logger.info(f"Invalidated cache for session: {redis_key}")
-            except Exception as e:
-                logger.warning(f"Failed to invalidate Redis cache: {e}")
+        jobs.update(job, state=PRECOMPUTING)
+        precompute(job.id, session_obj)
 
         return {
-            "session_id": session_id,
-            "rows_added": rows_added,
-            "total_rows": len(session_obj.df),
+            "session_id": job.id,
+            "rows_added": len(new_df),
+            "total_rows": session_obj.rows,
             "filename": filename,
         }
 
+    try:
+        for part in iter_upload_parts():
+            if part.name == "file" and spool is None:
+                if not part.filename:
+                    return {"error": "No file selected"}, 400
+
+                if not allowed_file(part.filename):
+                    return {"error": "Only .csv, .csv.gz, .csv.zst, or .zip files are allowed"}, 400
+
+                filename = secure_filename(part.filename)
+                spool = spool_upload(filename, session_id)
+                job = jobs.submit(
+                    session_id, merge, filename=filename, total_bytes=spool.total_bytes
+                )
+                if job is None:
+                    spool.discard()
+                    return {"error": "An upload is already being processed for this session"}, 409
+                spool.fill(part)
+
+        if job is None:
+            return {"error": "No file provided"}, 400
+        return job_accepted(job), 202
+
     except Exception as e:
         logger.error(f"Additional upload error: {e}")
         return {"error": str(e)}, 500
 
+    finally:
+        if spool is not None:
+            spool.finish(error="Upload interrupted")
+
+
+@app.route("/api/jobs/<job_id>", methods=["GET"])
+def job_status(job_id: str) -> tuple[dict[str, Any], int] | dict[str, Any]:
+    """Report the progress of a background upload job."""
+    if (job := jobs.get(job_id)) is None:
+        return {"error": "Job not found"}, 404
+    return job_progress(job)
+
+
+def job_progress(job: Job) -> dict[str, Any]:
+    """Describe a job's progress for the API."""
+    progress = job.bytes_read / job.total_bytes if job.total_bytes else 0.0
+    return {**asdict(job), "progress": 1.0 if job.state == READY else min(progress, 1.0)}
+
+
+def job_accepted(job: Job) -> dict[str, Any]:
+    """Describe a newly queued job, with where to follow its progress."""
+    return {
+        **job_progress(job),
+        "job_id": job.id,
+        "session_id": job.id,
+        "status_url": url_for("job_status", job_id=job.id),
+    }
+
+
+def precompute(session_id: str, session_obj: AnalysisSession) -> None:
+    """Pre-compute the unfiltered Exchange analysis, timeline, and filter indexes of a session."""
+    try:
+        cached_analysis(session_id, session_obj, "exchange", {})
+        len(session_obj.timeline)
+        index_bytes = sum(segment.index.memory_usage() for segment in session_obj.segments)
+        logger.debug(f"Filter indexes built: {index_bytes // 1024} KB")
+    except Exception as e:
+        logger.warning(f"Failed to pre-compute session analyses: {e}")
+
+
+def cached_analysis(
+    session_id: str, session_obj: AnalysisSession, analysis_type: str, params: dict[str, Any]
+) -> bytes:
+    """Get an analysis of a session as compressed JSON, computing and caching it on a miss."""
+    key = results.key(session_id, session_obj.version, analysis_type, params)
+    if (data := results.get(key)) is not None:
+        logger.debug(f"Analysis served from cache: {key}")
+        return data
+
+    data = compress(encode_json(ANALYSES[analysis_type](session_obj, params)), STORED_ENCODING)
+    results.put(key, data)
+    return data
+
 
 @app.route("/api/analysis/<session_id>/<analysis_type>", methods=["POST"])
-def analyze(session_id: str, analysis_type: str) -> tuple[dict[str, Any], int] | dict[str, Any]:
+def analyze(
+    session_id: str, analysis_type: str
+) -> tuple[dict[str, Any], int] | dict[str, Any] | Response:
     """Perform analysis on uploaded data."""
     try:
+        # The session's data is still being loaded
+        if (job := jobs.running(session_id)) is not None:
+            return job_progress(job), 202
+
         if session_id not in sessions:
             return {"error": "Session not found"}, 404
 
+        if analysis_type not in ANALYSES:
+            return {"error": f"Unknown analysis type: {analysis_type}"}, 400
+
         session_obj = sessions[session_id]
         params = request.get_json() or {}
 
-        # Si c'est Exchange, essayer de récupérer depuis Redis d'abord
-        if analysis_type == "exchange" and REDIS_AVAILABLE and app.config.get("SESSION_REDIS"):
+        data = cached_analysis(session_id, session_obj, analysis_type, params)
+        return encoded_json_response(data, STORED_ENCODING)
+
+    except Exception as e:
+        logger.error(f"Analysis error: {e}")
+        return {"error": str(e)}, 500
+
+
+@app.route("/api/timeline/<session_id>", methods=["POST"])
+def timeline_page(session_id: str) -> tuple[dict[str, Any], int] | dict[str, Any]:
+    """Get one page of a session's Exchange timeline, filtered and sorted on the server.
+
+    The JSON body takes `offset`, `limit` (null for every remaining event), `sort` (a timeline
+    field), `order` (`asc` or `desc`), and optionally `fields` to return a subset of them. Filters
+    are `workloads`, `users`, and `actions` as lists of values, `files` as text to look for in the
+    subject or folder, `ips` and `exclude_ips` as IP patterns, and `start_date` and `end_date`.
+    With `facets`, the distinct users, operations, and workloads are returned for the filter menus.
+    """
+    try:
+        if (job := jobs.running(session_id)) is not None:
+            return job_progress(job), 202
+
+        if session_id not in sessions:
+            return {"error": "Session not found"}, 404
+
+        timeline = sessions[session_id].timeline
+        params = request.get_json(silent=True) or {}
+
+        sort = params.get("sort") or "timestamp"
+        if sort not in TIMELINE_FIELDS:
+            return {"error": f"Unknown sort key: {sort}"}, 400
+        descending = params.get("order", "desc") != "asc"
+
+        fields = [f for f in params.get("fields") or TIMELINE_FIELDS if f in TIMELINE_FIELDS]
+        offset = max(int(params.get("offset") or 0), 0)
+        limit = params.get("limit", DEFAULT_PAGE_SIZE)
+        if limit is not None:
+            limit = min(max(int(limit), 0), MAX_PAGE_SIZE)
+
+        mask = timeline_mask(timeline, params)
+        page, total = timeline.page(offset, limit, sort, descending, mask)
+
+        # Each event carries the ID of its source row, for fetching its details with get_event
+        operations = page[fields].assign(id=page["row"]).to_dict("records")
+
+        results = {
+            "operations": operations,
+            "total": total,
+            "offset": offset,
+            "limit": limit,
+            "sort": sort,
+            "order": "desc" if descending else "asc",
+        }
+        if params.get("facets"):
+            results["facets"] = {
+                "users": timeline.values("user"),
+                "operations": timeline.values("operation"),
+                "workloads": timeline.values("Workload"),
+            }
+        return results
+
+    except Exception as e:
+        logger.error(f"Timeline error: {e}")
+        return {"error": str(e)}, 500
+
+
+@app.route("/api/events/<session_id>/<int:row_id>", methods=["GET"])
+def get_event(session_id: str, row_id: int) -> tuple[dict[str, Any], int] | dict[str, Any]:
+    """Get the full AuditData record of one event, by the ID of its row in the session.
+
+    Row IDs are positions among the session's events, which only ever grow by new segments at
+    the end, so an ID keeps pointing at the same event and is looked up directly without searching.
+    """
+    try:
+        if (job := jobs.running(session_id)) is not None:
+            return job_progress(job), 202
+
+        if session_id not in sessions:
+            return {"error": "Session not found"}, 404
+
+        if (audit_data := sessions[session_id].audit_record(row_id)) is None:
+            return {"error": "Event not found"}, 404
+
+        return {"id": row_id, "audit_data": audit_data}
+
+    except Exception as e:
+        logger.error(f"Event error: {e}")
+        return {"error": str(e)}, 500
+
+
+@app.route("/api/export/<session_id>", methods=["GET", "POST"])
+def export_events(session_id: str) -> tuple[dict[str, Any], int] | dict[str, Any] | Response:
+    """Stream a session's events matching the analysis filters, as NDJSON or CSV.
+
+    Filters are read from the JSON body, or from the query string for a plain download link,
+    with the same meaning as for the analyses. `format` is `ndjson` (the default) or `csv`, and
+    `columns` optionally limits the fields exported. Events are filtered and encoded a chunk at a
+    time while the response is sent, so the first rows arrive right away whatever the size of the
+    export and memory use doesn't grow with it.
+    """
+    try:
+        if (job := jobs.running(session_id)) is not None:
+            return job_progress(job), 202
+
+        if session_id not in sessions:
+            return {"error": "Session not found"}, 404
+
+        params = request.get_json(silent=True) or request.args.to_dict()
+        fmt = params.get("format") or "ndjson"
+        if not isinstance(fmt, str) or fmt not in EXPORT_FORMATS:
+            return {"error": f"Unknown export format: {fmt}"}, 400
+
+        try:
+            check_filters(params)
+            wanted = as_list(params.get("columns"))
+        except (TypeError, ValueError) as e:
+            return {"error": str(e)}, 400
+
+        # Segments are taken once, so files added while the export runs don't change it
+        segments = list(sessions[session_id].segments)
+        columns = list(dict.fromkeys(c for segment in segments for c in segment.df.columns))
+        if wanted:
+            columns = [c for c in wanted if c in columns]
+
+        # Events are selected before the response starts, so filtering can't cut it short
+        selections = [filter_rows(segment, params, logger) for segment in segments]
+
+        def chunks() -> Iterator[DataFrame]:
+            for segment, rows in zip(segments, selections, strict=True):
+                yield from frame_chunks(segment.df, rows)
+
+        def stream() -> Iterator[bytes]:
             try:
-                redis_client = app.config["SESSION_REDIS"]
-                redis_key = f"exchange_analysis:{session_id}"
-                cached_result = redis_client.get(redis_key)
-                
-                if cached_result:
-                    logger.info(f"Retrieved Exchange analysis from Redis cache: {redis_key}")
-                    return json.loads(cached_result)
+                yield from export_chunks(chunks(), fmt, columns)
             except Exception as e:
-                logger.warning(f"Failed to retrieve from Redis cache: {e}")
-
-        results = {}
-
-        if analysis_type == "file_operations":
-            results = analyze_file_operations(session_obj, params)
-        elif analysis_type == "user_activity":
-            results = analyze_user_activity(session_obj, params)
-        elif analysis_type == "exchange":
-            results = analyze_exchange(session_obj, params)
-        elif analysis_type == "summary":
-            results = analyze_summary(session_obj)
-        else:
-            return {"error": f"Unknown analysis type: {analysis_type}"}, 400
+                logger.error(f"Export error: {e}")
+                raise
 
-        return results
+        filename = f"purrrr-{secure_filename(session_id)}.{fmt}"
+        return Response(
+            stream(),
+            mimetype=EXPORT_FORMATS[fmt],
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
 
     except Exception as e:
-        logger.error(f"Analysis error: {e}")
+        logger.error(f"Export error: {e}")
         return {"error": str(e)}, 500
 
+
+@app.route("/api/export/<session_id>/exchange", methods=["GET", "POST"])
+def export_exchange(session_id: str) -> tuple[dict[str, Any], int] | dict[str, Any] | Response:
+    """Stream the Exchange activity CSV of a session's events matching the analysis filters.
+
+    The CSV is the one the command line writes with `--export-exchange-csv`, its rows generated
+    and sent as the events are read in time order, so memory doesn't grow with the export.
+    Filters are read from the JSON body or from the query string, as for `export_events`.
+    """
+    try:
+        if (job := jobs.running(session_id)) is not None:
+            return job_progress(job), 202
+
+        if session_id not in sessions:
+            return {"error": "Session not found"}, 404
+
+        session_obj = sessions[session_id]
+        params = request.get_json(silent=True) or request.args.to_dict()
+        try:
+            check_filters(params)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        exchange = ExchangeOperations(
+            session_obj.config, OutputFormatter(session_obj.config, logger), logger
+        )
+        chunks = exchange_chunks(list(session_obj.segments), params, exchange, logger)
+
+        def stream() -> Iterator[bytes]:
+            try:
+                for text in exchange.exchange_activity_csv(chunks):
+                    yield text.encode()
+            except Exception as e:
+                logger.error(f"Exchange export error: {e}")
+                raise
+
+        filename = f"purrrr-exchange-{secure_filename(session_id)}.csv"
+        return Response(
+            stream(),
+            mimetype=EXPORT_FORMATS["csv"],
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
+
+    except Exception as e:
+        logger.error(f"Exchange export error: {e}")
+        return {"error": str(e)}, 500
+
+
+def timeline_mask(
+    timeline: Timeline, params: dict[str, Any], rows: np.ndarray | None = None
+) -> np.ndarray | None:
+    """Get the timeline events matching the filters of a timeline request, or None for all.
+
+    With `rows`, only events from those positions among the session's events are kept.
+    """
+    return timeline.mask(
+        facets={
+            "Workload": as_list(params.get("workloads")),
+            "user": as_list(params.get("users")),
+            "operation": as_list(params.get("actions")),
+        },
+        text=params.get("files") or "",
+        ip_filter=IPFilter.from_patterns(params.get("ips"), params.get("exclude_ips")),
+        start=params.get("start_date") or "",
+        end=params.get("end_date") or "",
+        rows=rows,
+    )
+
+
 def detect_log_type(df: DataFrame) -> str:
     """Detect the type of log file based on columns."""
     columns = set(df.columns)
@@ -300,98 +743,15 @@ def detect_log_type(df: DataFrame) -> str:
 
     return "unknown"
 
-def apply_filters(df: DataFrame, params: dict[str, Any]) -> DataFrame:
-    """Apply user-defined filters to the DataFrame."""
-    # User filter
-    if params.get("user"):
-        user_filter = params["user"].lower()
-        df = df[df["UserId"].str.contains(user_filter, case=False, na=False)]
-    
-    # Actions filter
-    if params.get("actions"):
-        actions_list = [a.strip() for a in params["actions"].split(",")]
-        if "Operation" in df.columns:
-            df = df[df["Operation"].isin(actions_list)]
-    
-    # File search
-    if params.get("files"):
-        keyword = params["files"].lower()
-        if "SourceFileName" in df.columns:
-            df = df[df["SourceFileName"].str.contains(keyword, case=False, na=False)]
-    
-    # IP filter
-    if params.get("ips"):
-        ip_filter = params["ips"]
-        if "ClientIPAddress" in df.columns:
-            # Simple wildcard support: replace * with regex pattern
-            ip_pattern = ip_filter.replace("*", ".*").replace(".", r"\.")
-            df = df[df["ClientIPAddress"].str.contains(ip_pattern, regex=True, case=False, na=False)]
-    
-    # Exclude IPs
-    if params.get("exclude_ips"):
-        exclude_filter = params["exclude_ips"]
-        if "ClientIPAddress" in df.columns:
-            exclude_pattern = exclude_filter.replace("*", ".*").replace(".", r"\.")
-            df = df[~df["ClientIPAddress"].str.contains(exclude_pattern, regex=True, case=False, na=False)]
-    
-    # Date range filter
-    if params.get("start_date") and params.get("end_date"):
-        df = filter_by_date(df, params["start_date"], params["end_date"])
-    
-    return df
-
-def filter_detailed_operations(detailed_ops: list[dict[str, Any]], params: dict[str, Any]) -> list[dict[str, Any]]:
-    """Filter detailed operations based on user parameters."""
-    filtered_ops = detailed_ops
-    
-    # User filter
-    if params.get("user"):
-        user_filter = params["user"].lower()
-        filtered_ops = [op for op in filtered_ops 
-                       if user_filter in (op.get("user", "").lower())]
-    
-    # Actions filter
-    if params.get("actions"):
-        actions_list = [a.strip() for a in params["actions"].split(",")]
-        filtered_ops = [op for op in filtered_ops 
-                       if op.get("operation") in actions_list]
-    
-    # IP filter - requires checking full_data
-    if params.get("ips"):
-        ip_filter = params["ips"]
-        ip_pattern = ip_filter.replace("*", ".*").replace(".", r"\.")
-        pattern = re.compile(ip_pattern, re.IGNORECASE)
-        filtered_ops = [op for op in filtered_ops 
-                       if op.get("full_data") and 
-                           pattern.search(op["full_data"].get("ClientIPAddress", ""))]
-    
-    # Exclude IPs
-    if params.get("exclude_ips"):
-        exclude_filter = params["exclude_ips"]
-        exclude_pattern = exclude_filter.replace("*", ".*").replace(".", r"\.")
-        pattern = re.compile(exclude_pattern, re.IGNORECASE)
-        filtered_ops = [op for op in filtered_ops 
-                       if not (op.get("full_data") and 
-                              pattern.search(op["full_data"].get("ClientIPAddress", "")))]
-    
-    # Date range filter
-    if params.get("start_date") and params.get("end_date"):
-        try:
-            start_date = datetime.strptime(params["start_date"], "%Y-%m-%d").date()
-            end_date = datetime.strptime(params["end_date"], "%Y-%m-%d").date()
-            filtered_ops = [op for op in filtered_ops
-                           if start_date <= datetime.fromisoformat(op.get("timestamp", "")).date() <= end_date]
-        except (ValueError, AttributeError):
-            pass
-    
-    return filtered_ops
 
 def analyze_file_operations(session: AnalysisSession, params: dict[str, Any]) -> dict[str, Any]:
-    """Analyze file operations with detailed breakdown."""
-    df = session.df
-    
-    # Apply filters
-    df = apply_filters(df, params)
+    """Analyze file operations with detailed breakdown.
+
+    Per-file and per-user breakdowns come from grouped aggregations over the filtered events
+    rather than from a scan of the events for each file or user listed.
+    """
+    # Apply filters, segment by segment
+    df = session.filtered(params)
 
     # Get summary statistics
     total_operations = len(df)
@@ -402,39 +762,59 @@ def analyze_file_operations(session: AnalysisSession, params: dict[str, Any]) ->
     top_files = {}
     files_by_user = {}
     if "SourceFileName" in df.columns and "UserId" in df.columns:
-        top_files = df["SourceFileName"].value_counts().head(15).to_dict()
-        
+        file_counts = df["SourceFileName"].value_counts()
+        top_files = file_counts.head(TOP_FILES).to_dict()
+
         # Get files and users accessing them
-        for file in df["SourceFileName"].unique()[:10]:
-            file_df = df[df["SourceFileName"] == file]
+        files = df["SourceFileName"].dropna().unique()[:FILES_DETAILED]
+        columns = [c for c in ("SourceFileName", "UserId", "Operation") if c in df.columns]
+        file_df = df.loc[df["SourceFileName"].isin(files), columns]
+        users_by_file: dict[Any, list[Any]] = {}
+        pairs = file_df[["SourceFileName", "UserId"]].drop_duplicates()
+        for file, user in pairs.itertuples(index=False):
+            users = users_by_file.setdefault(file, [])
+            if len(users) < USERS_PER_FILE:
+                users.append(user)
+        operations_by_file = grouped_counts(file_df, "SourceFileName", "Operation")
+        for file in files:
             files_by_user[file] = {
-                "count": len(file_df),
-                "users": file_df["UserId"].unique().tolist()[:5],
-                "operations": file_df["Operation"].value_counts().to_dict()
+                "count": int(file_counts.get(file, 0)),
+                "users": users_by_file.get(file, []),
+                "operations": operations_by_file.get(file, {}),
             }
 
     # Get operation breakdown
     operations_breakdown = {}
     operations_by_user = {}
     if "Operation" in df.columns:
-        operations_breakdown = df["Operation"].value_counts().to_dict()
-        
+        operations_breakdown = value_counts(df["Operation"]).to_dict()
+
         # Get operations by user
         if "UserId" in df.columns:
-            for user in df["UserId"].unique()[:10]:
-                user_df = df[df["UserId"] == user]
-                operations_by_user[user] = user_df["Operation"].value_counts().to_dict()
+            users = df["UserId"].dropna().unique()[:USERS_DETAILED]
+            user_df = df.loc[df["UserId"].isin(users), ["UserId", "Operation"]]
+            user_operations = grouped_counts(user_df, "UserId", "Operation")
+            for user in users:
+                operations_by_user[user] = user_operations.get(user, {})
 
     # Get users with most operations
     top_users_detail = {}
     if "UserId" in df.columns:
-        for user in df["UserId"].value_counts().head(10).index:
-            user_df = df[df["UserId"] == user]
+        user_counts = value_counts(df["UserId"]).head(USERS_DETAILED)
+        columns = [c for c in ("UserId", "Operation", "SourceFileName") if c in df.columns]
+        user_df = df.loc[df["UserId"].isin(user_counts.index), columns]
+        user_operations = grouped_counts(user_df, "UserId", "Operation")
+        user_files = (
+            user_df.groupby("UserId", observed=True)["SourceFileName"].nunique()
+            if "SourceFileName" in user_df.columns
+            else pd.Series(dtype=int)
+        )
+        for user, count in user_counts.items():
             display_name = session.config.user_mapping.get(user, user)
             top_users_detail[display_name] = {
-                "count": len(user_df),
-                "operations": user_df["Operation"].value_counts().to_dict(),
-                "files": user_df["SourceFileName"].nunique() if "SourceFileName" in user_df.columns else 0
+                "count": int(count),
+                "operations": user_operations.get(user, {}),
+                "files": int(user_files.get(user, 0)),
             }
 
     return {
@@ -450,12 +830,14 @@ def analyze_file_operations(session: AnalysisSession, params: dict[str, Any]) ->
         "top_users_detail": top_users_detail,
     }
 
+
 def analyze_user_activity(session: AnalysisSession, params: dict[str, Any]) -> dict[str, Any]:
-    """Analyze user activity with detailed statistics."""
-    df = session.df
-    
-    # Apply filters
-    df = apply_filters(df, params)
+    """Analyze user activity with detailed statistics.
+
+    Statistics for every user listed come from one grouped aggregation over the filtered events.
+    """
+    # Apply filters, segment by segment
+    df = session.filtered(params)
 
     # Get top users
     top_users = {}
@@ -463,34 +845,44 @@ def analyze_user_activity(session: AnalysisSession, params: dict[str, Any]) -> d
     user_activity_timeline = {}
 
     if "UserId" in df.columns:
-        user_activity = df["UserId"].value_counts().head(15).to_dict()
+        user_activity = value_counts(df["UserId"]).head(TOP_USERS).to_dict()
         for user, count in user_activity.items():
             display_name = session.config.user_mapping.get(user, user)
             top_users[display_name] = int(count)
 
     # Get detailed user statistics
     if "UserId" in df.columns:
-        for user in df["UserId"].unique()[:20]:
-            user_df = df[df["UserId"] == user]
+        users = df["UserId"].dropna().unique()[:USERS_WITH_STATS]
+        columns = ["UserId", "Operation", "SourceFileName", "CreationDate"]
+        user_df = df.loc[df["UserId"].isin(users), [c for c in columns if c in df.columns]]
+
+        aggregations = {"operations": ("UserId", "size")}
+        if "SourceFileName" in user_df.columns:
+            aggregations["unique_files"] = ("SourceFileName", "nunique")
+        if "CreationDate" in user_df.columns:
+            aggregations["first_action"] = ("CreationDate", "min")
+            aggregations["last_action"] = ("CreationDate", "max")
+        grouped = user_df.groupby("UserId", observed=True, sort=False).agg(**aggregations)
+        stats_by_user = grouped.to_dict("index")
+        user_operations = (
+            grouped_counts(user_df, "UserId", "Operation") if "Operation" in user_df.columns else {}
+        )
+
+        for user in users:
             display_name = session.config.user_mapping.get(user, user)
-            
+            user_stats = stats_by_user.get(user, {})
+
             stats = {
-                "operations": len(user_df),
-                "unique_files": user_df["SourceFileName"].nunique()
-                if "SourceFileName" in user_df.columns
-                else 0,
-                "first_action": str(user_df["CreationDate"].min())
-                if "CreationDate" in user_df.columns
-                else "",
-                "last_action": str(user_df["CreationDate"].max())
-                if "CreationDate" in user_df.columns
-                else "",
+                "operations": int(user_stats.get("operations", 0)),
+                "unique_files": int(user_stats.get("unique_files", 0)),
+                "first_action": str(user_stats.get("first_action", "")),
+                "last_action": str(user_stats.get("last_action", "")),
             }
-            
+
             # Add operation breakdown per user
             if "Operation" in user_df.columns:
-                stats["operations_breakdown"] = user_df["Operation"].value_counts().to_dict()
-            
+                stats["operations_breakdown"] = user_operations.get(user, {})
+
             user_detailed_stats[display_name] = stats
 
     return {
@@ -499,308 +891,97 @@ def analyze_user_activity(session: AnalysisSession, params: dict[str, Any]) -> d
         "user_activity_timeline": user_activity_timeline,
     }
 
+
 def analyze_exchange(session: AnalysisSession, params: dict[str, Any]) -> dict[str, Any]:
-    """Analyze exchange activity with detailed breakdown."""
-    df = session.df.copy()
-    
-    # Apply filters
-    df = apply_filters(df, params)
-
-    exchange_stats = {
-        "total_operations": len(df),
-        "unique_mailboxes": 0,
-        "operations_by_type": {},
-        "operations_by_user": {},
-        "detailed_operations": [],
-        "operation_details": {},
-    }
+    """Analyze exchange activity with detailed breakdown.
 
-    # Extract user info from AuditData JSON if needed
-    users_by_operation = {}
-    unique_mailboxes = set()
-    operation_details_by_type: dict[str, list[dict[str, Any]]] = {}
-
-    for _, row in df.iterrows():
-        operation = row.get("Operation", "Unknown")
-        
-        # Try to get user info from different column sources
-        user = None
-        if "MailboxOwnerUPN" in df.columns and pd.notna(row.get("MailboxOwnerUPN")):
-            user = row.get("MailboxOwnerUPN")
-        elif "UserId" in df.columns and pd.notna(row.get("UserId")):
-            user = row.get("UserId")
-        
-        # Extract detailed info from AuditData JSON
-        email_details_list: list[dict[str, Any]] = []
-        timestamp = None
-        
-        if "AuditData" in df.columns and pd.notna(row.get("AuditData")):
-            try:
-                audit_data = json.loads(row.get("AuditData", "{}"))
-                timestamp = audit_data.get("CreationTime", "")
-                
-                # Extract user from AuditData if not found in columns
-                if not user:
-                    if "MailboxOwnerUPN" in audit_data:
-                        user = audit_data["MailboxOwnerUPN"]
-                    elif "UserId" in audit_data:
-                        user = audit_data["UserId"]
-                
-                # Special handling for MailItemsAccessed with Folders structure
-                if operation == "MailItemsAccessed" and "Folders" in audit_data and audit_data["Folders"]:
-                    # Extract items from Folders array - limit to max 3 items per operation for performance
-                    item_count = 0
-                    for folder_item in audit_data["Folders"]:
-                        folder_path = folder_item.get("Path", "")
-                        folder_items = folder_item.get("FolderItems", [])
-                        
-                        for item in folder_items:
-                            if item_count >= 3:
-                                break
-                            email_details = {
-                                "timestamp": timestamp,
-                                "subject": item.get("Subject", ""),
-                                "folder": folder_path,
-                                "size": item.get("SizeInBytes", 0),
-                            }
-                            email_details_list.append(email_details)
-                            item_count += 1
-                        if item_count >= 3:
-                            break
-                # Special handling for New-InboxRule and Set-InboxRule - extract from Parameters
-                elif operation in ["New-InboxRule", "Set-InboxRule"] and "Parameters" in audit_data:
-                    parameters = audit_data.get("Parameters", [])
-                    param_dict = {}
-                    if isinstance(parameters, list):
-                        for param in parameters:
-                            if isinstance(param, dict):
-                                param_dict[param.get("Name", "")] = param.get("Value", "")
-                    
-                    # Extract relevant parameters
-                    rule_name = param_dict.get("Name", "")
-                    rule_from = param_dict.get("From", "")
-                    rule_id = param_dict.get("Identity", "")
-                    
-                    if rule_name or rule_from:
-                        email_details = {
-                            "timestamp": timestamp,
-                            "subject": f"Rule: {rule_name}" if rule_name else "Inbox Rule Change",
-                            "folder": f"From: {rule_from}" if rule_from else rule_id or "N/A",
-                            "size": 0,
-                        }
-                        email_details_list.append(email_details)
-                else:
-                    # Original logic for other operations
-                    subject = audit_data.get("Subject")
-                    folder = ""
-                    size = 0
-                    
-                    # Try Item field first (for SendAs, Send, MailItemsAccessed when Item present)
-                    if "Item" in audit_data:
-                        item = audit_data["Item"]
-                        subject = subject or item.get("Subject", "")
-                        folder = item.get("ParentFolder", {}).get("Path", "")
-                        size = item.get("SizeInBytes", 0)
-                    # Otherwise try AffectedItems (for HardDelete, SoftDelete, Move, etc.)
-                    elif "AffectedItems" in audit_data and audit_data["AffectedItems"]:
-                        affected_item = audit_data["AffectedItems"][0]
-                        subject = subject or affected_item.get("Subject", "")
-                        folder = affected_item.get("ParentFolder", {}).get("Path", "")
-                        size = affected_item.get("SizeInBytes", 0)
-                    
-                    if subject or folder or size:
-                        email_details = {
-                            "timestamp": timestamp,
-                            "subject": subject or "",
-                            "folder": folder,
-                            "size": size,
-                        }
-                        email_details_list.append(email_details)
-                    
-            except (json.JSONDecodeError, TypeError):
-                pass
-        
-        if user:
-            unique_mailboxes.add(user)
-            if operation not in users_by_operation:
-                users_by_operation[operation] = {}
-            if user not in users_by_operation[operation]:
-                users_by_operation[operation][user] = 0
-            users_by_operation[operation][user] += 1
-            
-            # Store operation details for display in accordion
-            if operation not in operation_details_by_type:
-                operation_details_by_type[operation] = []
-            
-            # Add all email details extracted
-            operation_details_by_type[operation].extend(email_details_list)
-
-    exchange_stats["unique_mailboxes"] = len(unique_mailboxes)
-
-    # Get operations by type
-    if "Operation" in df.columns:
-        exchange_stats["operations_by_type"] = df["Operation"].value_counts().to_dict()
-
-    # Get operations by user with details
-    user_operations: dict[str, dict[str, int]] = {}
-    for operation, users_dict in users_by_operation.items():
-        for user, count in users_dict.items():
-            if user not in user_operations:
-                user_operations[user] = {}
-            user_operations[user][operation] = count
-    
-    # Populate operations_by_user
-    for user, operations_dict in user_operations.items():
-        display_name = session.config.user_mapping.get(user, user)
-        exchange_stats["operations_by_user"][display_name] = {
-            "total": sum(operations_dict.values()),
-            "operations": operations_dict
+    Unfiltered requests are answered from the session's running totals, so only segments added
+    since the last request are scanned.
+    """
+    if not has_filters(params):
+        return session.exchange_activity.result(session.config.user_mapping)
+
+    activity = ExchangeActivity()
+    for segment in session.segments:
+        activity.update(apply_filters(segment, params, logger))
+    return activity.result(session.config.user_mapping)
+
+
+def analyze_patterns(session: AnalysisSession, params: dict[str, Any]) -> dict[str, Any]:
+    """Count how often users, operations, and IPs occur together in the Exchange timeline.
+
+    Takes the timeline filters, and `limit` for the number of most frequent combinations listed
+    per table. Each table also gives its number of distinct combinations. `actions` may be given
+    as a list or comma-separated, and `user` is the pattern the other analyses filter users with.
+    """
+    timeline = session.timeline
+
+    # The timeline filters have no user pattern, so its rows are found as the other analyses do
+    rows = None
+    if params.get("user"):
+        selections = []
+        for segment in session.segments:
+            selected = filter_rows(segment, {"user": params["user"]}, logger)
+            if selected is None:
+                selected = np.arange(len(segment.df))
+            selections.append(segment.offset + selected)
+        rows = np.concatenate(selections) if selections else np.empty(0, dtype=np.int64)
+
+    mask = timeline_mask(timeline, params, rows)
+    limit = min(max(int(params.get("limit") or PATTERNS_LIMIT), 1), MAX_PAGE_SIZE)
+
+    tables = {}
+    for name, fields in PATTERN_TABLES.items():
+        top, combinations = timeline.counts(fields, mask, limit)
+        tables[name] = {
+            "fields": list(fields),
+            "combinations": combinations,
+            "top": top.to_dict("records"),
         }
 
-    # Store operation details (max 100 per operation for performance)
-    for op_type, details_list in operation_details_by_type.items():
-        exchange_stats["operation_details"][op_type] = details_list[:100]
-
-    # Build complete timeline of operations (chronological)
-    detailed_ops = []
-    for _, row in df.iterrows():
-        operation = row.get("Operation", "Unknown")
-        user = None
-        if "MailboxOwnerUPN" in df.columns and pd.notna(row.get("MailboxOwnerUPN")):
-            user = row.get("MailboxOwnerUPN")
-        elif "UserId" in df.columns and pd.notna(row.get("UserId")):
-            user = row.get("UserId")
-        
-        # Extract IP from the row directly (support multiple field names)
-        client_ip = (row.get("ClientIP") or row.get("ClientIPAddress") or 
-                     row.get("client_ip") or row.get("SenderIp") or "")
-        
-        if "AuditData" in df.columns and pd.notna(row.get("AuditData")):
-            try:
-                audit_data = json.loads(row.get("AuditData", "{}"))
-                timestamp = audit_data.get("CreationTime", "")
-                
-                # If IP not found in row columns, try to get from AuditData
-                if not client_ip:
-                    client_ip = (audit_data.get("ClientIP") or audit_data.get("ClientIPAddress") or 
-                                audit_data.get("client_ip") or audit_data.get("SenderIp") or "")
-                
-                # Special handling for MailItemsAccessed with Folders structure
-                if operation == "MailItemsAccessed" and "Folders" in audit_data and audit_data["Folders"]:
-                    # For timeline, limit to one representative item per operation
-                    for folder_item in audit_data["Folders"]:
-                        folder_path = folder_item.get("Path", "")
-                        folder_items = folder_item.get("FolderItems", [])
-                        
-                        if folder_items and user:
-                            # Only take the first item for timeline (performance)
-                            item = folder_items[0]
-                            detailed_ops.append({
-                                "timestamp": timestamp,
-                                "operation": operation,
-                                "subject": item.get("Subject", ""),
-                                "folder": folder_path,
-                                "user": user,
-                                "Workload": audit_data.get("Workload", ""),
-                                "ClientIP": client_ip,
-                                "full_data": audit_data  # Ajouter les données complètes
-                            })
-                            # Only one item per operation in timeline
-                            break
-                # Special handling for New-InboxRule and Set-InboxRule
-                elif operation in ["New-InboxRule", "Set-InboxRule"] and user:
-                    parameters = audit_data.get("Parameters", [])
-                    param_dict = {}
-                    if isinstance(parameters, list):
-                        for param in parameters:
-                            if isinstance(param, dict):
-                                param_dict[param.get("Name", "")] = param.get("Value", "")
-                    
-                    rule_name = param_dict.get("Name", "")
-                    rule_from = param_dict.get("From", "")
-                    
-                    subject = f"Rule: {rule_name}" if rule_name else "Inbox Rule"
-                    folder = f"From: {rule_from}" if rule_from else ""
-                    
-                    detailed_ops.append({
-                        "timestamp": timestamp,
-                        "operation": operation,
-                        "subject": subject,
-                        "folder": folder,
-                        "user": user,
-                        "Workload": audit_data.get("Workload", ""),
-                        "ClientIP": client_ip,
-                        "full_data": audit_data  # Ajouter les données complètes
-                    })
-                else:
-                    # Original logic for other operations
-                    subject = audit_data.get("Subject", "")
-                    folder = ""
-                    
-                    # Extract subject from Item or AffectedItems
-                    if "Item" in audit_data:
-                        subject = subject or audit_data["Item"].get("Subject", "")
-                        folder = audit_data["Item"].get("ParentFolder", {}).get("Path", "")
-                    elif "AffectedItems" in audit_data and audit_data["AffectedItems"]:
-                        subject = subject or audit_data["AffectedItems"][0].get("Subject", "")
-                        folder = audit_data["AffectedItems"][0].get("ParentFolder", {}).get("Path", "")
-                    
-                    if user:
-                        detailed_ops.append({
-                            "timestamp": timestamp,
-                            "operation": operation,
-                            "subject": subject,
-                            "folder": folder,
-                            "user": user,
-                            "Workload": audit_data.get("Workload", ""),
-                            "ClientIP": client_ip,
-                            "full_data": audit_data  # Ajouter les données complètes
-                        })
-                
-            except (json.JSONDecodeError, TypeError):
-                pass
-    
-    # Sort by timestamp (descending - most recent first)
-    detailed_ops.sort(key=lambda x: x["timestamp"], reverse=True)
-    
-    # Apply detailed filters to operations timeline
-    detailed_ops = filter_detailed_operations(detailed_ops, params)
-    
-    exchange_stats["detailed_operations"] = detailed_ops
-
-    return exchange_stats
+    return {
+        "total": len(timeline) if mask is None else int(mask.sum()),
+        "tables": tables,
+    }
+
 
 def analyze_summary(session: AnalysisSession) -> dict[str, Any]:
     """Get overall summary."""
-    df = session.df
-    log_type = detect_log_type(df)
+    # Every segment of a session comes from the same kind of log, so the first and last ones
+    # are enough for the columns and date range
+    first = session.segments[0].df
+    last = session.segments[-1].df
 
+    # Detect the log type from the file's own columns, not the decoded ones added at parsing
+    source_columns = session.segments[0].source_columns
+    log_type = detect_log_type(pd.DataFrame(columns=source_columns))
+
+    memory_usage = sum(frame_memory(segment.df) for segment in session.segments)
     summary = {
         "log_type": log_type,
-        "total_records": len(df),
-        "columns": list(df.columns),
+        "total_records": session.rows,
+        "columns": list(source_columns),
         "date_range": {
-            "start": str(df.iloc[0].get("CreationDate", "")) if len(df) > 0 else "",
-            "end": str(df.iloc[-1].get("CreationDate", "")) if len(df) > 0 else "",
+            "start": str(first.iloc[0].get("CreationDate", "")) if len(first) > 0 else "",
+            "end": str(last.iloc[-1].get("CreationDate", "")) if len(last) > 0 else "",
         },
         "file_info": {
-            "memory_usage": str(df.memory_usage(deep=True).sum() / 1024 / 1024) + " MB",
+            "memory_usage": str(memory_usage / 1024 / 1024) + " MB",
         },
     }
 
     return summary
 
-def filter_by_date(df: DataFrame, start_date: str, end_date: str) -> DataFrame:
-    """Filter dataframe by date range."""
-    try:
-        if "CreationDate" in df.columns:
-            df["CreationDate"] = pd.to_datetime(df["CreationDate"])
-            df = df[
-                (df["CreationDate"] >= start_date) & (df["CreationDate"] <= end_date)
-            ]
-    except Exception as e:
-        logger.error(f"Date filtering error: {e}")
-    return df
+
+# Analyses served by the analysis endpoint, each given the session and the request parameters
+ANALYSES: dict[str, Callable[[AnalysisSession, dict[str, Any]], dict[str, Any]]] = {
+    "file_operations": analyze_file_operations,
+    "user_activity": analyze_user_activity,
+    "exchange": analyze_exchange,
+    "summary": lambda session, _params: analyze_summary(session),
+    "patterns": analyze_patterns,
+}
+
 
 @app.errorhandler(413)
 def request_entity_too_large(error: Any) -> tuple[dict[str, str], int]:
@@ -819,9 +1000,28 @@ def internal_error(error: Any) -> tuple[dict[str, str], int]:
     return {"error": "Internal server error"}, 500
 
 
-def run_flask_app(host: str = "0.0.0.0", port: int = 5000, debug: bool = False) -> None:
-    """Run the Flask application."""
-    app.run(host=host, port=port, debug=debug)
+def run_flask_app(
+    host: str = "0.0.0.0", port: int = 5000, debug: bool = False, workers: int | None = None
+) -> None:
+    """Run the Flask application.
+
+    With more than one worker, the app is served from pre-forked gunicorn processes sharing their
+    sessions, instead of the Werkzeug development server.
+    """
+    global jobs, sessions
+
+    workers = workers or app.config["WEB_WORKERS"]
+    if workers <= 1:
+        app.run(host=host, port=port, debug=debug)
+        return
+
+    if not app.config["SHARED_SESSIONS"]:
+        app.config["SHARED_SESSIONS"] = True
+        sessions = create_session_store(shared=True)
+        jobs = JobQueue(create_index("jobs", shared=True), app.config["JOB_WORKERS"], logger)
+    shared_dir = app.config["SESSION_SHARED_DIR"]
+    logger.info(f"Serving with {workers} workers sharing sessions in {shared_dir}")
+    serve(app, host, port, workers, loglevel="debug" if debug else "info")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,30 @@
+"""Audit log ingestion and decoding.
+
+This module provides functionality for loading Purview audit log exports and decoding their AuditData JSON payloads into analysis-ready columns in a single pass, serially or across a process pool, either all at once or as a stream of fixed-size chunks feeding incremental summaries. Logs can be plain CSVs or gzip, zstd, or zip compressed, and are decompressed as they are parsed. Uploads are read straight from the multipart request body and spooled to disk, where they can be parsed while the rest of them is still arriving. Prepared frames can be cached as Parquet keyed by file contents, so repeated runs against the same export skip parsing.
+"""  # noqa: D212, D415, W505
+
+from __future__ import annotations
+
+from .aggregates import ExchangeSummary, FileSummary, NetworkSummary, RunningSummary, UserSummary
+from .archive import SUPPORTED_SUFFIXES, ZSTD_AVAILABLE, is_supported_log, iter_csv_members
+from .cache import (
+    PARSER_VERSION,
+    PYARROW_AVAILABLE,
+    FrameCache,
+    frame_to_table,
+    table_to_frame,
+)
+from .decoder import (
+    AUDIT_FIELDS,
+    CATEGORICAL_COLUMNS,
+    PARALLEL_BATCH_SIZE,
+    AuditField,
+    categorize,
+    decode_audit_data,
+    decode_pool,
+    extract_fields,
+    extract_fields_parallel,
+    parse_audit_record,
+)
+from .multipart import MultipartStream, UploadPart, UploadSpool
+from .streaming import DEFAULT_CHUNK_SIZE, iter_audit_chunks, read_audit_log
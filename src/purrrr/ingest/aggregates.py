@@ -0,0 +1,175 @@
+# type: ignore[reportAssignmentType]
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from collections import Counter
+from dataclasses import dataclass, field, fields
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from pandas import DataFrame, Series, Timestamp
+
+
+def _count(series: Series) -> dict[Any, int]:
+    """Count the non-null values of a column."""
+    counts = series.value_counts()
+    return counts[counts > 0].to_dict()
+
+
+def _count_pairs(df: DataFrame, columns: list[str]) -> dict[tuple[Any, ...], int]:
+    """Count the co-occurring non-null values of several columns."""
+    return df.groupby(columns, observed=True).size().to_dict()
+
+
+@dataclass
+class RunningSummary(ABC):
+    """Base class for aggregates that are updated chunk by chunk and can be merged."""
+
+    events: int = 0
+
+    @abstractmethod
+    def update(self, df: DataFrame) -> None:
+        """Fold a chunk of events into the running totals."""
+
+    def merge(self, other: RunningSummary) -> None:
+        """Merge the totals of another summary of the same type into this one."""
+        for summary_field in fields(self):
+            mine = getattr(self, summary_field.name)
+            theirs = getattr(other, summary_field.name)
+            if isinstance(mine, (Counter, int)):
+                setattr(self, summary_field.name, mine + theirs)
+
+
+@dataclass
+class FileSummary(RunningSummary):
+    """Running totals for SharePoint and OneDrive file actions."""
+
+    operations: Counter[str] = field(default_factory=Counter)
+    files: Counter[str] = field(default_factory=Counter)
+    user_operations: Counter[tuple[str, str]] = field(default_factory=Counter)
+
+    def update(self, df: DataFrame) -> None:
+        """Fold a chunk of file actions into the running totals."""
+        if df.empty:
+            return
+        self.events += len(df)
+        self.operations.update(_count(df["Operation"]))
+        self.files.update(_count(df["SourceFileName"]))
+        self.user_operations.update(_count_pairs(df, ["UserId", "Operation"]))
+
+    def users_for(self, operation: str) -> Counter[str]:
+        """Get the per-user counts for a single operation."""
+        return Counter(
+            {user: count for (user, op), count in self.user_operations.items() if op == operation}
+        )
+
+    def users_matching(self, keyword: str) -> Counter[str]:
+        """Get the per-user counts for all operations containing a keyword."""
+        counts: Counter[str] = Counter()
+        for (user, op), count in self.user_operations.items():
+            if keyword in str(op):
+                counts[user] += count
+        return counts
+
+
+@dataclass
+class NetworkSummary(RunningSummary):
+    """Running totals for client IP addresses and user agents."""
+
+    ips: Counter[str] = field(default_factory=Counter)
+    ip_users: Counter[tuple[str, str]] = field(default_factory=Counter)
+    user_agents: Counter[str] = field(default_factory=Counter)
+    user_agent_users: Counter[tuple[str, str]] = field(default_factory=Counter)
+
+    def update(self, df: DataFrame) -> None:
+        """Fold a chunk of events into the running totals."""
+        if df.empty:
+            return
+        self.events += len(df)
+        self.ips.update(_count(df["ClientIP"]))
+        self.ip_users.update(_count_pairs(df, ["ClientIP", "UserId"]))
+
+        if "UserAgent" in df.columns:
+            agents = df[df["UserAgent"].notna() & (df["UserAgent"] != "")]
+            self.user_agents.update(_count(agents["UserAgent"]))
+            self.user_agent_users.update(_count_pairs(agents, ["UserAgent", "UserId"]))
+
+    def users_for_ip(self, ip: str) -> Counter[str]:
+        """Get the per-user counts for a single IP address."""
+        return Counter({user: count for (addr, user), count in self.ip_users.items() if addr == ip})
+
+    def users_for_agent(self, agent: str) -> Counter[str]:
+        """Get the per-user counts for a single user agent."""
+        return Counter(
+            {user: count for (ua, user), count in self.user_agent_users.items() if ua == agent}
+        )
+
+
+@dataclass
+class UserSummary(RunningSummary):
+    """Running totals and first/last activity for each user."""
+
+    users: Counter[str] = field(default_factory=Counter)
+    first_seen: dict[str, Timestamp] = field(default_factory=dict)
+    last_seen: dict[str, Timestamp] = field(default_factory=dict)
+
+    def update(self, df: DataFrame) -> None:
+        """Fold a chunk of events into the running totals."""
+        if df.empty:
+            return
+        self.events += len(df)
+        self.users.update(_count(df["UserId"]))
+
+        dates = df.groupby("UserId", observed=True)["CreationDate"].agg(["min", "max"])
+        self._merge_dates(dates["min"].to_dict(), dates["max"].to_dict())
+
+    def merge(self, other: UserSummary) -> None:
+        """Merge the totals of another user summary into this one."""
+        super().merge(other)
+        self._merge_dates(other.first_seen, other.last_seen)
+
+    def _merge_dates(self, first_seen: dict[str, Timestamp], last_seen: dict[str, Timestamp]) -> None:
+        for user, date in first_seen.items():
+            if user not in self.first_seen or date < self.first_seen[user]:
+                self.first_seen[user] = date
+        for user, date in last_seen.items():
+            if user not in self.last_seen or date > self.last_seen[user]:
+                self.last_seen[user] = date
+
+
+@dataclass
+class ExchangeSummary(RunningSummary):
+    """Running totals for Exchange mailbox activity."""
+
+    user_operations: Counter[tuple[str, str]] = field(default_factory=Counter)
+    client_info: Counter[str] = field(default_factory=Counter)
+    start: Timestamp | None = None
+    end: Timestamp | None = None
+
+    def update(self, df: DataFrame) -> None:
+        """Fold a chunk of Exchange events into the running totals."""
+        if df.empty:
+            return
+        self.events += len(df)
+        self.user_operations.update(_count_pairs(df, ["UserId", "Operation"]))
+        self.client_info.update(_count(df["ClientInfoString"].fillna("")))
+        self._merge_range(df["CreationDate"].min(), df["CreationDate"].max())
+
+    def merge(self, other: ExchangeSummary) -> None:
+        """Merge the totals of another Exchange summary into this one."""
+        super().merge(other)
+        if other.start is not None:
+            self._merge_range(other.start, other.end)
+
+    def _merge_range(self, start: Timestamp, end: Timestamp) -> None:
+        self.start = start if self.start is None else min(self.start, start)
+        self.end = end if self.end is None else max(self.end, end)
+
+    @property
+    def users(self) -> Counter[str]:
+        """Get the total event count for each user."""
+        counts: Counter[str] = Counter()
+        for (user, _), count in self.user_operations.items():
+            counts[user] += count
+        return counts
@@ -0,0 +1,232 @@
+# type: ignore[reportAssignmentType]
+
+from __future__ import annotations
+
+import gzip
+import io
+import os
+import struct
+import zlib
+from typing import TYPE_CHECKING, Any, BinaryIO
+
+try:
+    import zstandard
+
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+# File name suffixes accepted for audit logs, plain or compressed
+SUPPORTED_SUFFIXES = (".csv", ".csv.gz", ".zip", ".csv.zst")
+
+# Bytes read from the compressed source at a time
+ARCHIVE_READ_SIZE = 64 * 1024
+
+# Zip record signatures and layouts
+_LOCAL_HEADER = b"PK\x03\x04"
+_DATA_DESCRIPTOR = b"PK\x07\x08"
+_LOCAL_HEADER_STRUCT = struct.Struct("<HHHHHIIIHH")
+_ZIP64_EXTRA_ID = 0x0001
+_ZIP64_LIMIT = 0xFFFFFFFF
+_FLAG_ENCRYPTED = 0x01
+_FLAG_DATA_DESCRIPTOR = 0x08
+_FLAG_UTF8 = 0x800
+_STORED = 0
+_DEFLATED = 8
+
+
+def is_supported_log(filename: str) -> bool:
+    """Check whether a file name has a plain or compressed CSV suffix we can read."""
+    return filename.lower().endswith(SUPPORTED_SUFFIXES)
+
+
+def iter_csv_members(source: Any, name: str | None = None) -> Iterator[BinaryIO]:
+    """Yield a decompressed binary stream for each CSV in a plain or compressed audit log.
+
+    The source is a path or a readable binary file, with `name` giving the file name when the
+    source is a stream. Decompression happens on the fly as the streams are read, so nothing is
+    inflated to disk. Zip archives may hold several CSVs, such as a set of daily exports; members
+    are yielded in archive order and must be read before moving on to the next one.
+
+    Raises:
+        ValueError: If the archive is encrypted, uses an unsupported compression method, or is
+            zstd-compressed without the zstandard package installed.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        name = os.fspath(source) if name is None else name
+        with open(source, "rb") as f:
+            yield from iter_csv_members(f, name)
+        return
+
+    suffix = (name or "").lower()
+    if suffix.endswith(".gz"):
+        with gzip.GzipFile(fileobj=source, mode="rb") as member:
+            yield member
+    elif suffix.endswith(".zst"):
+        if not ZSTD_AVAILABLE:
+            msg = "The zstandard package is required to read .zst files"
+            raise ValueError(msg)
+        with zstandard.ZstdDecompressor().stream_reader(source, read_across_frames=True) as member:
+            yield member
+    elif suffix.endswith(".zip"):
+        yield from _iter_zip_csvs(source)
+    else:
+        yield source
+
+
+def _iter_zip_csvs(source: BinaryIO) -> Iterator[BinaryIO]:
+    """Yield the CSV members of a zip archive read front to back, skipping everything else."""
+    reader = _PushbackReader(source)
+    while reader.peek(4) == _LOCAL_HEADER:
+        reader.read_exact(4)
+        member = _ZipMember(reader)
+        if member.filename.lower().endswith(".csv"):
+            yield io.BufferedReader(member, ARCHIVE_READ_SIZE)
+        member.drain()
+
+
+class _PushbackReader:
+    """Read from a non-seekable stream, with the ability to return unused bytes to it."""
+
+    def __init__(self, source: BinaryIO) -> None:
+        self._source = source
+        self._pending = b""
+
+    def read_some(self, size: int) -> bytes:
+        if self._pending:
+            data, self._pending = self._pending[:size], self._pending[size:]
+            return data
+        return self._source.read(size)
+
+    def read_exact(self, size: int) -> bytes:
+        data = b""
+        while len(data) < size:
+            if not (more := self.read_some(size - len(data))):
+                msg = "Zip archive ended unexpectedly"
+                raise ValueError(msg)
+            data += more
+        return data
+
+    def peek(self, size: int) -> bytes:
+        while len(self._pending) < size:
+            if not (more := self._source.read(size - len(self._pending))):
+                break
+            self._pending += more
+        return self._pending[:size]
+
+    def unread(self, data: bytes) -> None:
+        self._pending = data + self._pending
+
+
+class _ZipMember(io.RawIOBase):
+    """The decompressed data of one zip member, read straight after its local header.
+
+    Deflated members find their own end, so archives written in streaming mode (with sizes in a
+    trailing data descriptor rather than the header) can be read without the central directory.
+    """
+
+    def __init__(self, reader: _PushbackReader) -> None:
+        super().__init__()
+        self._reader = reader
+        (
+            _version,
+            self._flags,
+            self._method,
+            _time,
+            _date,
+            self._crc,
+            self._remaining,
+            size,
+            name_length,
+            extra_length,
+        ) = _LOCAL_HEADER_STRUCT.unpack(reader.read_exact(_LOCAL_HEADER_STRUCT.size))
+
+        raw_name = reader.read_exact(name_length)
+        self.filename = raw_name.decode("utf-8" if self._flags & _FLAG_UTF8 else "cp437")
+        self._zip64, zip64_size = _read_zip64_extra(reader.read_exact(extra_length), size)
+        if self._remaining == _ZIP64_LIMIT and zip64_size is not None:
+            self._remaining = zip64_size
+
+        if self._flags & _FLAG_ENCRYPTED:
+            msg = f"Encrypted zip member '{self.filename}' is not supported"
+            raise ValueError(msg)
+        if self._method == _STORED and self._flags & _FLAG_DATA_DESCRIPTOR:
+            msg = f"Stored zip member '{self.filename}' has no size and cannot be streamed"
+            raise ValueError(msg)
+        if self._method not in {_STORED, _DEFLATED}:
+            msg = f"Zip member '{self.filename}' uses unsupported compression method {self._method}"
+            raise ValueError(msg)
+
+        self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+        self._buffer = b""
+        self._offset = 0
+        self._running_crc = 0
+        self._finished = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: bytearray | memoryview) -> int:
+        while self._offset >= len(self._buffer) and not self._finished:
+            self._buffer = self._next_block()
+            self._offset = 0
+            self._running_crc = zlib.crc32(self._buffer, self._running_crc)
+
+        size = min(len(buffer), len(self._buffer) - self._offset)
+        buffer[:size] = self._buffer[self._offset : self._offset + size]
+        self._offset += size
+        return size
+
+    def drain(self) -> None:
+        while self.read(ARCHIVE_READ_SIZE):
+            pass
+
+    def _next_block(self) -> bytes:
+        if self._method == _STORED:
+            data = self._reader.read_exact(min(self._remaining, ARCHIVE_READ_SIZE))
+            self._remaining -= len(data)
+            if not self._remaining:
+                self._finish(data)
+            return data
+
+        if not (data := self._reader.read_some(ARCHIVE_READ_SIZE)):
+            msg = f"Zip member '{self.filename}' ended unexpectedly"
+            raise ValueError(msg)
+        output = self._decompressor.decompress(data)
+        if self._decompressor.eof:
+            self._reader.unread(self._decompressor.unused_data)
+            self._finish(output)
+        return output
+
+    def _finish(self, last_block: bytes = b"") -> None:
+        self._finished = True
+        if self._flags & _FLAG_DATA_DESCRIPTOR:
+            if self._reader.peek(4) == _DATA_DESCRIPTOR:
+                self._reader.read_exact(4)
+            descriptor = self._reader.read_exact(20 if self._zip64 else 12)
+            self._crc = struct.unpack_from("<I", descriptor)[0]
+
+        if zlib.crc32(last_block, self._running_crc) != self._crc:
+            msg = f"Zip member '{self.filename}' failed its CRC check"
+            raise ValueError(msg)
+
+
+def _read_zip64_extra(extra: bytes, size: int) -> tuple[bool, int | None]:
+    """Find the Zip64 record in a zip extra field block and read the compressed size from it.
+
+    The record lists the uncompressed size first, but only when the header's own field overflowed.
+    """
+    offset = 0
+    while offset + 4 <= len(extra):
+        header_id, length = struct.unpack_from("<HH", extra, offset)
+        if header_id == _ZIP64_EXTRA_ID:
+            record = extra[offset + 4 : offset + 4 + length]
+            position = 8 if size == _ZIP64_LIMIT else 0
+            if len(record) >= position + 8:
+                return True, struct.unpack_from("<Q", record, position)[0]
+            return True, None
+        offset += 4 + length
+    return False, None
@@ -0,0 +1,199 @@
+# type: ignore[reportAssignmentType]
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+if TYPE_CHECKING:
+    from logging import Logger
+
+    from pandas import DataFrame
+
+# Bump whenever the layout or contents of a prepared frame change, so stale entries are ignored
+PARSER_VERSION = "3"
+
+# Parquet schema metadata keys
+_JSON_COLUMNS_KEY = b"purrrr.json_columns"
+_METADATA_KEY = b"purrrr.metadata"
+
+# Columns kept as raw JSON strings on load and decoded only by the analyzers that need them
+LAZY_JSON_COLUMNS = frozenset({"AuditData"})
+
+
+def _dumps(value: Any) -> str:
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(value, default=str).decode()
+    return json.dumps(value, default=str)
+
+
+def _loads(value: str) -> Any:
+    if ORJSON_AVAILABLE:
+        return orjson.loads(value)
+    return json.loads(value)
+
+
+def frame_to_table(df: DataFrame, metadata: dict[str, Any] | None = None) -> pa.Table:
+    """Convert a prepared frame to an Arrow table, encoding non-string object columns as JSON.
+
+    Every value of an encoded column is encoded, strings included, so mixed columns come back
+    with their original values. Lazy columns keep their strings as they are, since those are
+    already JSON. The encoded columns and any metadata are recorded in the schema so
+    `table_to_frame` can restore them.
+    """
+    frame = df.copy(deep=False)
+    json_columns = []
+    for column in frame.columns:
+        if frame[column].dtype != object:
+            continue
+        inferred = pd.api.types.infer_dtype(frame[column], skipna=True)
+        if column in LAZY_JSON_COLUMNS:
+            frame[column] = [
+                value if isinstance(value, str) else _dumps(value)
+                for value in frame[column].tolist()
+            ]
+        elif inferred not in {"string", "empty"}:
+            frame[column] = [_dumps(value) for value in frame[column].tolist()]
+        else:
+            continue
+        json_columns.append(column)
+
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    return table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        _JSON_COLUMNS_KEY: json.dumps(json_columns).encode(),
+        _METADATA_KEY: json.dumps(metadata or {}, default=str).encode(),
+    })
+
+
+def table_to_frame(table: pa.Table) -> tuple[DataFrame, dict[str, Any]]:
+    """Convert a table written by `frame_to_table` back to a frame and its metadata.
+
+    Raises:
+        ValueError: If an encoded column holds a value that is not valid JSON.
+    """
+    schema_metadata = table.schema.metadata or {}
+    json_columns = json.loads(schema_metadata.get(_JSON_COLUMNS_KEY, b"[]"))
+    metadata = json.loads(schema_metadata.get(_METADATA_KEY, b"{}"))
+
+    df = table.to_pandas()
+    for column in json_columns:
+        if column not in LAZY_JSON_COLUMNS:
+            df[column] = [_loads(value) for value in df[column].tolist()]
+    return df, metadata
+
+
+@dataclass
+class FrameCache:
+    """Content-addressed Parquet cache of prepared audit log frames.
+
+    Entries are keyed by a hash of the source file contents plus the parser version, so renamed
+    or re-uploaded copies of the same export hit the cache while edited files or parser changes
+    miss it. The least recently used entries are evicted once the cache exceeds `max_bytes`.
+    """
+
+    directory: Path
+    max_bytes: int
+    logger: Logger | None = None
+
+    @staticmethod
+    def key_for(source: Path, variant: str = "") -> str:
+        """Build the cache key for a file from its contents and the parser version."""
+        digest = hashlib.sha256()
+        with source.open("rb") as f:
+            while block := f.read(1024 * 1024):
+                digest.update(block)
+        digest.update(f"\0{PARSER_VERSION}\0{variant}".encode())
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.parquet"
+
+    def load(self, key: str) -> tuple[DataFrame, dict[str, Any]] | None:
+        """Load a cached frame and its metadata, or return None on a miss."""
+        path = self._path(key)
+        if not PYARROW_AVAILABLE or not path.is_file():
+            return None
+
+        try:
+            table = pq.read_table(path)
+        except (OSError, pa.ArrowException) as e:
+            self._log("warning", "Ignoring unreadable cache entry %s: %s", path.name, e)
+            path.unlink(missing_ok=True)
+            return None
+
+        try:
+            df, metadata = table_to_frame(table)
+        except ValueError as e:
+            self._log("warning", "Ignoring undecodable cache entry %s: %s", path.name, e)
+            path.unlink(missing_ok=True)
+            return None
+
+        # Mark the entry as recently used for eviction
+        os.utime(path)
+        self._log("debug", "Loaded prepared frame from cache: %s", path.name)
+        return df, metadata
+
+    def store(self, key: str, df: DataFrame, metadata: dict[str, Any] | None = None) -> None:
+        """Store a prepared frame, encoding non-string object columns as JSON."""
+        if not PYARROW_AVAILABLE:
+            return
+
+        table = frame_to_table(df, metadata)
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            pq.write_table(table, tmp_name)
+            os.replace(tmp_name, self._path(key))
+        finally:
+            Path(tmp_name).unlink(missing_ok=True)
+
+        self._log("debug", "Stored prepared frame in cache: %s", self._path(key).name)
+        self.evict()
+
+    def __contains__(self, key: str) -> bool:
+        return PYARROW_AVAILABLE and self._path(key).is_file()
+
+    def discard(self, key: str) -> None:
+        """Remove an entry, if present."""
+        self._path(key).unlink(missing_ok=True)
+
+    def evict(self) -> None:
+        """Remove the least recently used entries until the cache fits within its size limit."""
+        entries = [(path, path.stat()) for path in self.directory.glob("*.parquet")]
+        total = sum(stat.st_size for _, stat in entries)
+
+        for path, stat in sorted(entries, key=lambda entry: entry[1].st_mtime):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= stat.st_size
+            self._log("debug", "Evicted cache entry: %s", path.name)
+
+    def _log(self, level: str, msg: str, *args: Any) -> None:
+        if self.logger is not None:
+            getattr(self.logger, level)(msg, *args)
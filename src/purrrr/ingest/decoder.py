@@ -0,0 +1,210 @@
+# type: ignore[reportAssignmentType]
+
+from __future__ import annotations
+
+import json
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from itertools import repeat
+from typing import TYPE_CHECKING, Any
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+    from concurrent.futures import Executor
+    from contextlib import AbstractContextManager
+
+    from pandas import DataFrame
+
+
+@dataclass(frozen=True)
+class AuditField:
+    """A value extracted from AuditData, trying each key in order until one is truthy."""
+
+    keys: tuple[str, ...]
+    default: Any = None
+    default_factory: Callable[[], Any] | None = field(default=None, compare=False)
+
+    def extract(self, record: dict[str, Any]) -> Any:
+        """Extract this field from a decoded AuditData record."""
+        if len(self.keys) > 1:
+            value = None
+            for key in self.keys:
+                if value := record.get(key):
+                    break
+            return value
+
+        if self.default_factory is not None and self.keys[0] not in record:
+            return self.default_factory()
+        return record.get(self.keys[0], self.default)
+
+
+# Columns extracted from AuditData, in the order they are added to the frame
+AUDIT_FIELDS: dict[str, AuditField] = {
+    # Primary fields
+    "Operation": AuditField(("Operation",)),
+    "UserId": AuditField(("UserId",)),
+    "SourceFileName": AuditField(("SourceFileName",)),
+    "ClientIP": AuditField(("ClientIPAddress", "ClientIP")),
+    "Workload": AuditField(("Workload",), ""),
+    # Location info
+    "ObjectId": AuditField(("ObjectId",), ""),
+    "SiteUrl": AuditField(("SiteUrl",), ""),
+    # User agent and device info
+    "UserAgent": AuditField(("UserAgent",), ""),
+    "Platform": AuditField(("Platform",), ""),
+    "DeviceDisplayName": AuditField(("DeviceDisplayName",), ""),
+    # Security context info
+    "GeoLocation": AuditField(("GeoLocation",), ""),
+    "IsManagedDevice": AuditField(("IsManagedDevice",), ""),
+    "AuthenticationType": AuditField(("AuthenticationType",), ""),
+    "BrowserVersion": AuditField(("BrowserVersion",), ""),
+    "AppAccessContext": AuditField(("AppAccessContext",), default_factory=dict),
+    # Additional fields
+    "MachineId": AuditField(("MachineId",), ""),
+    # Exchange-specific fields
+    "ResultStatus": AuditField(("ResultStatus",), ""),
+    "ExternalAccess": AuditField(("ExternalAccess",), False),
+    "ClientInfoString": AuditField(("ClientInfoString",), ""),
+}
+
+# Number of AuditData values decoded per worker task when decoding in parallel
+PARALLEL_BATCH_SIZE = 20_000
+
+# Columns with few distinct values relative to the number of events
+CATEGORICAL_COLUMNS = ("Operation", "UserId", "Workload", "ClientIP", "UserAgent", "Platform")
+
+
+def parse_audit_record(blob: Any) -> dict[str, Any]:
+    """Parse a single AuditData value, passing through records that are already decoded.
+
+    Raises:
+        JSONDecodeError: If the value is a string that is not valid JSON.
+    """
+    if isinstance(blob, dict):
+        return blob
+    if not isinstance(blob, (str, bytes)):
+        return {}
+    if ORJSON_AVAILABLE:
+        return orjson.loads(blob)
+    return json.loads(blob)
+
+
+def extract_fields(
+    records: Iterable[dict[str, Any]], fields: Iterable[str] | None = None
+) -> dict[str, list[Any]]:
+    """Extract the requested fields from already-decoded records in a single pass.
+
+    Requested names that aren't AuditData fields, such as columns derived later at ingest, are
+    skipped so callers can pass an analyzer's full column requirements.
+    """
+    names = list(AUDIT_FIELDS) if fields is None else [f for f in fields if f in AUDIT_FIELDS]
+    extractors = [AUDIT_FIELDS[name].extract for name in names]
+    columns: list[list[Any]] = [[] for _ in names]
+    appenders = [column.append for column in columns]
+
+    for record in records:
+        for append, extract in zip(appenders, extractors, strict=True):
+            append(extract(record))
+
+    return dict(zip(names, columns, strict=True))
+
+
+def decode_pool(workers: int) -> AbstractContextManager[Executor | None]:
+    """Create a process pool for `decode_audit_data`, or a null context for serial decoding."""
+    if workers > 1:
+        return ProcessPoolExecutor(max_workers=workers)
+    return nullcontext()
+
+
+def _extract_batch(
+    blobs: list[Any], names: list[str], keep_records: bool = False
+) -> tuple[dict[str, list[Any]], list[dict[str, Any]] | None]:
+    """Decode a batch of AuditData values in a worker, returning the extracted columns.
+
+    The decoded records are returned too when `keep_records` is set.
+    """
+    records = [parse_audit_record(blob) for blob in blobs]
+    return extract_fields(records, names), records if keep_records else None
+
+
+def extract_fields_parallel(
+    blobs: list[Any],
+    fields: Iterable[str] | None,
+    pool: Executor,
+    keep_records: bool = False,
+) -> tuple[dict[str, list[Any]], list[dict[str, Any]] | None]:
+    """Decode AuditData values across a process pool and extract the requested fields.
+
+    Workers send back plain per-column lists, plus the decoded records only when `keep_records`
+    is set, which keeps the data crossing process boundaries small otherwise. Batches are
+    reassembled in their original order, so the columns and records are identical to those
+    produced in a single process.
+    """
+    names = list(AUDIT_FIELDS) if fields is None else [f for f in fields if f in AUDIT_FIELDS]
+    batches = [
+        blobs[i : i + PARALLEL_BATCH_SIZE] for i in range(0, len(blobs), PARALLEL_BATCH_SIZE)
+    ]
+    columns: dict[str, list[Any]] = {name: [] for name in names}
+    records: list[dict[str, Any]] | None = [] if keep_records else None
+
+    for result, batch_records in pool.map(
+        _extract_batch, batches, repeat(names), repeat(keep_records)
+    ):
+        for name, values in result.items():
+            columns[name].extend(values)
+        if records is not None:
+            records.extend(batch_records)
+
+    return columns, records
+
+
+def decode_audit_data(
+    df: DataFrame,
+    fields: Iterable[str] | None = None,
+    keep_records: bool = True,
+    pool: Executor | None = None,
+) -> DataFrame:
+    """Parse every AuditData blob once and add one column per requested field.
+
+    The JSON payloads are decoded with orjson when it is installed. When `keep_records` is set,
+    the AuditData column is replaced with the decoded dictionaries for analyzers that need the
+    full payload; otherwise the raw strings are left in place.
+
+    Given a process pool, frames larger than one batch are decoded in parallel, with the same
+    result as decoding them serially.
+    """
+    blobs = df["AuditData"].tolist()
+
+    if pool is not None and len(blobs) > PARALLEL_BATCH_SIZE:
+        columns, records = extract_fields_parallel(blobs, fields, pool, keep_records)
+    else:
+        records = [parse_audit_record(blob) for blob in blobs]
+        columns = extract_fields(records, fields)
+
+    for name, values in columns.items():
+        df[name] = values
+
+    if keep_records:
+        df["AuditData"] = records
+
+    return df
+
+
+def categorize(df: DataFrame, columns: Iterable[str] = CATEGORICAL_COLUMNS) -> DataFrame:
+    """Store heavily repeated string columns as categoricals.
+
+    Each distinct value is stored once and rows hold integer codes, which cuts memory several-fold
+    and lets equality filters, `value_counts`, and `groupby` work on the codes.
+    """
+    for column in columns:
+        if column in df.columns and df[column].dtype == object:
+            df[column] = df[column].astype("category")
+    return df
@@ -0,0 +1,201 @@
+# type: ignore[reportAssignmentType]
+
+from __future__ import annotations
+
+import io
+import threading
+from typing import TYPE_CHECKING, BinaryIO
+
+from werkzeug.sansio.multipart import Data, Epilogue, Field, File, MultipartDecoder, NeedData
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+    from werkzeug.sansio.multipart import Event
+
+# Bytes requested from the request body at a time
+UPLOAD_READ_SIZE = 64 * 1024
+
+
+class MultipartStream:
+    """Iterate over the parts of a multipart/form-data request body as it arrives.
+
+    Nothing is spooled to disk or held in memory beyond the current read, so a part can be fed
+    straight into a parser that overlaps parsing with the network transfer.
+    """
+
+    def __init__(self, stream: BinaryIO, boundary: bytes) -> None:
+        self._stream = stream
+        self._decoder = MultipartDecoder(boundary)
+
+    def next_event(self) -> Event:
+        """Get the next multipart event, reading more of the body as needed."""
+        while True:
+            event = self._decoder.next_event()
+            if not isinstance(event, NeedData):
+                return event
+            self._decoder.receive_data(self._stream.read(UPLOAD_READ_SIZE) or None)
+
+    def parts(self) -> Iterator[UploadPart]:
+        """Yield each form part in order, skipping whatever the caller leaves unread."""
+        while True:
+            event = self.next_event()
+            if isinstance(event, Epilogue):
+                return
+            if isinstance(event, (Field, File)):
+                part = UploadPart(self, event.name, getattr(event, "filename", None))
+                yield part
+                part.drain()
+
+
+class UploadPart(io.RawIOBase):
+    """A readable file over the data of a single multipart part."""
+
+    def __init__(self, stream: MultipartStream, name: str, filename: str | None) -> None:
+        super().__init__()
+        self.name = name
+        self.filename = filename
+        self._stream = stream
+        self._buffer = b""
+        self._offset = 0
+        self._finished = False
+
+    def readable(self) -> bool:
+        """Part data can always be read."""
+        return True
+
+    def readinto(self, buffer: bytearray | memoryview) -> int:
+        """Read the next bytes of the part, pulling more of the request body when needed."""
+        while self._offset >= len(self._buffer) and not self._finished:
+            event = self._stream.next_event()
+            if not isinstance(event, Data):
+                msg = f"Unexpected {type(event).__name__} inside part '{self.name}'"
+                raise ValueError(msg)
+            self._buffer = event.data
+            self._offset = 0
+            self._finished = not event.more_data
+
+        size = min(len(buffer), len(self._buffer) - self._offset)
+        buffer[:size] = self._buffer[self._offset : self._offset + size]
+        self._offset += size
+        return size
+
+    def drain(self) -> None:
+        """Consume and discard the rest of the part."""
+        while self.read(UPLOAD_READ_SIZE):
+            pass
+
+
+class UploadSpool:
+    """An upload written to disk by one thread while another parses it as it arrives.
+
+    The writer never waits on the parser, so a slow or queued parse does not hold up the
+    transfer, and the parser blocks only until more of the upload has been written. Unless
+    `keep` is set, the file is unlinked as soon as both ends are open, so it never outlives
+    them whichever side stops first.
+    """
+
+    def __init__(self, path: Path, keep: bool = False, expected_bytes: int = 0) -> None:
+        self.path = path
+        self.expected_bytes = expected_bytes
+        self._writer = path.open("wb")
+        self._reader = path.open("rb")
+        if not keep:
+            path.unlink()
+        self._changed = threading.Condition()
+        self._written = 0
+        self._read = 0
+        self._finished = False
+        self._error: str | None = None
+
+    @property
+    def bytes_read(self) -> int:
+        """Get the number of bytes the parser has read so far."""
+        return self._read
+
+    @property
+    def total_bytes(self) -> int:
+        """Get the size of the upload, or its expected size while it is still arriving."""
+        if self._finished:
+            return self._written
+        return max(self.expected_bytes, self._written)
+
+    def fill(self, source: BinaryIO) -> int:
+        """Copy `source` into the spool, making each block readable as soon as it is written.
+
+        The spool is finished once the source is exhausted, or failed if reading it raises.
+        """
+        try:
+            while block := source.read(UPLOAD_READ_SIZE):
+                self._writer.write(block)
+                self._writer.flush()
+                with self._changed:
+                    self._written += len(block)
+                    self._changed.notify_all()
+        except Exception as e:
+            self.finish(error=str(e) or type(e).__name__)
+            raise
+        self.finish()
+        return self._written
+
+    def finish(self, error: str | None = None) -> None:
+        """Mark the upload as complete, or as failed with `error`, waking a waiting parser."""
+        with self._changed:
+            if self._finished:
+                return
+            self._writer.close()
+            self._error = error
+            self._finished = True
+            self._changed.notify_all()
+
+    def discard(self) -> None:
+        """Give up on an upload nobody is going to parse, closing both ends of the spool."""
+        self.finish(error="Upload discarded")
+        self._reader.close()
+
+    def open(self) -> BinaryIO:
+        """Open the upload for reading, blocking on data that has yet to arrive.
+
+        Raises:
+            OSError: From a read, if the upload fails before all of it has been received.
+        """
+        return io.BufferedReader(_SpoolReader(self), UPLOAD_READ_SIZE)
+
+    def _readinto(self, buffer: bytearray | memoryview) -> int:
+        with self._changed:
+            while self._read >= self._written and not self._finished:
+                self._changed.wait()
+            if self._error is not None:
+                msg = f"Upload failed: {self._error}"
+                raise OSError(msg)
+            available = self._written - self._read
+
+        size = self._reader.readinto(memoryview(buffer)[: min(len(buffer), available)])
+        self._read += size
+        return size
+
+    def _close_reader(self) -> None:
+        self._reader.close()
+
+
+class _SpoolReader(io.RawIOBase):
+    """The parser's end of an `UploadSpool`."""
+
+    def __init__(self, spool: UploadSpool) -> None:
+        super().__init__()
+        self._spool = spool
+
+    def readable(self) -> bool:
+        """The spool can always be read."""
+        return True
+
+    def readinto(self, buffer: bytearray | memoryview) -> int:
+        """Read the next bytes of the upload, waiting for them to arrive if needed."""
+        return self._spool._readinto(buffer)
+
+    def close(self) -> None:
+        """Close the spool file for reading."""
+        if not self.closed:
+            self._spool._close_reader()
+        super().close()
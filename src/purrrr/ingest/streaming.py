@@ -0,0 +1,96 @@
+# type: ignore[reportAssignmentType]
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+import pandas as pd
+
+from purrrr.ingest.archive import iter_csv_members
+from purrrr.ingest.decoder import categorize, decode_audit_data, decode_pool
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
+    from pandas import DataFrame
+
+# Number of CSV rows decoded at a time
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+def _iter_csv_chunks(source: Any, name: str | None, chunk_size: int) -> Iterator[DataFrame]:
+    """Read every CSV in a plain or compressed source in chunks of at most `chunk_size` rows.
+
+    Raises:
+        EmptyDataError: If the source holds no CSV data.
+    """
+    found = False
+    for member in iter_csv_members(source, name):
+        with pd.read_csv(member, chunksize=chunk_size) as reader:
+            for chunk in reader:
+                found = True
+                yield chunk
+
+    if not found:
+        msg = "No CSV data found in the audit log"
+        raise pd.errors.EmptyDataError(msg)
+
+
+def iter_audit_chunks(
+    source: Any,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    fields: Iterable[str] | None = None,
+    workers: int = 1,
+    name: str | None = None,
+) -> Iterator[DataFrame]:
+    """Yield decoded chunks of an audit log, dropping the raw AuditData as each chunk is decoded.
+
+    Memory use is bounded by the chunk size rather than the file size, so this is suited to
+    producing running summaries of exports that do not fit in RAM. With more than one worker,
+    each chunk is decoded across a process pool. Gzip, zstd, and zip sources are decompressed as
+    they are read, based on the file name (or `name` for streams).
+    """
+    with decode_pool(workers) as pool:
+        for chunk in _iter_csv_chunks(source, name, chunk_size):
+            if "AuditData" in chunk.columns:
+                chunk = decode_audit_data(chunk, fields, keep_records=False, pool=pool)
+                chunk = chunk.drop(columns="AuditData")
+            if "CreationDate" in chunk.columns:
+                chunk["CreationDate"] = pd.to_datetime(chunk["CreationDate"])
+            yield categorize(chunk)
+
+
+def read_audit_log(
+    source: Any,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    fields: Iterable[str] | None = None,
+    workers: int = 1,
+    name: str | None = None,
+    progress: Callable[[int], None] | None = None,
+) -> DataFrame:
+    """Read and decode a full audit log chunk by chunk.
+
+    The raw AuditData strings of each chunk are released as soon as the chunk is decoded, so peak
+    memory never holds the raw strings and the decoded records for the whole file at once. With
+    more than one worker, each chunk is decoded across a process pool. Every CSV in a compressed
+    source is read, so a zip of daily exports loads as a single log. The columns of the first CSV,
+    before any decoded columns are added, are kept in `attrs["source_columns"]`. If given,
+    `progress` is called with the number of rows read so far after each chunk is decoded.
+    """
+    chunks = []
+    rows = 0
+    source_columns = None
+    with decode_pool(workers) as pool:
+        for chunk in _iter_csv_chunks(source, name, chunk_size):
+            if source_columns is None:
+                source_columns = chunk.columns.tolist()
+            if "AuditData" in chunk.columns:
+                chunk = decode_audit_data(chunk, fields, pool=pool)
+            chunks.append(chunk)
+            rows += len(chunk)
+            if progress is not None:
+                progress(rows)
+
+    df = pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+    df.attrs["source_columns"] = source_columns
+    return categorize(df)
@@ -12,10 +12,10 @@ import re
 import sys
 from io import StringIO
 from pathlib import Path
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING
 
 import pandas as pd
-from pandas import DataFrame
+from pandas import DataFrame, Series
 from polykit import PolyLog, Text
 from polykit.cli import PolyArgs
 from polykit.text import color, print_color
@@ -23,12 +23,27 @@ from polykit.text import color, print_color
 from purrrr.entra import EntraSignInOperations
 from purrrr.exchange import ExchangeOperations
 from purrrr.files import FileOperations
-from purrrr.network import NetworkOperations
-from purrrr.tools import AuditConfig, OutputFormatter, JSONOutputFormatter
+from purrrr.ingest import (
+    AUDIT_FIELDS,
+    DEFAULT_CHUNK_SIZE,
+    ExchangeSummary,
+    FileSummary,
+    FrameCache,
+    NetworkSummary,
+    UserSummary,
+    categorize,
+    decode_audit_data,
+    decode_pool,
+    iter_audit_chunks,
+    iter_csv_members,
+)
+from purrrr.network import IPFilter, NetworkOperations
+from purrrr.tools import AuditAnalyzer, AuditConfig, OutputFormatter, JSONOutputFormatter
 from purrrr.users import UserActions
 
 if TYPE_CHECKING:
     import argparse
+    from concurrent.futures import Executor
 
 # Set up the logger
 logger = PolyLog.get_logger(simple=True)
@@ -36,6 +51,12 @@ logger = PolyLog.get_logger(simple=True)
 # ANSI escape code pattern
 ANSI_ESCAPE = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
 
+# SharePoint host names within ObjectId URLs
+SHAREPOINT_DOMAIN_PATTERN = r"https?://([^/]+\.sharepoint\.com)/"
+
+# Columns needed to filter events before any analyzer runs
+BASE_COLUMNS = ("Operation", "UserId", "SourceFileName", "ClientIP", "Workload")
+
 # Load runtime config
 config = AuditConfig()
 
@@ -56,7 +77,10 @@ def parse_arguments() -> argparse.Namespace:
     )
 
     # Positional argument for the audit CSV file
-    parser.add_argument("log_csv", help="CSV audit log from Purview (or Entra ID for --entra)")
+    parser.add_argument(
+        "log_csv",
+        help="CSV audit log from Purview, optionally .gz, .zst, or .zip (or Entra ID for --entra)",
+    )
 
     # SharePoint/Exchange analysis mode from Purview audit log
     purview_group = parser.add_argument_group(
@@ -117,12 +141,12 @@ def parse_arguments() -> argparse.Namespace:
     purview_group.add_argument(
         "--ips",
         type=str,
-        help="filter by individual IPs (comma-separated, supports wildcards)",
+        help="filter by individual IPs (comma-separated, wildcards or CIDR)",
     )
     purview_group.add_argument(
         "--exclude-ips",
         type=str,
-        help="exclude specific IPs (comma-separated, supports wildcards)",
+        help="exclude specific IPs (comma-separated, wildcards or CIDR)",
         metavar="IPS",
     )
     purview_group.add_argument(
@@ -151,6 +175,30 @@ def parse_arguments() -> argparse.Namespace:
         metavar="OUTPUT_FILE",
         help="export Exchange activity to specified CSV file",
     )
+    purview_group.add_argument(
+        "--stream",
+        action="store_true",
+        help="summarize logs larger than memory by reading them in chunks",
+    )
+    purview_group.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help=f"rows per chunk in --stream mode (default: {DEFAULT_CHUNK_SIZE})",
+        metavar="ROWS",
+    )
+    purview_group.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="decode AuditData across N processes (default: 1)",
+        metavar="N",
+    )
+    purview_group.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="always re-parse the log instead of reusing a cached copy",
+    )
 
     # Entra ID sign-in analysis mode from Entra ID audit log
     entra_group = parser.add_argument_group(
@@ -196,19 +244,50 @@ def parse_arguments() -> argparse.Namespace:
     if any(opt is not None for opt in signin_options) and not args.entra:
         parser.error("Sign-in options (--filter, --exclude, --limit) can only be used with --entra")
 
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    # Validate that --stream is only combined with options that can be summarized per chunk
+    if args.stream:
+        full_log_options = {
+            "--list-files": args.list_files,
+            "--list-actions-for-files": args.list_actions_for_files,
+            "--do-ip-lookups": args.do_ip_lookups,
+            "--timeline": args.timeline,
+            "--full-urls": args.full_urls,
+            "--exchange": args.exchange,
+            "--export-exchange-csv": args.export_exchange_csv,
+            "--entra": args.entra,
+        }
+        if conflicts := [name for name, value in full_log_options.items() if value]:
+            parser.error(f"--stream cannot be combined with {', '.join(conflicts)}")
+
     return args
 
 
 def detect_sharepoint_domains(df: DataFrame) -> list[str]:
-    """Detect SharePoint domains from ObjectId URLs in the audit data."""
-    domains = set()
+    """Detect SharePoint domains from ObjectId URLs in the audit data.
 
-    # Look for SharePoint URLs in ObjectId column
-    for object_id in df["ObjectId"].dropna():
-        if isinstance(object_id, str):
-            # Match SharePoint URLs (both http and https)
-            matches = re.findall(r"https?://([^/]+\.sharepoint\.com)/", object_id)
-            domains.update(matches)
+    The URL pattern is matched once per distinct ObjectId in each batch of rows. When
+    `domain_stable_batches` is configured, detection stops once that many batches in a row turn up
+    no new domain, trading completeness for speed on very large logs.
+    """
+    domains: dict[str, None] = {}
+    object_ids = df["ObjectId"]
+    batches_without_new = 0
+
+    for start in range(0, len(object_ids), config.domain_batch_size):
+        batch = object_ids.iloc[start : start + config.domain_batch_size].dropna()
+        unique_ids = Series(batch.unique(), dtype=object)
+
+        # Match SharePoint URLs (both http and https)
+        matches = unique_ids.str.extractall(SHAREPOINT_DOMAIN_PATTERN)[0].unique()
+        new_domains = [domain for domain in matches if domain not in domains]
+        domains.update(dict.fromkeys(new_domains))
+
+        batches_without_new = 0 if new_domains else batches_without_new + 1
+        if config.domain_stable_batches and batches_without_new >= config.domain_stable_batches:
+            break
 
     # Convert to full URLs
     full_domains = []
@@ -219,25 +298,32 @@ def detect_sharepoint_domains(df: DataFrame) -> list[str]:
 
 
 def detect_email_domain(df: DataFrame) -> str:
-    """Detect the primary email domain from UserId values in the audit data."""
-    domains = set()
-
-    # Extract domains from UserId column
-    for user_id in df["UserId"].dropna():
-        if isinstance(user_id, str) and "@" in user_id:
-            domain = user_id.split("@")[1]
-            domains.add(domain)
-
-    # Return the most common domain, or empty string if none found
-    if domains:
-        # Count occurrences of each domain
-        domain_counts = {}
-        for user_id in df["UserId"].dropna():
-            if isinstance(user_id, str) and "@" in user_id:
-                domain = user_id.split("@")[1]
-                domain_counts[domain] = domain_counts.get(domain, 0) + 1
-
-        # Return the most frequent domain
+    """Detect the primary email domain from UserId values in the audit data.
+
+    Domains are tallied per distinct UserId in each batch of rows. Detection stops as soon as the
+    leading domain is ahead by more than the number of rows left, since they can no longer change
+    the answer.
+    """
+    domain_counts: dict[str, int] = {}
+    user_ids = df["UserId"]
+
+    for start in range(0, len(user_ids), config.domain_batch_size):
+        batch = user_ids.iloc[start : start + config.domain_batch_size]
+        users = Series(batch.unique(), dtype=object)
+        counts = batch.value_counts().reindex(users).to_numpy()
+
+        # Domains are summed in order of first appearance so ties resolve as they always have
+        domains = Series(counts, index=users.str.split("@").str[1])
+        for domain, count in domains.groupby(level=0, sort=False).sum().items():
+            domain_counts[domain] = domain_counts.get(domain, 0) + int(count)
+
+        remaining = max(len(user_ids) - start - config.domain_batch_size, 0)
+        top = sorted(domain_counts.values(), reverse=True)[:2]
+        if top and top[0] - sum(top[1:]) > remaining:
+            break
+
+    # Return the most frequent domain, or empty string if none found
+    if domain_counts:
         return max(domain_counts.items(), key=operator.itemgetter(1))[0]
 
     return ""
@@ -256,36 +342,107 @@ def should_exclude_file(filename: str | None) -> bool:
     return any(filename.lower().endswith(ext) for ext in config.excluded_file_types)
 
 
-def prepare_dataframe(log_file: Path) -> DataFrame:
-    """Load and prepare the DataFrame from the CSV audit log file."""
+def select_analyzers(args: argparse.Namespace) -> list[AuditAnalyzer]:
+    """Get the analyzers that will run for the selected command-line mode."""
+    if args.do_ip_lookups:
+        return [network]
+    if args.timeline or args.full_urls:
+        return [files, users]
+    if args.exchange or args.export_exchange_csv:
+        return [exchange]
+    if args.user or args.list_actions_for_files:
+        return [files, users]
+    return [files, users, network, exchange]
+
+
+def required_columns(analyzers: list[AuditAnalyzer]) -> list[str]:
+    """Get the columns the given analyzers read, plus those needed to filter events."""
+    columns = dict.fromkeys(BASE_COLUMNS)
+    for analyzer in analyzers:
+        columns.update(dict.fromkeys(analyzer.required_columns))
+    return list(columns)
+
+
+def prepare_dataframe(
+    log_file: Path, columns: list[str] | None = None, use_cache: bool = True, workers: int = 1
+) -> DataFrame:
+    """Load and prepare the DataFrame from the CSV audit log file.
+
+    Only the given columns are decoded from AuditData or derived, defaulting to all of them.
+    Prepared frames are cached by file contents, so re-running against the same export skips
+    CSV and JSON parsing entirely unless `use_cache` is False. A cached frame missing some of the
+    requested columns is rebuilt with the union of both, so the entry converges on what's used.
+    With more than one worker, AuditData is decoded across a process pool.
+    """
+    if columns is None:
+        columns = [*AUDIT_FIELDS, "AuditData", "CleanPath"]
+
+    cache = None
+    if use_cache and log_file.is_file():
+        cache = FrameCache(config.cache_dir, config.cache_size_mb * 1024 * 1024, logger)
+        cache_key = cache.key_for(log_file)
+        if cached := cache.load(cache_key):
+            df, metadata = cached
+            cached_columns = metadata.get("columns", [])
+            if set(columns) <= set(cached_columns):
+                config.sharepoint_domains = metadata.get("sharepoint_domains")
+                config.email_domain = metadata.get("email_domain")
+                return df
+            columns = list(dict.fromkeys([*cached_columns, *columns]))
+
     df = load_csv_data(log_file)
-    df = extract_basic_fields(df)
+    with decode_pool(workers) as pool:
+        df = extract_basic_fields(df, columns, keep_records="AuditData" in columns, pool=pool)
 
-    # Detect domains and update the config
-    sharepoint_domains = detect_sharepoint_domains(df)
-    email_domain = detect_email_domain(df)
-    config.sharepoint_domains = sharepoint_domains
-    config.email_domain = email_domain
+    sharepoint_domains = email_domain = None
+    if "CleanPath" in columns:
+        # Detect domains and update the config
+        sharepoint_domains = detect_sharepoint_domains(df)
+        email_domain = detect_email_domain(df)
+        config.sharepoint_domains = sharepoint_domains
+        config.email_domain = email_domain
 
-    if sharepoint_domains:
-        logger.debug("Detected SharePoint domains: %s", ", ".join(sharepoint_domains))
-    if email_domain:
-        logger.debug("Detected email domain: %s", email_domain)
+        if sharepoint_domains:
+            logger.debug("Detected SharePoint domains: %s", ", ".join(sharepoint_domains))
+        if email_domain:
+            logger.debug("Detected email domain: %s", email_domain)
 
-    df = extract_path_information(df)
-    return extract_security_information(df)
+        df = extract_path_information(df)
+
+    if cache is not None:
+        try:
+            cache.store(
+                cache_key,
+                df,
+                {
+                    "columns": columns,
+                    "sharepoint_domains": sharepoint_domains,
+                    "email_domain": email_domain,
+                },
+            )
+        except OSError as e:
+            logger.warning("Unable to cache parsed log: %s", e)
+
+    return df
 
 
 def load_csv_data(log_file: Path) -> DataFrame:
     """Load CSV data and handle possible exceptions.
 
+    Gzip and zstd files are decompressed as they are read, and every CSV in a zip archive is
+    loaded and combined into a single log.
+
     Raises:
         FileNotFoundError: If the file is not found.
         EmptyDataError: If the file is empty.
-        ParserError: If the file is not a valid CSV file.
+        ParserError: If the file is not a valid CSV file or archive.
     """
     try:
-        df: DataFrame = pd.read_csv(log_file)
+        frames = [pd.read_csv(member) for member in iter_csv_members(log_file)]
+        if not frames:
+            msg = "No CSV files found in the archive"
+            raise pd.errors.EmptyDataError(msg)
+        df: DataFrame = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
     except FileNotFoundError:
         logger.error("Error: File '%s' not found.", log_file)
         raise
@@ -295,125 +452,112 @@ def load_csv_data(log_file: Path) -> DataFrame:
     except pd.errors.ParserError:
         logger.error("Error: Unable to parse '%s'. Make sure it's a valid CSV file.", log_file)
         raise
+    except ValueError as e:
+        logger.error("Error: Unable to read '%s': %s", log_file, e)
+        raise pd.errors.ParserError(str(e)) from e
     return df
 
 
-def extract_basic_fields(df: DataFrame) -> DataFrame:
-    """Extract primary fields from AuditData."""
-    df["AuditData"] = df["AuditData"].apply(json.loads)
-    df["Operation"] = df["AuditData"].apply(lambda x: x.get("Operation"))
-    df["UserId"] = df["AuditData"].apply(lambda x: x.get("UserId"))
-    df["SourceFileName"] = df["AuditData"].apply(lambda x: x.get("SourceFileName"))
-    df["ClientIP"] = df["AuditData"].apply(lambda x: x.get("ClientIPAddress") or x.get("ClientIP"))
+def extract_basic_fields(
+    df: DataFrame,
+    columns: list[str] | None = None,
+    keep_records: bool = True,
+    pool: Executor | None = None,
+) -> DataFrame:
+    """Decode AuditData in a single pass and extract the requested primary and security fields."""
+    df = decode_audit_data(df, columns, keep_records, pool)
     df["CreationDate"] = pd.to_datetime(df["CreationDate"])
+    return categorize(df)
 
-    # Extract location info
-    df["ObjectId"] = df["AuditData"].apply(lambda x: x.get("ObjectId", ""))
-    df["SiteUrl"] = df["AuditData"].apply(lambda x: x.get("SiteUrl", ""))
 
-    return df
+def extract_path_information(df: DataFrame) -> DataFrame:
+    """Extract and clean path information from URLs.
 
+    ObjectIds repeat heavily, so paths are cleaned once per unique ObjectId and file name pair
+    and mapped back to the rows by their codes.
+    """
+    object_codes, object_ids = pd.factorize(df["ObjectId"].fillna(""))
+    name_codes, filenames = pd.factorize(df["SourceFileName"].fillna(""))
+
+    name_count = max(len(filenames), 1)
+    pair_codes, pairs = pd.factorize(object_codes.astype("int64") * name_count + name_codes)
+    paths = clean_paths(
+        pd.Series(object_ids.take(pairs // name_count), dtype=object),
+        pd.Series(filenames.take(pairs % name_count), dtype=object),
+    )
 
-def extract_path_information(df: DataFrame) -> DataFrame:
-    """Extract and clean path information from URLs."""
-    df["CleanPath"] = df.apply(clean_path, axis=1)
+    path_codes, unique_paths = pd.factorize(paths, sort=True)
+    df["CleanPath"] = pd.Categorical.from_codes(path_codes[pair_codes], categories=unique_paths)
     return df
 
 
-def clean_path(row: Any) -> str:
-    """Clean the path from a URL, handling both OneDrive and SharePoint paths."""
-    if not (object_id := row.get("ObjectId", "")):
-        return ""
+def clean_paths(object_ids: Series, filenames: Series) -> Series:
+    """Clean the paths from URLs, handling both OneDrive and SharePoint paths."""
+    paths = pd.Series("", index=object_ids.index, dtype=object)
+    present = object_ids.ne("")
 
     # Handle OneDrive paths differently
-    if "-my.sharepoint.com/personal/" in object_id:
-        return _handle_onedrive_path(object_id)
+    onedrive = present & object_ids.str.contains("-my.sharepoint.com/personal/", regex=False)
+    paths[onedrive] = _clean_onedrive_paths(object_ids[onedrive])
 
     # Handle regular SharePoint paths
-    path = object_id
+    sharepoint = present & ~onedrive
+    paths[sharepoint] = _clean_sharepoint_paths(object_ids[sharepoint], filenames[sharepoint])
+
+    return paths
+
+
+def _clean_sharepoint_paths(object_ids: Series, filenames: Series) -> Series:
+    path = object_ids
 
     # Remove domain prefix using detected domains or fallback to regex
     if config.sharepoint_domains:
         for domain in config.sharepoint_domains:
             # Handle cases where the domain appears twice
-            while domain in path:
-                path = path.replace(domain, "/", 1)
+            while (has_domain := path.str.contains(domain, regex=False)).any():
+                path = path.where(~has_domain, path.str.replace(domain, "/", n=1, regex=False))
     else:
         # Fallback: use regex to remove any SharePoint domain
-        path = re.sub(r"https?://[^/]+\.sharepoint\.com/", "/", path)
-
-    # Fix cases with multiple slashes
-    while "//" in path:
-        path = path.replace("//", "/")
+        path = path.str.replace(r"https?://[^/]+\.sharepoint\.com/", "/", regex=True)
 
-    # Remove leading slashes
-    path = path.lstrip("/")
+    # Fix cases with multiple slashes, then remove leading slashes
+    path = path.str.replace(r"/{2,}", "/", regex=True).str.lstrip("/")
 
     # Remove the filename from the end if it matches SourceFileName
-    filename = row.get("SourceFileName", "")
-    if filename and path.endswith(filename):
-        path = path[: -len(filename)].rstrip("/")
-
-    return path
-
-
-def _handle_onedrive_path(object_id: str) -> str:
-    # Extract the username
-    if "/personal/" in object_id:
-        parts = object_id.split("/personal/")
-        if len(parts) > 1:
-            # Get the username part
-            user_and_path = parts[1].split("/", 1)
-            username = user_and_path[0]
-
-            # Try to convert underscores in the OneDrive path back to an email address
-            if "_" in username and config.email_domain:
-                domain_with_underscores = config.email_domain.replace(".", "_")
-                if username.endswith(domain_with_underscores):
-                    # Trim the underscored domain and replace with @ + domain
-                    username = (
-                        username[: -len(domain_with_underscores) - 1] + "@" + config.email_domain
-                    )
-                # If we can't confidently identify the domain, leave it as is
-
-            # Extract the full folder structure after username
-            if len(user_and_path) > 1:
-                return f"OneDrive ≫ {username}/{user_and_path[1]}"
-            return f"OneDrive ≫ {username}"
-
-    # Fallback if parsing fails
-    return "OneDrive"
-
-
-def extract_security_information(df: DataFrame) -> DataFrame:
-    """Extract security-relevant fields from AuditData."""
-    # User agent and device info
-    df["UserAgent"] = df["AuditData"].apply(lambda x: x.get("UserAgent", ""))
-    df["Platform"] = df["AuditData"].apply(lambda x: x.get("Platform", ""))
-    df["DeviceDisplayName"] = df["AuditData"].apply(lambda x: x.get("DeviceDisplayName", ""))
-
-    # Security context info
-    df["GeoLocation"] = df["AuditData"].apply(lambda x: x.get("GeoLocation", ""))
-    df["IsManagedDevice"] = df["AuditData"].apply(lambda x: x.get("IsManagedDevice", ""))
-    df["AuthenticationType"] = df["AuditData"].apply(lambda x: x.get("AuthenticationType", ""))
-    df["BrowserVersion"] = df["AuditData"].apply(lambda x: x.get("BrowserVersion", ""))
-    df["AppAccessContext"] = df["AuditData"].apply(lambda x: x.get("AppAccessContext", {}))
-
-    # Additional fields
-    df["MachineId"] = df["AuditData"].apply(lambda x: x.get("MachineId", ""))
+    return pd.Series(
+        [
+            p[: -len(name)].rstrip("/") if name and p.endswith(name) else p
+            for p, name in zip(path, filenames, strict=True)
+        ],
+        index=path.index,
+        dtype=object,
+    )
 
-    return df
+
+def _clean_onedrive_paths(object_ids: Series) -> Series:
+    # Extract the username and the full folder structure after it
+    user_and_path = object_ids.str.split("/personal/").str[1].str.split("/", n=1)
+    username = user_and_path.str[0]
+    folder = user_and_path.str[1]
+
+    # Try to convert underscores in the OneDrive path back to an email address
+    if config.email_domain:
+        domain_with_underscores = config.email_domain.replace(".", "_")
+        convertible = username.str.contains("_", regex=False) & username.str.endswith(
+            domain_with_underscores
+        )
+        # Trim the underscored domain and replace with @ + domain
+        email = username.str[: -len(domain_with_underscores) - 1] + "@" + config.email_domain
+        username = username.where(~convertible, email)
+        # If we can't confidently identify the domain, leave it as is
+
+    return ("OneDrive ≫ " + username + ("/" + folder).fillna("")).astype(object)
 
 
 def apply_ip_filtering(args: argparse.Namespace, df: DataFrame) -> DataFrame:
     """Apply IP filtering based on command-line arguments."""
     if args.ips:
-        ip_patterns = [ip.strip() for ip in args.ips.split(",")]
-
-        def matches_ip_filter(ip: str) -> bool:
-            return network.matches_ip_pattern(ip, ip_patterns)
-
-        df = df[df["ClientIP"].apply(matches_ip_filter)]
+        df = IPFilter.from_patterns(include=args.ips).apply(df)
         if df.empty:
             logger.warning(
                 "No events found for the specified IPs: %s", Text.list_ids(args.ips.split(","))
@@ -424,12 +568,7 @@ def apply_ip_filtering(args: argparse.Namespace, df: DataFrame) -> DataFrame:
             )
 
     if args.exclude_ips:
-        exclude_ip_patterns = [ip.strip() for ip in args.exclude_ips.split(",")]
-
-        def matches_exclude_filter(ip: str) -> bool:
-            return network.matches_ip_pattern(ip, exclude_ip_patterns)
-
-        df = df[~df["ClientIP"].apply(matches_exclude_filter)]
+        df = IPFilter.from_patterns(exclude=args.exclude_ips).apply(df)
         if df.empty:
             logger.warning(
                 "No events found after excluding IPs: %s",
@@ -445,6 +584,78 @@ def apply_ip_filtering(args: argparse.Namespace, df: DataFrame) -> DataFrame:
     return df
 
 
+def select_file_actions(df: DataFrame, actions_to_analyze: list[str] | None) -> DataFrame:
+    """Filter events down to user file actions, optionally limited to specific operations."""
+    mask = (
+        (df["UserId"] != "app@sharepoint")
+        & (df["SourceFileName"].notna())
+        & (~df["SourceFileName"].apply(should_exclude_file))
+    )
+    if actions_to_analyze is not None:
+        mask &= df["Operation"].isin(actions_to_analyze)
+    return df[mask]
+
+
+def run_streaming_analysis(args: argparse.Namespace, log_file: Path) -> None:
+    """Summarize the log chunk by chunk, keeping memory bounded by the chunk size.
+
+    Raises:
+        FileNotFoundError: If the file is not found.
+        EmptyDataError: If the file is empty.
+        ParserError: If the file is not a valid CSV file or archive.
+    """
+    file_summary = FileSummary()
+    network_summary = NetworkSummary()
+    user_summary = UserSummary()
+    exchange_summary = ExchangeSummary()
+
+    actions_to_analyze = (
+        [action.strip() for action in args.actions.split(",")] if args.actions else None
+    )
+
+    try:
+        columns = required_columns([files, users, network, exchange])
+        ip_filter = IPFilter.from_patterns(args.ips, args.exclude_ips)
+        for chunk in iter_audit_chunks(log_file, args.chunk_size, columns, args.workers):
+            if args.start_date:
+                chunk = chunk[chunk["CreationDate"] >= pd.to_datetime(args.start_date)]
+            if args.end_date:
+                chunk = chunk[chunk["CreationDate"] <= pd.to_datetime(args.end_date)]
+            chunk = ip_filter.apply(chunk)
+            if args.user:
+                chunk = users.filter_by_user(args.user, chunk)
+
+            exchange_summary.update(chunk[chunk["Workload"] == "Exchange"])
+
+            file_actions = select_file_actions(chunk, actions_to_analyze)
+            file_summary.update(file_actions)
+            network_summary.update(file_actions)
+            user_summary.update(file_actions)
+    except FileNotFoundError:
+        logger.error("Error: File '%s' not found.", log_file)
+        raise
+    except pd.errors.EmptyDataError:
+        logger.error("Error: File '%s' is empty.", log_file)
+        raise
+    except pd.errors.ParserError:
+        logger.error("Error: Unable to parse '%s'. Make sure it's a valid CSV file.", log_file)
+        raise
+    except ValueError as e:
+        logger.error("Error: Unable to read '%s': %s", log_file, e)
+        raise pd.errors.ParserError(str(e)) from e
+
+    logger.info(
+        "Streamed %d file actions and %d Exchange events.",
+        file_summary.events,
+        exchange_summary.events,
+    )
+
+    users.display_summary(user_summary)
+    files.display_summary(file_summary, actions_to_analyze)
+    network.display_summary(network_summary)
+    exchange.display_summary(exchange_summary)
+
+
 def execute_selected_operations(
     args: argparse.Namespace, file_actions: DataFrame, actions_to_analyze: list[str]
 ) -> None:
@@ -568,8 +779,27 @@ def main() -> None:
             logger.error("Sign-in analysis failed: %s", str(e))
         return
 
+    # Summarize logs that don't fit in memory chunk by chunk
+    if args.stream:
+        try:
+            run_streaming_analysis(args, log_file)
+        except (FileNotFoundError, pd.errors.EmptyDataError, pd.errors.ParserError):
+            return
+        if not args.text:
+            sys.stdout = original_stdout
+            print_json_output(json_buffer)
+        return
+
+    # Decode only the columns the selected analyzers read
+    analyzers = select_analyzers(args)
+    columns = required_columns(analyzers)
+    if exchange in analyzers:
+        columns.append("AuditData")
+
     try:
-        df: DataFrame = prepare_dataframe(log_file)
+        df: DataFrame = prepare_dataframe(
+            log_file, columns, use_cache=not args.no_cache, workers=args.workers
+        )
     except FileNotFoundError:
         return
     except pd.errors.EmptyDataError:
@@ -597,7 +827,7 @@ def main() -> None:
         return
 
     # Process Exchange events and SharePoint events separately
-    exch_events = exchange.process_exchange_events(df)
+    exch_events = exchange.process_exchange_events(df) if exchange in analyzers else df.iloc[:0]
     sp_events = df[df["SourceFileName"].notna()]
 
     # Filter out excluded actions
@@ -615,29 +845,29 @@ def main() -> None:
         return
 
     # Filter the events to the specified actions
-    file_actions = df[
-        (df["Operation"].isin(actions_to_analyze))
-        & (df["UserId"] != "app@sharepoint")
-        & (df["SourceFileName"].notna())
-        & (~df["SourceFileName"].apply(should_exclude_file))
-    ]
+    file_actions = select_file_actions(df, actions_to_analyze)
 
     perform_data_analysis(args, file_actions, actions_to_analyze, exch_events)
 
     # Restore stdout and output results
     if not args.text:
         sys.stdout = original_stdout
-        # Capture all text output and create final JSON
-        text_output = json_buffer.getvalue()
-        # Strip ANSI escape codes for clean JSON output
-        clean_output = ANSI_ESCAPE.sub('', text_output).strip()
-        # Split into lines for better JSON structure
-        output_lines = [line for line in clean_output.split('\n') if line.strip()]
-        output_json = {
-            "output": output_lines if output_lines else ["Analysis complete"],
-            "timestamp": pd.Timestamp.now().isoformat(),
-        }
-        print(json.dumps(output_json, indent=2, default=str, ensure_ascii=False))
+        print_json_output(json_buffer)
+
+
+def print_json_output(json_buffer: StringIO) -> None:
+    """Print the captured text output as a JSON document."""
+    # Capture all text output and create final JSON
+    text_output = json_buffer.getvalue()
+    # Strip ANSI escape codes for clean JSON output
+    clean_output = ANSI_ESCAPE.sub('', text_output).strip()
+    # Split into lines for better JSON structure
+    output_lines = [line for line in clean_output.split('\n') if line.strip()]
+    output_json = {
+        "output": output_lines if output_lines else ["Analysis complete"],
+        "timestamp": pd.Timestamp.now().isoformat(),
+    }
+    print(json.dumps(output_json, indent=2, default=str, ensure_ascii=False))
 
 
 if __name__ == "__main__":
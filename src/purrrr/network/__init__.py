@@ -7,4 +7,5 @@ This module provides functionality for analyzing network-related security inform
 
 from __future__ import annotations
 
+from .ip_filter import IPFilter, IPPatternSet
 from .network_ops import NetworkOperations
@@ -0,0 +1,197 @@
+# type: ignore[reportAssignmentType]
+
+from __future__ import annotations
+
+import fnmatch
+import ipaddress
+import re
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from pandas import DataFrame
+
+# Addresses are compared as 16 big-endian bytes, with IPv4 held in its IPv4-mapped IPv6 form
+_PACKED = "S16"
+_IPV4_MAPPED_PREFIX = b"\x00" * 10 + b"\xff\xff"
+
+# IPv4 patterns ending in wildcard octets, such as 10.20.* (a wildcard spans the dots after it)
+_IPV4_WILDCARD = re.compile(r"^(\d{1,3}(?:\.\d{1,3}){0,2})(?:\.\*){1,3}$")
+
+
+def pack_ip(value: Any) -> bytes | None:
+    """Pack an IPv4 or IPv6 address into 16 comparable bytes, or None if it isn't one.
+
+    Addresses logged with a port or in brackets, such as `10.1.2.3:443` or `[::1]:5000`, are
+    packed as the address alone.
+    """
+    if not isinstance(value, str):
+        return None
+    text = value.strip()
+    if text.startswith("[") and "]" in text:
+        text = text[1 : text.index("]")]
+    elif text.count(":") == 1:
+        text = text.partition(":")[0]
+    try:
+        address = ipaddress.ip_address(text)
+    except ValueError:
+        return None
+    if address.version == 4:
+        return _IPV4_MAPPED_PREFIX + address.packed
+    return address.packed
+
+
+def _network_bounds(network: ipaddress.IPv4Network | ipaddress.IPv6Network) -> tuple[bytes, bytes]:
+    first, last = network.network_address.packed, network.broadcast_address.packed
+    if network.version == 4:
+        return _IPV4_MAPPED_PREFIX + first, _IPV4_MAPPED_PREFIX + last
+    return first, last
+
+
+def _pattern_bounds(pattern: str) -> tuple[bytes, bytes] | None:
+    """Turn an address, CIDR block, or trailing-octet wildcard into an inclusive address range."""
+    if match := _IPV4_WILDCARD.match(pattern):
+        octets = match.group(1).split(".")
+        if len(octets) + pattern.count("*") > 4:
+            return None
+        pattern = f"{'.'.join(octets + ['0'] * (4 - len(octets)))}/{8 * len(octets)}"
+    try:
+        return _network_bounds(ipaddress.ip_network(pattern, strict=False))
+    except ValueError:
+        return None
+
+
+@dataclass(frozen=True)
+class IPPatternSet:
+    """A compiled list of IP patterns, checked against whole columns at once.
+
+    Addresses, CIDR blocks (IPv4 and IPv6), and IPv4 wildcards covering whole trailing octets
+    (`10.20.*`) become address ranges, merged into sorted disjoint intervals so each address is
+    matched with a binary search, keeping long lists of known-good ranges O(n log m). Any other
+    wildcard pattern falls back to shell-style matching against the address text, and values
+    that aren't addresses, missing ones included, are matched against every pattern that way.
+    """
+
+    starts: np.ndarray
+    ends: np.ndarray
+    glob: re.Pattern[str] | None = None
+    text: re.Pattern[str] | None = None  # Every pattern, for values that aren't addresses
+
+    @classmethod
+    def compile(cls, patterns: Iterable[str]) -> IPPatternSet:
+        """Compile a list of IP patterns."""
+        bounds, globs, texts = [], [], []
+        for pattern in (p.strip() for p in patterns):
+            if not pattern:
+                continue
+            texts.append(fnmatch.translate(pattern))
+            if (pattern_bounds := _pattern_bounds(pattern)) is not None:
+                bounds.append(pattern_bounds)
+            else:
+                globs.append(fnmatch.translate(pattern))
+
+        merged: list[list[bytes]] = []
+        for start, end in sorted(bounds):
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+
+        return cls(
+            starts=np.array([start for start, _ in merged], dtype=_PACKED),
+            ends=np.array([end for _, end in merged], dtype=_PACKED),
+            glob=re.compile("|".join(globs)) if globs else None,
+            text=re.compile("|".join(texts)) if texts else None,
+        )
+
+    def __bool__(self) -> bool:
+        return bool(len(self.starts)) or self.glob is not None
+
+    def match_values(self, values: Iterable[Any]) -> np.ndarray:
+        """Check each distinct IP value against the patterns, returning a boolean array."""
+        values = list(values)
+        matched = np.zeros(len(values), dtype=bool)
+        packed = [pack_ip(value) for value in values]
+        is_ip = np.array([p is not None for p in packed], dtype=bool)
+
+        if len(self.starts):
+            addresses = np.array([p or b"" for p in packed], dtype=_PACKED)
+            index = np.searchsorted(self.starts, addresses, side="right") - 1
+            in_range = (index >= 0) & (addresses <= self.ends[np.maximum(index, 0)])
+            matched |= is_ip & in_range
+
+        if self.glob is not None:
+            matched |= np.array(
+                [isinstance(value, str) and bool(self.glob.match(value)) for value in values],
+                dtype=bool,
+            )
+
+        # Anything else is matched as text, as `fnmatch` would, so `*` still matches it
+        if self.text is not None and not is_ip.all():
+            matched |= ~is_ip & np.array(
+                [bool(self.text.match(str(value))) for value in values], dtype=bool
+            )
+
+        return matched
+
+    def match(self, ips: pd.Series) -> np.ndarray:
+        """Check every value in a column of IP addresses, parsing each distinct value once."""
+        codes, uniques = pd.factorize(ips)
+        # Missing values have code -1, so they look up the last entry, checked as pandas prints them
+        matched = self.match_values([*uniques, np.nan])
+        return matched[codes]
+
+
+@dataclass(frozen=True)
+class IPFilter:
+    """Include and exclude lists of IP patterns, compiled once and applied to whole columns.
+
+    Events without a client IP are matched as the text `nan`, as the shell-style filters did, so
+    `*` matches them while address patterns don't.
+    """
+
+    include: IPPatternSet | None = None
+    exclude: IPPatternSet | None = None
+
+    @classmethod
+    def from_patterns(
+        cls, include: str | Iterable[str] | None = None, exclude: str | Iterable[str] | None = None
+    ) -> IPFilter:
+        """Compile include and exclude patterns, given as lists or comma-separated strings."""
+
+        def compile_patterns(patterns: str | Iterable[str] | None) -> IPPatternSet | None:
+            if isinstance(patterns, str):
+                patterns = patterns.split(",")
+            compiled = IPPatternSet.compile(patterns or [])
+            return compiled or None
+
+        return cls(compile_patterns(include), compile_patterns(exclude))
+
+    def __bool__(self) -> bool:
+        return self.include is not None or self.exclude is not None
+
+    def mask(self, ips: pd.Series | Iterable[Any]) -> np.ndarray:
+        """Get a boolean array marking which IPs pass the filter."""
+        if not isinstance(ips, pd.Series):
+            ips = pd.Series(list(ips), dtype=object)
+        keep = np.ones(len(ips), dtype=bool)
+        if self.include is not None:
+            keep &= self.include.match(ips)
+        if self.exclude is not None:
+            keep &= ~self.exclude.match(ips)
+        return keep
+
+    def matches(self, ip: Any) -> bool:
+        """Check whether a single IP passes the filter."""
+        return bool(self.mask([ip])[0])
+
+    def apply(self, df: DataFrame, column: str = "ClientIP") -> DataFrame:
+        """Keep the events whose IP passes the filter."""
+        if not self or column not in df.columns:
+            return df
+        return df[self.mask(df[column])]
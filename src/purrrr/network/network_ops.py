@@ -4,24 +4,36 @@
 
 from __future__ import annotations
 
-import fnmatch
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, ClassVar
 
 import iplooker.ip_looker as iplooker
 from polykit.text import color
 from polykit.text import print_color as printc
 
-from purrrr.tools import AuditAnalyzer
+from purrrr.network.ip_filter import IPFilter
+from purrrr.tools import AuditAnalyzer, value_counts
 
 if TYPE_CHECKING:
+    from collections.abc import Mapping
+
     from pandas import DataFrame
 
+    from purrrr.ingest.aggregates import NetworkSummary
+
 
 @dataclass
 class NetworkOperations(AuditAnalyzer):
     """Analyze network activity in the file actions."""
 
+    required_columns: ClassVar[tuple[str, ...]] = (
+        "Operation",
+        "UserId",
+        "SourceFileName",
+        "ClientIP",
+        "UserAgent",
+    )
+
     @staticmethod
     def is_ipv6(ip: Any) -> bool:
         """Check if an IP address is IPv6."""
@@ -29,9 +41,8 @@ class NetworkOperations(AuditAnalyzer):
 
     @staticmethod
     def matches_ip_pattern(ip: str, patterns: list[str]) -> bool:
-        """Check if an IP address matches any of the given patterns (supporting wildcards)."""
-        ip_str = str(ip)
-        return any(fnmatch.fnmatch(ip_str, pattern) for pattern in patterns)
+        """Check if an IP address matches any of the given patterns (wildcards or CIDR blocks)."""
+        return IPFilter.from_patterns(patterns).matches(ip)
 
     def analyze_ip_addresses(self, file_actions: DataFrame) -> None:
         """Analyze IP addresses used in file actions."""
@@ -40,7 +51,7 @@ class NetworkOperations(AuditAnalyzer):
             return
 
         self.out.print_header("IP Address Summary")
-        ip_counts = file_actions["ClientIP"].value_counts()
+        ip_counts = value_counts(file_actions["ClientIP"])
 
         # Separate IPv4 and IPv6 addresses
         ipv4_counts = {ip: count for ip, count in ip_counts.items() if not self.is_ipv6(ip)}
@@ -61,24 +72,65 @@ class NetworkOperations(AuditAnalyzer):
         printc(f"\n{ip_type} Addresses by Usage:", "yellow")
         for ip, count_ip in ip_counts.items():
             actions = file_actions[file_actions["ClientIP"] == ip]
-            users = actions["UserId"].nunique()
+            self._print_ip_line(ip, count_ip, value_counts(actions["UserId"]), ip_width)
 
-            if users == 1:
-                print(
-                    f"  - {ip:{ip_width}} {color(f'{count_ip:>5}', 'yellow')} {'action' if count_ip == 1 else 'actions'}"
-                )
-            else:
+    def _print_ip_line(
+        self, ip: Any, count_ip: int, user_counts: Mapping[Any, int], ip_width: int
+    ) -> None:
+        """Print the usage line for one IP address, with a per-user breakdown if shared."""
+        users = len(user_counts)
+
+        if users == 1:
+            print(
+                f"  - {ip:{ip_width}} {color(f'{count_ip:>5}', 'yellow')} {'action' if count_ip == 1 else 'actions'}"
+            )
+        else:
+            print(
+                f"  - {ip:{ip_width}} {color(f'{count_ip:>5}', 'yellow')} actions by "  # No pluralization, for alignment
+                f"{color(str(users), 'yellow')} users"
+            )
+
+        if users > 1:  # Show user breakdown only for IPs used by multiple users
+            for user, count_user in user_counts.items():
                 print(
-                    f"  - {ip:{ip_width}} {color(f'{count_ip:>5}', 'yellow')} actions by "  # No pluralization, for alignment
-                    f"{color(str(users), 'yellow')} users"
+                    f"      {color(user, 'cyan')}: "
+                    f"{color(str(count_user), 'yellow')} {'action' if count_user == 1 else 'actions'}"
                 )
 
-            if users > 1:  # Show user breakdown only for IPs used by multiple users
-                for user, count_user in actions["UserId"].value_counts().items():
-                    print(
-                        f"      {color(user, 'cyan')}: "
-                        f"{color(str(count_user), 'yellow')} {'action' if count_user == 1 else 'actions'}"
-                    )
+    def display_summary(self, summary: NetworkSummary) -> None:
+        """Display IP address and user agent totals accumulated from a streamed log."""
+        if not summary.ips:
+            printc("\nNo IP information available.", "yellow")
+            return
+
+        self.out.print_header("IP Address Summary")
+        ip_counts = summary.ips.most_common()
+
+        for ip_type, ip_width, is_v6 in [("IPv4", 15, False), ("IPv6", 40, True)]:
+            typed_counts = [(ip, count) for ip, count in ip_counts if self.is_ipv6(ip) == is_v6]
+            if typed_counts:
+                printc(f"\n{ip_type} Addresses by Usage:", "yellow")
+                for ip, count_ip in typed_counts:
+                    user_counts = dict(summary.users_for_ip(ip).most_common())
+                    self._print_ip_line(ip, count_ip, user_counts, ip_width)
+
+        known_good = self.config.known_good
+        unknown_agents = [
+            (agent, count)
+            for agent, count in summary.user_agents.most_common()
+            if not any(known in str(agent) for known in known_good["user_agents"])
+        ]
+        if not unknown_agents:
+            return
+
+        self.out.print_header("User Agent Analysis")
+        for agent, count in unknown_agents:
+            agent_users = summary.users_for_agent(agent)
+            print(
+                f"  - {color('Agent:', 'yellow')} {agent} "
+                f"({color(str(count), 'yellow')} actions by "
+                f"{color(str(len(agent_users)), 'yellow')} {'user' if len(agent_users) == 1 else 'users'})"
+            )
 
     def analyze_ip_addresses_with_lookup(self, file_actions: DataFrame) -> None:
         """Analyze IP addresses with detailed lookups."""
@@ -89,7 +141,7 @@ class NetworkOperations(AuditAnalyzer):
             return
 
         # Get unique IPs and their usage
-        ip_counts = file_actions["ClientIP"].value_counts()
+        ip_counts = value_counts(file_actions["ClientIP"])
 
         # Separate IPv4 and IPv6
         ipv4_counts = {ip: count for ip, count in ip_counts.items() if not self.is_ipv6(ip)}
@@ -127,7 +179,7 @@ class NetworkOperations(AuditAnalyzer):
 
         self.out.print_header("User Agent Analysis")
 
-        agents = valid_agents["UserAgent"].value_counts()
+        agents = value_counts(valid_agents["UserAgent"])
         known_good = self.config.known_good
         unknown_agents = [
             agent
@@ -174,11 +226,8 @@ class NetworkOperations(AuditAnalyzer):
             f"Analysis for Specified IP Address{'es' if len(ip_list) > 1 else ''}"
         )
 
-        def matches_pattern(ip: str) -> bool:
-            return self.matches_ip_pattern(ip, [ip])
-
         for ip in ip_list:
-            ip_actions = file_actions[file_actions["ClientIP"].apply(matches_pattern)]
+            ip_actions = IPFilter.from_patterns([ip]).apply(file_actions)
 
             if ip_actions.empty:
                 print(f"No activity found for IP: {ip}")
@@ -194,7 +243,7 @@ class NetworkOperations(AuditAnalyzer):
                 print(f"  Matching IPs ({len(matching_ips)}): {', '.join(matching_ips)}")
 
             # Get user breakdown
-            users = ip_actions["UserId"].value_counts()
+            users = value_counts(ip_actions["UserId"])
             print(f"  Total events: {len(ip_actions)}")
             print(f"  Unique users: {len(users)}")
             print(
@@ -203,7 +252,7 @@ class NetworkOperations(AuditAnalyzer):
             )
 
             # Show operations performed from this IP
-            operations = ip_actions["Operation"].value_counts()
+            operations = value_counts(ip_actions["Operation"])
             print("\n  Operations:")
             for op, count in operations.items():
                 print(f"    - {op}: {color(str(count), 'yellow')}")
@@ -215,7 +264,7 @@ class NetworkOperations(AuditAnalyzer):
                 print(f"({count} events")
 
                 # Show operations by this user from this IP
-                user_ops = ip_actions[ip_actions["UserId"] == user]["Operation"].value_counts()
+                user_ops = value_counts(ip_actions[ip_actions["UserId"] == user]["Operation"])
                 for op, op_count in user_ops.items():
                     print(f"      - {op}: {op_count}")
 
@@ -6,6 +6,16 @@ let currentLogType = null;
 let analysisData = {};
 let currentFilters = {};
 
+// Filtres et tri de la chronologie, appliqués côté serveur
+let timelineFilters = {};
+let timelineSort = { sort: 'timestamp', order: 'desc' };
+
+// Intervalle de suivi des traitements en arrière-plan (ms)
+const JOB_POLL_INTERVAL = 1000;
+
+// Nombre de combinaisons les plus fréquentes affichées par tableau de motifs
+const PATTERNS_LIMIT = 50;
+
 // Column visibility configuration
 const AVAILABLE_COLUMNS = [
     { key: 'timestamp', label: 'Date/Heure', visible: true, width: '20%' },
@@ -44,9 +54,9 @@ function setupEventListeners() {
     const itemsPerPageSelector = document.getElementById('items-per-page');
     if (itemsPerPageSelector) {
         itemsPerPageSelector.addEventListener('change', function () {
-            // Re-initialize pagination with new items per page value
-            if (window.timelineCurrentOperations && window.timelineCurrentOperations.length > 0) {
-                initializeTimelinePagination(window.timelineCurrentOperations);
+            // Reload the first page with the new page size
+            if (currentSessionId) {
+                loadTimelinePage(1);
             }
         });
     }
@@ -119,7 +129,21 @@ function renderTableHeader() {
     visibleCols.forEach((col, index) => {
         const th = document.createElement('th');
         th.style.width = col.width;
-        th.textContent = col.label;
+        th.style.cursor = 'pointer';
+        th.title = 'Trier par ' + col.label;
+        const arrow = timelineSort.sort === col.key ? (timelineSort.order === 'desc' ? ' ▼' : ' ▲') : '';
+        th.textContent = col.label + arrow;
+
+        // Clic : trier par cette colonne, ou inverser l'ordre si elle est déjà triée
+        th.addEventListener('click', () => {
+            if (timelineSort.sort === col.key) {
+                timelineSort.order = timelineSort.order === 'desc' ? 'asc' : 'desc';
+            } else {
+                timelineSort = { sort: col.key, order: col.key === 'timestamp' ? 'desc' : 'asc' };
+            }
+            renderTableHeader();
+            loadTimelinePage(1);
+        });
         headerRow.appendChild(th);
     });
 }
@@ -145,168 +169,25 @@ function getColumnValue(op, colKey) {
 
 function getFiltersFromUI() {
     // Get multi-select values as arrays
-    const userValues = Array.from(document.getElementById('filter-user')?.selectedOptions || []).map(opt => opt.value).filter(v => v);
-    const actionValues = Array.from(document.getElementById('filter-actions')?.selectedOptions || []).map(opt => opt.value).filter(v => v);
-    
+    const selectedValues = (id) => Array.from(document.getElementById(id)?.selectedOptions || []).map(opt => opt.value).filter(v => v);
+
     return {
-        user: userValues,
-        actions: actionValues,
+        workloads: selectedValues('filter-workload'),
+        users: selectedValues('filter-user'),
+        actions: selectedValues('filter-actions'),
         files: document.getElementById('filter-files')?.value || '',
         ips: document.getElementById('filter-ips')?.value || '',
         exclude_ips: document.getElementById('exclude-ips')?.value || '',
         start_date: document.getElementById('filter-date-start')?.value || '',
-        end_date: document.getElementById('filter-date-end')?.value || '',
-        sort_by: document.getElementById('filter-sort-by')?.value || 'date'
+        end_date: document.getElementById('filter-date-end')?.value || ''
     };
 }
 
-function matchesIpPattern(ip, pattern) {
-    // Trim whitespace
-    ip = ip.trim();
-    pattern = pattern.trim();
-    
-    // If no wildcard, do exact match (case-insensitive for IPs)
-    if (!pattern.includes('*')) {
-        return ip === pattern;
-    }
-    
-    // Convert wildcard pattern to regex
-    // First escape special regex chars, but keep track of * positions
-    const regexPattern = pattern
-        .split('')
-        .map(char => {
-            // Keep * as is for now, will be replaced later
-            if (char === '*') return '\u0000';  // Temporary placeholder
-            // Escape all special regex chars
-            if (/[.+?^${}()|[\]\\]/.test(char)) {
-                return '\\' + char;
-            }
-            return char;
-        })
-        .join('')
-        .replace(/\u0000/g, '.*');  // Replace placeholder with .*
-    
-    try {
-        const regex = new RegExp('^' + regexPattern + '$');
-        return regex.test(ip);
-    } catch (e) {
-        // If regex fails, fallback to exact match
-        return ip === pattern;
-    }
-}
-
-function filterIpsList(clientIp, ipFilterString) {
-    // If no filter, allow all
-    if (!ipFilterString || ipFilterString.trim() === '') {
-        return true;
-    }
-    
-    // Split by comma and trim each IP pattern
-    const patterns = ipFilterString.split(',').map(p => p.trim()).filter(p => p.length > 0);
-    
-    // Check if the IP matches any of the patterns
-    return patterns.some(pattern => matchesIpPattern(clientIp, pattern));
-}
-
 function applyFilters() {
-    // Apply timeline filters with the selected values
-    // Get multi-select values as arrays (Select2 compatible)
-    const filterWorkloadValues = Array.from(document.getElementById('filter-workload')?.selectedOptions || []).map(opt => opt.value).filter(v => v);
-    const filterUserValues = Array.from(document.getElementById('filter-user')?.selectedOptions || []).map(opt => opt.value).filter(v => v);
-    const filterActionsValues = Array.from(document.getElementById('filter-actions')?.selectedOptions || []).map(opt => opt.value).filter(v => v);
-    
-    const filterFiles = document.getElementById('filter-files')?.value || '';
-    const filterIps = document.getElementById('filter-ips')?.value || '';
-    const excludeIps = document.getElementById('exclude-ips')?.value || '';
-    const filterDateStart = document.getElementById('filter-date-start')?.value || '';
-    const filterDateEnd = document.getElementById('filter-date-end')?.value || '';
-    
-    // Get the original operations (before any filtering)
-    const originalOps = window.timelineOriginalOperations || window.timelineAllOperations || [];
-    if (!originalOps || originalOps.length === 0) return;
-    
-    let filtered = originalOps.filter(op => {
-        // Filtre workload - match any selected value
-        if (filterWorkloadValues.length > 0 && !filterWorkloadValues.some(val => op.Workload?.toLowerCase() === val.toLowerCase())) {
-            return false;
-        }
-        
-        // Filtre utilisateur - match any selected value
-        if (filterUserValues.length > 0 && !filterUserValues.some(val => op.user?.toLowerCase() === val.toLowerCase())) {
-            return false;
-        }
-        
-        // Filtre opération - match any selected value
-        if (filterActionsValues.length > 0 && !filterActionsValues.some(val => op.operation?.toLowerCase() === val.toLowerCase())) {
-            return false;
-        }
-        
-        // Filtre fichiers
-        if (filterFiles && !op.subject?.toLowerCase().includes(filterFiles.toLowerCase()) && 
-                          !op.folder?.toLowerCase().includes(filterFiles.toLowerCase())) {
-            return false;
-        }
-        
-        // Filtre IP à inclure - support multiple IPs and wildcards
-        if (filterIps) {
-            const clientIp = op.ClientIP || op.client_ip || op.ClientIPAddress || op.SenderIp || '';
-            if (!filterIpsList(clientIp, filterIps)) {
-                return false;
-            }
-        }
-        
-        // Filtre IP à exclure - support multiple IPs and wildcards
-        if (excludeIps) {
-            const clientIp = op.ClientIP || op.client_ip || op.ClientIPAddress || op.SenderIp || '';
-            if (filterIpsList(clientIp, excludeIps)) {
-                return false;
-            }
-        }
-        
-        // Filtre date de début
-        if (filterDateStart) {
-            const opDate = op.timestamp ? new Date(op.timestamp) : null;
-            const startDate = new Date(filterDateStart);
-            if (!opDate || opDate < startDate) {
-                return false;
-            }
-        }
-        
-        // Filtre date de fin
-        if (filterDateEnd) {
-            const opDate = op.timestamp ? new Date(op.timestamp) : null;
-            const endDate = new Date(filterDateEnd);
-            // Set end date to end of day (23:59:59)
-            endDate.setHours(23, 59, 59, 999);
-            if (!opDate || opDate > endDate) {
-                return false;
-            }
-        }
-        
-        return true;
-    });
-    
-    // Sort by timestamp (descending - most recent first)
-    filtered.sort((a, b) => {
-        const dateA = a.timestamp ? new Date(a.timestamp) : new Date(0);
-        const dateB = b.timestamp ? new Date(b.timestamp) : new Date(0);
-        return dateB - dateA;
-    });
-    
-    // Update the global operations to the filtered set
-    window.timelineAllOperations = filtered;
-    
-    // Update badge with filtered count
-    const badge = document.getElementById('badge-timeline');
-    if (badge) {
-        badge.textContent = filtered.length.toLocaleString();
-    }
-    
-    // Analyze patterns in filtered data
-    analyzePatterns(filtered);
-    
-    // Re-initialize pagination with filtered data
-    initializeTimelinePagination(filtered);
+    // Les filtres sont appliqués côté serveur, qui ne renvoie que la page affichée
+    timelineFilters = getFiltersFromUI();
+    loadTimelinePage(1);
+    loadTimelinePatterns();
 }
 
 function resetFilters() {
@@ -331,21 +212,12 @@ function resetFilters() {
         sortDropdown.value = 'date';
     }
     currentFilters = {};
+    timelineFilters = {};
     
-    // Reset pagination to show all original data
-    if (window.timelineOriginalOperations) {
-        window.timelineAllOperations = window.timelineOriginalOperations;
-        
-        // Update badge with total count
-        const badge = document.getElementById('badge-timeline');
-        if (badge) {
-            badge.textContent = window.timelineOriginalOperations.length.toLocaleString();
-        }
-        
-        // Analyze patterns in original data
-        analyzePatterns(window.timelineOriginalOperations);
-        
-        initializeTimelinePagination(window.timelineOriginalOperations);
+    // Reload the unfiltered timeline
+    if (currentSessionId) {
+        loadTimelinePage(1);
+        loadTimelinePatterns();
     }
 }
 
@@ -358,22 +230,18 @@ function updateFileInputStatus(elementId, value) {
     }
 }
 
-function populateFilterDropdowns(operations) {
-    // Extract unique users, operations, and workloads from the operations data
+function populateFilterDropdowns(facets) {
+    // Distinct users, operations, and workloads of the whole timeline, sent by the server
     // Deduplicate users case-insensitively
     const userMap = new Map(); // Map with lowercase key -> original value
-    const uniqueOperations = new Set();
-    const uniqueWorkloads = new Set();
-    
-    operations.forEach(op => {
-        if (op.user) {
-            const lowerUser = op.user.toLowerCase();
-            if (!userMap.has(lowerUser)) {
-                userMap.set(lowerUser, op.user);
-            }
+    const uniqueOperations = new Set(facets.operations || []);
+    const uniqueWorkloads = new Set(facets.workloads || []);
+    
+    (facets.users || []).forEach(user => {
+        const lowerUser = user.toLowerCase();
+        if (!userMap.has(lowerUser)) {
+            userMap.set(lowerUser, user);
         }
-        if (op.operation) uniqueOperations.add(op.operation);
-        if (op.Workload) uniqueWorkloads.add(op.Workload);
     });
     
     // Sort and populate workload dropdown
@@ -448,7 +316,10 @@ async function handleFileUpload(e) {
             throw new Error(error.error || 'Erreur lors du téléchargement');
         }
 
-        const data = await response.json();
+        const accepted = await response.json();
+        const data = await waitForJob(accepted, (text) => {
+            document.getElementById('submit-text').textContent = text;
+        });
         currentSessionId = data.session_id;
         currentLogType = data.log_type;
 
@@ -516,7 +387,10 @@ async function handleAddFile() {
             throw new Error(error.error || 'Erreur lors du téléchargement');
         }
 
-        const data = await response.json();
+        const accepted = await response.json();
+        const data = await waitForJob(accepted, (text) => {
+            addFileText.textContent = text;
+        });
         
         // Update file info with accumulated info
         const rowsElement = document.getElementById('info-rows');
@@ -549,6 +423,38 @@ async function handleAddFile() {
     }
 }
 
+// Suivre un traitement en arrière-plan jusqu'à la fin, et renvoyer son résultat
+async function waitForJob(job, onProgress) {
+    const stages = {
+        queued: 'En attente...',
+        parsing: 'Lecture',
+        precomputing: 'Pré-calcul de l\'analyse...'
+    };
+
+    while (job.state !== 'ready') {
+        if (job.state === 'failed') {
+            throw new Error(job.error || 'Erreur lors du traitement du fichier');
+        }
+
+        if (job.state === 'parsing') {
+            const percent = Math.round((job.progress || 0) * 100);
+            onProgress(`${stages.parsing} : ${job.rows.toLocaleString()} lignes (${percent} %)`);
+        } else {
+            onProgress(stages[job.state] || 'Traitement...');
+        }
+
+        await new Promise(resolve => setTimeout(resolve, JOB_POLL_INTERVAL));
+        const response = await fetch(job.status_url || `/api/jobs/${job.id}`);
+        if (!response.ok) {
+            const error = await response.json();
+            throw new Error(error.error || 'Erreur lors du suivi du traitement');
+        }
+        job = { ...job, ...(await response.json()) };
+    }
+
+    return job.result;
+}
+
 function showAddFileError(message) {
     const errorDiv = document.getElementById('add-file-error');
     const errorMessage = document.getElementById('add-file-error-message');
@@ -588,6 +494,12 @@ async function loadAnalysisData(analysisType) {
             body: JSON.stringify(currentFilters)
         });
 
+        // Les données sont encore en cours de chargement : réessayer plus tard
+        if (response.status === 202) {
+            setTimeout(() => loadAnalysisData(analysisType), JOB_POLL_INTERVAL);
+            return;
+        }
+
         if (!response.ok) {
             const error = await response.json();
             throw new Error(error.error || 'Erreur lors de l\'analyse');
@@ -857,6 +769,34 @@ function getItemsPerPage() {
 // Variable globale pour stocker les données complètes des logs
 let allLogsData = {};
 
+// Charger les données complètes d'un événement à la demande, puis afficher ses détails
+async function openLogDetails(op) {
+    const detail = {
+        timestamp: op.timestamp || '',
+        operation: op.operation || '',
+        subject: op.subject || '',
+        folder: op.folder || '',
+        size: op.size || 0,
+        user: op.user || '',
+        full_data: null
+    };
+
+    try {
+        const response = await fetch(`/api/events/${currentSessionId}/${op.id}`);
+        if (!response.ok) {
+            const error = await response.json();
+            throw new Error(error.error || 'Erreur lors du chargement de l\'événement');
+        }
+        detail.full_data = (await response.json()).audit_data;
+    } catch (error) {
+        console.error('Event error:', error);
+        showError(`Erreur lors du chargement des détails: ${error.message}`);
+        return;
+    }
+
+    showLogDetails(detail);
+}
+
 // Fonction pour afficher les détails du log dans la modale avancée
 function showLogDetails(detail) {
     // Récupérer les données complètes du JSON AuditData
@@ -1689,40 +1629,102 @@ function updateTablePage(operationType, pageNumber) {
     });
 }
 
-function initializeTimelinePagination(operations) {
-    const timelineTable = document.querySelector('#exchange-timeline tbody');
-    const paginationNav = document.getElementById('timeline-pagination');
-    const pageInfo = document.getElementById('timeline-page-info');
+// Récupérer une partie de la chronologie, filtrée et triée par le serveur
+async function fetchTimeline(options) {
+    const response = await fetch(`/api/timeline/${currentSessionId}`, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify({ ...timelineFilters, ...timelineSort, ...options })
+    });
+
+    if (!response.ok) {
+        const error = await response.json();
+        throw new Error(error.error || 'Erreur lors du chargement de la chronologie');
+    }
+
+    return response.json();
+}
+
+async function loadTimelinePage(pageNumber, withFacets = false) {
+    if (!currentSessionId) return;
+
     const TIMELINE_ITEMS_PER_PAGE = getItemsPerPage();
-    
-    const totalPages = Math.ceil(operations.length / TIMELINE_ITEMS_PER_PAGE);
-    
-    if (totalPages <= 1) {
-        paginationNav.style.display = 'none';
-    } else {
-        paginationNav.style.display = 'block';
+
+    try {
+        const data = await fetchTimeline({
+            offset: (pageNumber - 1) * TIMELINE_ITEMS_PER_PAGE,
+            limit: TIMELINE_ITEMS_PER_PAGE,
+            facets: withFacets
+        });
+
+        if (data.facets) {
+            populateFilterDropdowns(data.facets);
+        }
+
+        // Store pagination info globally
+        window.timelinePageInfo = document.getElementById('timeline-page-info');
+        window.timelineTotalPages = Math.max(1, Math.ceil(data.total / TIMELINE_ITEMS_PER_PAGE));
+        window.timelineCurrentOperations = data.operations;  // Only the operations of this page
+
+        const paginationNav = document.getElementById('timeline-pagination');
+        paginationNav.style.display = window.timelineTotalPages > 1 ? 'block' : 'none';
+
+        // Update badge with filtered count
+        const badge = document.getElementById('badge-timeline');
+        if (badge) {
+            badge.textContent = data.total.toLocaleString();
+        }
+
+        updateTimelinePage(pageNumber);
+
+    } catch (error) {
+        console.error('Timeline error:', error);
+        showError(`Erreur lors du chargement de la chronologie: ${error.message}`);
+    }
+}
+
+// Les motifs sont comptés côté serveur sur la chronologie filtrée, et mis en cache avec les analyses
+async function loadTimelinePatterns() {
+    if (!currentSessionId) return;
+
+    try {
+        const response = await fetch(`/api/analysis/${currentSessionId}/patterns`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({ ...timelineFilters, limit: PATTERNS_LIMIT })
+        });
+
+        // Les données sont encore en cours de chargement : réessayer plus tard
+        if (response.status === 202) {
+            setTimeout(loadTimelinePatterns, JOB_POLL_INTERVAL);
+            return;
+        }
+
+        if (!response.ok) {
+            const error = await response.json();
+            throw new Error(error.error || 'Erreur lors du calcul des motifs');
+        }
+
+        displayPatterns(await response.json());
+    } catch (error) {
+        console.error('Pattern error:', error);
     }
-    
-    // Store pagination info globally
-    window.timelineCurrentPage = 1;
-    window.timelinePageInfo = pageInfo;
-    window.timelineTotalPages = totalPages;
-    window.timelineCurrentOperations = operations;  // Store the operations being paginated
-    
-    // Render first page
-    updateTimelinePage(1);
 }
 
 function updateTimelinePage(pageNumber) {
     const timelineTable = document.querySelector('#exchange-timeline tbody');
-    const operations = window.timelineCurrentOperations || window.timelineAllOperations || [];
-    const TIMELINE_ITEMS_PER_PAGE = getItemsPerPage();
-    const startIdx = (pageNumber - 1) * TIMELINE_ITEMS_PER_PAGE;
-    const endIdx = startIdx + TIMELINE_ITEMS_PER_PAGE;
-    const pageOps = operations.slice(startIdx, endIdx);
+    const pageOps = window.timelineCurrentOperations || [];
     
     timelineTable.innerHTML = '';
     const visibleCols = AVAILABLE_COLUMNS.filter(col => col.visible);
+
+    if (pageOps.length === 0) {
+        timelineTable.innerHTML = `<tr><td colspan="${visibleCols.length}" class="text-center text-muted py-3">Aucune donnée</td></tr>`;
+    }
     
     pageOps.forEach((op, pageIndex) => {
         const row = document.createElement('tr');
@@ -1736,17 +1738,7 @@ function updateTimelinePage(pageNumber) {
         row.innerHTML = htmlContent;
         
         // Add click event to show details modal
-        row.addEventListener('click', () => {
-            showLogDetails({
-                timestamp: op.timestamp || '',
-                operation: op.operation || '',
-                subject: op.subject || '',
-                folder: op.folder || '',
-                size: op.size || 0,
-                user: op.user || '',
-                full_data: op.full_data || null  // Passer les données complètes
-            });
-        });
+        row.addEventListener('click', () => openLogDetails(op));
         
         // Hover effect
         row.addEventListener('mouseenter', () => {
@@ -1840,7 +1832,7 @@ function changeTimelinePage(event, direction) {
     }
     
     if (newPage !== currentPage) {
-        updateTimelinePage(newPage);
+        loadTimelinePage(newPage);
     }
 }
 
@@ -1848,85 +1840,22 @@ function displayExchange(data) {
     // Update badges only (removed KPI section)
     document.getElementById('badge-timeline').textContent = data.total_operations?.toLocaleString() || '0';
 
-    // 2. Chronologie complète (avec filtres)
-    const timelineTable = document.querySelector('#exchange-timeline tbody');
-    if (timelineTable && data.detailed_operations) {
-        timelineTable.innerHTML = '';
-        
-        // Trier par date décroissante
-        const sorted = [...data.detailed_operations].sort((a, b) => {
-            const dateA = new Date(a.timestamp || 0);
-            const dateB = new Date(b.timestamp || 0);
-            return dateB - dateA;
-        });
-        
-        // Store sorted operations globally for pagination
-        // Store original operations for filtering
-        window.timelineOriginalOperations = sorted;
-        window.timelineAllOperations = sorted;
-        
-        // Populate filter dropdowns with unique values
-        populateFilterDropdowns(sorted);
-        
-        // Render table header with columns
-        renderTableHeader();
-        
-        if (sorted.length === 0) {
-            timelineTable.innerHTML = '<tr><td colspan="6" class="text-center text-muted py-3">Aucune donnée</td></tr>';
-        } else {
-            // Initialize timeline pagination
-            initializeTimelinePagination(sorted);
-            
-            // Analyze patterns
-            analyzePatterns(sorted);
-        }
-    }
+    // 2. Chronologie complète, paginée et filtrée côté serveur
+    renderTableHeader();
+    loadTimelinePage(1, true);
+    loadTimelinePatterns();
 }
 
-function analyzePatterns(operations) {
-    if (!operations || operations.length === 0) {
-        document.getElementById('badge-patterns').textContent = '0';
-        return;
-    }
-
-    // Count pattern occurrences
-    const patterns = {
-        userIp: {},      // user -> ip -> count
-        userOp: {},      // user -> operation -> count
-        opIp: {},        // operation -> ip -> count
-        userOpIp: {}     // user -> operation -> ip -> count
-    };
-
-    operations.forEach(op => {
-        const user = op.user || 'Inconnu';
-        const ip = op.ClientIP || op.client_ip || op.ClientIPAddress || op.SenderIp || 'Inconnu';
-        const operation = op.operation || 'Inconnu';
-
-        // User + IP pattern
-        if (!patterns.userIp[user]) patterns.userIp[user] = {};
-        patterns.userIp[user][ip] = (patterns.userIp[user][ip] || 0) + 1;
+function displayPatterns(data) {
+    const tables = data.tables || {};
 
-        // User + Operation pattern
-        if (!patterns.userOp[user]) patterns.userOp[user] = {};
-        patterns.userOp[user][operation] = (patterns.userOp[user][operation] || 0) + 1;
-
-        // Operation + IP pattern
-        if (!patterns.opIp[operation]) patterns.opIp[operation] = {};
-        patterns.opIp[operation][ip] = (patterns.opIp[operation][ip] || 0) + 1;
-
-        // User + Operation + IP pattern
-        const key = `${user}|${operation}|${ip}`;
-        patterns.userOpIp[key] = (patterns.userOpIp[key] || 0) + 1;
-    });
-
-    // Render patterns in tables
-    renderPatternTable('pattern-user-ip', patterns.userIp, 2);
-    renderPatternTable('pattern-user-op', patterns.userOp, 2);
-    renderPatternTable('pattern-op-ip', patterns.opIp, 2);
-    renderComplexPatternTable('pattern-user-op-ip', patterns.userOpIp);
+    renderPatternTable('pattern-user-ip', tables.user_ip, 2);
+    renderPatternTable('pattern-user-op', tables.user_operation, 2);
+    renderPatternTable('pattern-op-ip', tables.operation_ip, 2);
+    renderComplexPatternTable('pattern-user-op-ip', tables.user_operation_ip);
 
     // Update badge with total unique patterns
-    const totalPatterns = Object.keys(patterns.userOpIp).length;
+    const totalPatterns = tables.user_operation_ip?.combinations || 0;
     document.getElementById('badge-patterns').textContent = totalPatterns.toLocaleString();
 }
 
@@ -1939,26 +1868,20 @@ function renderPatternTable(tableId, patterns, columnCount) {
     
     tbody.innerHTML = '';
 
-    // Flatten patterns to arrays and sort by count
-    const items = [];
-    Object.keys(patterns).forEach(key1 => {
-        Object.keys(patterns[key1]).forEach(key2 => {
-            items.push({
-                col1: key1,
-                col2: key2,
-                count: patterns[key1][key2]
-            });
-        });
-    });
+    // Rows arrive sorted by count, most frequent first
+    const [field1, field2] = patterns?.fields || [];
+    const items = (patterns?.top || []).map(item => ({
+        col1: String(item[field1] || 'Inconnu'),
+        col2: String(item[field2] || 'Inconnu'),
+        count: item.count
+    }));
 
     if (items.length === 0) {
         tbody.innerHTML = `<tr><td colspan="${columnCount + 1}" class="text-center text-muted py-3"><small>Aucun pattern détecté</small></td></tr>`;
         return;
     }
 
-    // Sort by count descending (top 50)
-    items.sort((a, b) => b.count - a.count);
-    items.slice(0, 50).forEach(item => {
+    items.forEach(item => {
         const row = document.createElement('tr');
         const countBadgeClass = item.count > 20 ? 'danger' : item.count > 10 ? 'warning' : 'info';
         row.innerHTML = `
@@ -1979,25 +1902,20 @@ function renderComplexPatternTable(tableId, patterns) {
     
     tbody.innerHTML = '';
 
-    // Convert patterns object to sorted array
-    const items = Object.keys(patterns).map(key => {
-        const [user, operation, ip] = key.split('|');
-        return {
-            user,
-            operation,
-            ip,
-            count: patterns[key]
-        };
-    });
+    // Rows arrive sorted by count, most frequent first
+    const items = (patterns?.top || []).map(item => ({
+        user: String(item.user || 'Inconnu'),
+        operation: String(item.operation || 'Inconnu'),
+        ip: String(item.ClientIP || 'Inconnu'),
+        count: item.count
+    }));
 
     if (items.length === 0) {
         tbody.innerHTML = '<tr><td colspan="4" class="text-center text-muted py-3"><small>Aucun pattern détecté</small></td></tr>';
         return;
     }
 
-    // Sort by count descending (top 50)
-    items.sort((a, b) => b.count - a.count);
-    items.slice(0, 50).forEach(item => {
+    items.forEach(item => {
         const row = document.createElement('tr');
         const countBadgeClass = item.count > 20 ? 'danger' : item.count > 10 ? 'warning' : 'info';
         const userDisplay = item.user.length > 25 ? item.user.substring(0, 25) + '...' : item.user;
@@ -2092,6 +2010,8 @@ function resetAnalysis() {
     currentSessionId = null;
     currentLogType = null;
     analysisData = {};
+    timelineFilters = {};
+    timelineSort = { sort: 'timestamp', order: 'desc' };
 
     // Reset form
     uploadForm.reset();
@@ -2127,67 +2047,6 @@ function formatDate(dateString) {
     }
 }
 
-// Fonctions de filtrage pour la chronologie
-function applyTimelineFilters() {
-    const filterIps = document.getElementById('filter-ips')?.value || '';
-    const excludeIps = document.getElementById('exclude-ips')?.value || '';
-    const filterUser = document.getElementById('filter-user')?.value || '';
-    const filterOperation = document.getElementById('filter-operation')?.value || '';
-    
-    // Get the original operations (before any filtering)
-    const originalOps = window.timelineOriginalOperations || window.timelineAllOperations || [];
-    if (!originalOps || originalOps.length === 0) return;
-    
-    let filtered = originalOps.filter(op => {
-        // Filtre IP à inclure - support multiple field names (client_ip, ClientIPAddress, ClientIP, SenderIp)
-        if (filterIps) {
-            const clientIp = op.ClientIP || op.client_ip || op.ClientIPAddress || op.SenderIp || '';
-            if (!clientIp.includes(filterIps)) {
-                return false;
-            }
-        }
-        
-        // Filtre IP à exclure - support multiple field names
-        if (excludeIps) {
-            const clientIp = op.ClientIP || op.client_ip || op.ClientIPAddress || op.SenderIp || '';
-            if (clientIp.includes(excludeIps)) {
-                return false;
-            }
-        }
-        
-        // Filtre utilisateur
-        if (filterUser && !op.user?.toLowerCase().includes(filterUser.toLowerCase())) {
-            return false;
-        }
-        
-        // Filtre opération
-        if (filterOperation && !op.operation?.toLowerCase().includes(filterOperation.toLowerCase())) {
-            return false;
-        }
-        
-        return true;
-    });
-    
-    // Update the global operations to the filtered set
-    window.timelineAllOperations = filtered;
-    
-    // Mettre à jour le tableau
-    initializeTimelinePagination(filtered);
-}
-
-function resetTimelineFilters() {
-    document.getElementById('filter-ips').value = '';
-    document.getElementById('exclude-ips').value = '';
-    document.getElementById('filter-user').value = '';
-    document.getElementById('filter-operation').value = '';
-    
-    // Restore to original operations
-    if (window.timelineOriginalOperations) {
-        window.timelineAllOperations = window.timelineOriginalOperations;
-        initializeTimelinePagination(window.timelineOriginalOperations);
-    }
-}
-
 // Show details in modal
 // Make table rows clickable
 function makeRowsClickable(tableSelector, clickHandler) {
@@ -4,22 +4,59 @@ from __future__ import annotations
 
 import json
 from dataclasses import dataclass, field
-from typing import TYPE_CHECKING, Any
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, ClassVar
 
+import numpy as np
+import pandas as pd
 from pandas import DataFrame
 from polykit.text import color, print_color
 
 if TYPE_CHECKING:
     from logging import Logger
 
-    from pandas import DataFrame
+    from pandas import DataFrame, Series
     from polykit.text.types import TextColor
 
 
+def value_counts(series: Series) -> Series:
+    """Count the values of a column, leaving out categories that don't occur in it.
+
+    Categorical columns keep every category of the full log after filtering, so a plain
+    `value_counts` would also list users, IPs, or operations with zero events. Values are ordered
+    from most to least frequent, with ties in order of first appearance for every kind of column,
+    so ranked tables don't depend on how a column is stored.
+    """
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        return series.value_counts(sort=False).sort_values(ascending=False, kind="stable")
+
+    codes = series.cat.codes.to_numpy()
+    present, first, counts = np.unique(codes[codes >= 0], return_index=True, return_counts=True)
+    order = np.lexsort((first, -counts))
+    index = pd.Index(series.cat.categories[present[order]], name=series.name)
+    return pd.Series(counts[order], index=index, name="count")
+
+
+def grouped_counts(df: DataFrame, key: str, column: str) -> dict[Any, dict[Any, int]]:
+    """Count the values of a column for every value of a key column, in one grouped pass.
+
+    Each key's counts are ordered from most to least frequent, like `value_counts`, with ties in
+    order of first appearance. Keys with no events are left out.
+    """
+    pairs = df.groupby([key, column], observed=True, sort=False).size()
+    counts: dict[Any, dict[Any, int]] = {}
+    for (key_value, value), count in pairs.sort_values(ascending=False, kind="stable").items():
+        counts.setdefault(key_value, {})[value] = int(count)
+    return counts
+
+
 @dataclass
 class AuditAnalyzer:
     """Base class for all analyzers with common attributes."""
 
+    # Columns decoded from AuditData or derived at ingest that the analyzer reads
+    required_columns: ClassVar[tuple[str, ...]] = ()
+
     config: AuditConfig
     out: OutputFormatter
     logger: Logger
@@ -37,6 +74,10 @@ class AuditConfig:
     # SharePoint and email domains
     sharepoint_domains: list[str] | None = None
     email_domain: str | None = None
+    # Rows scanned at a time when detecting domains
+    domain_batch_size: int = 100_000
+    # Stop SharePoint domain detection after this many batches find no new domain (None scans all)
+    domain_stable_batches: int | None = None
 
     # File settings and data
     excluded_file_types: list[str] = field(
@@ -114,6 +155,10 @@ class AuditConfig:
         }
     )
 
+    # Cache of prepared audit log frames, keyed by file contents
+    cache_dir: Path = field(default_factory=lambda: Path.home() / ".cache" / "purrrr")
+    cache_size_mb: int = 2048
+
     # Sign-in analysis settings from Entra ID
     entra_columns: dict[str, dict[str, Any]] = field(
         default_factory=lambda: {
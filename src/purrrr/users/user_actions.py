@@ -6,23 +6,27 @@ import operator
 from collections import defaultdict
 from dataclasses import dataclass
 from pathlib import Path
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, ClassVar
 
 import pandas as pd
 from pandas import DataFrame
 from polykit.text import print_color as printc
 from tabulate import tabulate
 
-from purrrr.tools import AuditAnalyzer
+from purrrr.tools import AuditAnalyzer, value_counts
 
 if TYPE_CHECKING:
     from pandas import DataFrame
 
+    from purrrr.ingest.aggregates import UserSummary
+
 
 @dataclass
 class UserActions(AuditAnalyzer):
     """Analyze user activity in the file actions."""
 
+    required_columns: ClassVar[tuple[str, ...]] = ("Operation", "UserId", "SourceFileName")
+
     def __post_init__(self) -> None:
         self.max_users: int = self.config.max_users
 
@@ -53,10 +57,14 @@ class UserActions(AuditAnalyzer):
         if df.empty:
             return pd.Series()
 
-        user_counts = df["UserId"].value_counts().head(self.max_users)
+        user_counts = value_counts(df["UserId"]).head(self.max_users)
+        self.print_top_users(user_counts, df["UserId"].nunique(), action_name)
+        return user_counts
 
-        # Only display the table if there's more than one user
-        unique_users = df["UserId"].nunique()
+    def print_top_users(
+        self, user_counts: pd.Series[int], unique_users: int, action_name: str
+    ) -> None:
+        """Print a table of the top users, if there's more than one user."""
         if unique_users > 1:
             self.out.print_header(
                 f"Top {min(self.max_users, unique_users)} users by {action_name} count"
@@ -71,7 +79,22 @@ class UserActions(AuditAnalyzer):
             headers = ["User", "Name", "Count"]
             print(tabulate(table_data, headers=headers, tablefmt="simple"))
 
-        return user_counts
+    def display_summary(self, summary: UserSummary) -> None:
+        """Display user activity totals accumulated from a streamed log."""
+        if not summary.users:
+            return
+
+        self.out.print_header(f"Top {min(self.max_users, len(summary.users))} most active users")
+
+        table_data = []
+        for user, count in summary.users.most_common(self.max_users):
+            display_name = self.config.user_mapping.get(str(user).lower(), "Unknown")
+            first_seen = summary.first_seen[user].strftime("%Y-%m-%d %H:%M")
+            last_seen = summary.last_seen[user].strftime("%Y-%m-%d %H:%M")
+            table_data.append([user, display_name, count, first_seen, last_seen])
+
+        headers = ["User", "Name", "Count", "First Action", "Last Action"]
+        print(tabulate(table_data, headers=headers, tablefmt="simple"))
 
     def get_grouped_actions(
         self, user_actions: DataFrame, actions_to_analyze: list[str], sort_by: str
@@ -0,0 +1,66 @@
+"""Web application support.
+
+This module provides the infrastructure behind the Flask interface, including a session store that keeps uploaded logs in memory within a byte budget, spilling the least recently used sessions to disk as Parquet and expiring idle ones. For serving from several worker processes, sessions can instead live in a shared directory of memory-mapped Arrow files, one per uploaded file so appending to a session writes only the new file, indexed in Redis or on the filesystem, so any worker can serve any session. An analysis session keeps each uploaded file as an immutable segment, and each segment gets inverted indexes from users, operations, files, IPs, and days to its rows, so analysis filters intersect row ID sets instead of scanning the events. Uploads are parsed by a background job queue that publishes its progress to the same kind of index. Exchange events are summarized in one pass per uploaded file, with totals that merge across a session's files and sample email details per operation, and each session's Exchange timeline is indexed for filtering, sorting, paging, and counting co-occurring values on the server, and filtered events can be exported as NDJSON or CSV, or as the Exchange activity CSV, encoded and streamed a chunk at a time. JSON responses are serialized with orjson and compressed with brotli or gzip as the client accepts, and analysis results are cached pre-compressed by session, dataset version, and parameters, in memory and in Redis.
+"""  # noqa: D212, D415, W505
+
+from __future__ import annotations
+
+from .analysis import (
+    FILTER_PARAMS,
+    AnalysisSession,
+    SessionSegment,
+    apply_filters,
+    as_list,
+    check_filters,
+    filter_rows,
+    has_filters,
+)
+from .exchange import (
+    EXCHANGE_DETAILS_PER_OPERATION,
+    EXCHANGE_IP_FIELDS,
+    EXCHANGE_USER_COLUMNS,
+    ExchangeActivity,
+    exchange_item,
+    exchange_items,
+    first_present,
+)
+from .exports import (
+    EXPORT_CHUNK_ROWS,
+    EXPORT_FORMATS,
+    exchange_chunks,
+    export_chunks,
+    frame_chunks,
+)
+from .filters import FILTER_COLUMNS, ColumnIndex, FilterIndex
+from .jobs import (
+    FAILED,
+    FINISHED_STATES,
+    PARSING,
+    PRECOMPUTING,
+    QUEUED,
+    READY,
+    Job,
+    JobQueue,
+)
+from .responses import (
+    BROTLI_AVAILABLE,
+    STORED_ENCODING,
+    FastJSONProvider,
+    compress,
+    compress_response,
+    decompress,
+    encode_json,
+    encoded_json_response,
+    install_responses,
+)
+from .results import ResultCache, canonical_params
+from .server import GUNICORN_AVAILABLE, serve
+from .sessions import SessionStore, SpillableSession, frame_memory
+from .shared import (
+    FileSessionIndex,
+    MemorySessionIndex,
+    RedisSessionIndex,
+    SessionIndex,
+    SharedFrameStore,
+)
+from .timeline import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, TIMELINE_FIELDS, Timeline
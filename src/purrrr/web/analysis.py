@@ -0,0 +1,308 @@
+# type: ignore[reportAssignmentType]
+
+from __future__ import annotations
+
+import bisect
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+import pandas as pd
+
+from purrrr.ingest import categorize, parse_audit_record
+from purrrr.network import IPFilter
+from purrrr.tools import AuditConfig
+
+from .exchange import ExchangeActivity
+from .filters import FilterIndex
+from .sessions import frame_memory
+from .timeline import Timeline
+
+if TYPE_CHECKING:
+    from logging import Logger
+
+    import numpy as np
+    from pandas import DataFrame
+
+# Request parameters that filter the events an analysis covers
+FILTER_PARAMS = ("user", "actions", "files", "ips", "exclude_ips", "start_date", "end_date")
+
+
+@dataclass
+class SessionSegment:
+    """The events of one uploaded file, never modified once added to a session."""
+
+    id: str
+    df: DataFrame
+    offset: int  # Position of the segment's first event among all of the session's events
+    source_columns: list[str] = field(default_factory=list)  # The file's own columns
+    _index: FilterIndex | None = field(default=None, repr=False)
+
+    @property
+    def index(self) -> FilterIndex:
+        """Get the inverted indexes the analysis filters are evaluated with, built on first use."""
+        if self._index is None:
+            self._index = FilterIndex(self.df)
+        return self._index
+
+
+class AnalysisSession:
+    """Manages analysis session data.
+
+    Each uploaded file is kept as its own immutable segment rather than concatenated onto one
+    growing frame, so adding a file never copies the events already loaded. Exchange totals and
+    the timeline index are built per segment, in a single pass over each, and merged, scanning
+    only the segments added since they were last used, so the thirtieth file costs as much to
+    add as the first.
+    """
+
+    def __init__(
+        self,
+        df: DataFrame | None = None,
+        user_map_df: DataFrame | None = None,
+        logger: Logger | None = None,
+    ):
+        """Initialize analysis session."""
+        self.segments: list[SessionSegment] = []
+        self.user_map_df = user_map_df
+        self.config = AuditConfig()
+        self.version = time.time_ns()
+        self._exchange = ExchangeActivity()
+        self._timeline: Timeline | None = None
+        self._scanned = 0  # Segments folded into the Exchange totals and timeline
+        self._lock = threading.RLock()
+        self._logger = logger
+
+        if df is not None:
+            self.append(df)
+
+        # Set up user mapping if provided
+        if user_map_df is not None:
+            self._setup_user_mapping()
+
+    @property
+    def rows(self) -> int:
+        """Get the number of events across all segments."""
+        return sum(len(segment.df) for segment in self.segments)
+
+    @property
+    def df(self) -> DataFrame:
+        """Get all of the session's events as one frame.
+
+        With several segments this copies them all into a new frame, so analyses should work
+        segment by segment or through `filtered` where they can.
+        """
+        if len(self.segments) == 1:
+            return self.segments[0].df
+        return categorize(pd.concat([segment.df for segment in self.segments], ignore_index=True))
+
+    def append(
+        self,
+        df: DataFrame,
+        segment_id: str | None = None,
+        source_columns: list[str] | None = None,
+    ) -> None:
+        """Add the events of a file as a new segment.
+
+        The file's own columns, before decoded AuditData fields were added, are taken from
+        `source_columns` or else from what parsing recorded in the frame. The dataset version
+        changes, so results cached for the previous data are not reused.
+        """
+        source_columns = source_columns or df.attrs.get("source_columns") or list(df.columns)
+        with self._lock:
+            segment = SessionSegment(
+                segment_id or uuid.uuid4().hex, df, self.rows, list(source_columns)
+            )
+            self.segments.append(segment)
+            self.version = time.time_ns()
+
+    def frames(self) -> list[tuple[str, DataFrame]]:
+        """Get the session's segments as (ID, frame) pairs, oldest first."""
+        return [(segment.id, segment.df) for segment in self.segments]
+
+    def filtered(self, params: dict[str, Any]) -> DataFrame:
+        """Get the events matching the request filters, filtering each segment on its own."""
+        if len(self.segments) == 1:
+            return apply_filters(self.segments[0], params, self._logger)
+        parts = [apply_filters(segment, params, self._logger) for segment in self.segments]
+        return categorize(pd.concat(parts, ignore_index=True))
+
+    def audit_record(self, row: int) -> dict[str, Any] | None:
+        """Get the parsed AuditData of the event at a position, or None if there is none."""
+        index = bisect.bisect_right([segment.offset for segment in self.segments], row) - 1
+        if row < 0 or index < 0:
+            return None
+        segment = self.segments[index]
+        position = row - segment.offset
+        if position >= len(segment.df) or "AuditData" not in segment.df.columns:
+            return None
+        return parse_audit_record(segment.df["AuditData"].iat[position])
+
+    @property
+    def exchange_activity(self) -> ExchangeActivity:
+        """Get the Exchange totals of the session, folding in segments added since last use."""
+        with self._lock:
+            self._scan_exchange()
+            return self._exchange
+
+    @property
+    def timeline(self) -> Timeline:
+        """Get the Exchange timeline of the session, indexing segments added since last use."""
+        with self._lock:
+            self._scan_exchange()
+            return self._timeline
+
+    def _scan_exchange(self) -> None:
+        """Build the Exchange totals and timeline of new segments in one pass over each."""
+        added = self.segments[self._scanned :]
+        if self._timeline is not None and not added:
+            return
+
+        parts = [] if self._timeline is None else [(self._timeline, 0)]
+        for segment in added:
+            activity = ExchangeActivity()
+            events: list[dict[str, Any]] = []
+            activity.update(segment.df, events)
+            self._exchange.merge(activity)
+            parts.append((Timeline.from_records(events), segment.offset))
+        self._timeline = Timeline.concat(parts)
+        self._scanned = len(self.segments)
+
+    def _setup_user_mapping(self) -> None:
+        """Set up user mapping from provided CSV."""
+        if self.user_map_df is None:
+            return
+        try:
+            for _, row in self.user_map_df.iterrows():
+                if len(row) >= 2:
+                    upn = str(row.iloc[0]).strip()
+                    name = str(row.iloc[1]).strip()
+                    if upn and name:
+                        self.config.user_mapping[upn] = name
+        except Exception as e:
+            self._log("error", "Error setting up user mapping: %s", e)
+
+    def memory_usage(self) -> int:
+        """Get the approximate number of bytes the session holds in memory."""
+        size = sum(frame_memory(segment.df) for segment in self.segments)
+        size += sum(s._index.memory_usage() for s in self.segments if s._index is not None)
+        if self._timeline is not None:
+            size += self._timeline.memory_usage()
+        if self.user_map_df is not None:
+            size += frame_memory(self.user_map_df)
+        return size
+
+    def spill_state(self) -> dict[str, Any]:
+        """Get the state stored alongside the frame when the session is spilled or shared."""
+        return {
+            "user_mapping": self.config.user_mapping,
+            "version": self.version,
+            "source_columns": [segment.source_columns for segment in self.segments],
+        }
+
+    @classmethod
+    def restore(
+        cls,
+        frames: list[tuple[str, DataFrame]],
+        state: dict[str, Any],
+        logger: Logger | None = None,
+    ) -> AnalysisSession:
+        """Rebuild a session from its stored segments and state."""
+        session_obj = cls(logger=logger)
+        source_columns = state.get("source_columns") or []
+        if len(source_columns) != len(frames):
+            # Spilled sessions are stored as one frame holding every segment's columns
+            merged = list(dict.fromkeys(c for columns in source_columns for c in columns))
+            source_columns = [merged] * len(frames)
+        for (segment_id, df), columns in zip(frames, source_columns, strict=True):
+            session_obj.append(df, segment_id, columns)
+        session_obj.config.user_mapping = state.get("user_mapping", {})
+        session_obj.version = state.get("version", session_obj.version)
+        return session_obj
+
+    def _log(self, level: str, msg: str, *args: Any) -> None:
+        if self._logger is not None:
+            getattr(self._logger, level)(msg, *args)
+
+
+def as_list(value: str | list[str] | None) -> list[str]:
+    """Accept a filter given either as a list or as comma-separated values."""
+    if isinstance(value, str):
+        return [v.strip() for v in value.split(",") if v.strip()]
+    return list(value or [])
+
+
+def has_filters(params: dict[str, Any]) -> bool:
+    """Check whether request parameters filter the events at all."""
+    return any(params.get(name) for name in FILTER_PARAMS)
+
+
+def check_filters(params: dict[str, Any]) -> None:
+    """Check that request filters are well formed, before any events are filtered with them.
+
+    Raises:
+        ValueError: If a filter has the wrong type, the user or file pattern is not a valid
+            regular expression, or a date can't be read.
+    """
+    for name in ("user", "files", "start_date", "end_date"):
+        if not isinstance(params.get(name) or "", str):
+            msg = f"Filter '{name}' must be a string"
+            raise ValueError(msg)
+
+    for name in ("actions", "ips", "exclude_ips"):
+        value = params.get(name) or []
+        if not isinstance(value, str) and not (
+            isinstance(value, list) and all(isinstance(v, str) for v in value)
+        ):
+            msg = f"Filter '{name}' must be a string or a list of strings"
+            raise ValueError(msg)
+
+    for name in ("user", "files"):
+        try:
+            re.compile(params.get(name) or "")
+        except re.error as e:
+            msg = f"Invalid pattern for filter '{name}': {e}"
+            raise ValueError(msg) from e
+
+    # The date range only filters when both ends are given
+    if params.get("start_date") and params.get("end_date"):
+        for name in ("start_date", "end_date"):
+            try:
+                pd.Timestamp(params[name])
+            except ValueError as e:
+                msg = f"Invalid date for filter '{name}': {e}"
+                raise ValueError(msg) from e
+
+
+def apply_filters(
+    segment: SessionSegment, params: dict[str, Any], logger: Logger | None = None
+) -> DataFrame:
+    """Apply user-defined filters to a segment, through its inverted indexes."""
+    rows = filter_rows(segment, params, logger)
+    return segment.df if rows is None else segment.df.take(rows)
+
+
+def filter_rows(
+    segment: SessionSegment, params: dict[str, Any], logger: Logger | None = None
+) -> np.ndarray | None:
+    """Get the positions of a segment's events matching the filters, or None for all of them."""
+    # Date range filter, applied only when both ends are given
+    days = None
+    if params.get("start_date") and params.get("end_date"):
+        try:
+            days = (pd.Timestamp(params["start_date"]), pd.Timestamp(params["end_date"]))
+        except ValueError as e:
+            if logger is not None:
+                logger.error("Date filtering error: %s", e)
+
+    return segment.index.rows(
+        user=params.get("user") or "",
+        actions=as_list(params.get("actions")),
+        files=params.get("files") or "",
+        # IP include/exclude filters (wildcards and CIDR blocks)
+        ip_filter=IPFilter.from_patterns(params.get("ips"), params.get("exclude_ips")),
+        days=days,
+    )
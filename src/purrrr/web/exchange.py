@@ -0,0 +1,238 @@
+# type: ignore[reportAssignmentType]
+
+from __future__ import annotations
+
+import json
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from purrrr.ingest import RunningSummary, parse_audit_record
+from purrrr.tools import value_counts
+
+if TYPE_CHECKING:
+    from pandas import DataFrame
+
+# Sample email details kept per Exchange operation type
+EXCHANGE_DETAILS_PER_OPERATION = 100
+
+# Columns holding an Exchange event's user, and fields holding its client IP, in order of preference
+EXCHANGE_USER_COLUMNS = ("MailboxOwnerUPN", "UserId")
+EXCHANGE_IP_FIELDS = ("ClientIP", "ClientIPAddress", "client_ip", "SenderIp")
+
+
+@dataclass
+class ExchangeActivity(RunningSummary):
+    """Running totals behind the Exchange analysis, merged across the segments of a session."""
+
+    operations: Counter[str] = field(default_factory=Counter)
+    user_operations: Counter[tuple[str, str]] = field(default_factory=Counter)
+    details: dict[str, list[dict[str, Any]]] = field(default_factory=dict)
+
+    def update(self, df: DataFrame, timeline: list[dict[str, Any]] | None = None) -> None:
+        """Fold a frame of events into the running totals in a single pass.
+
+        Operations, users, and client IPs are resolved column-wise up front, so the loop only
+        walks each event's decoded AuditData once. Given a `timeline` list, the event's timeline
+        entry is appended to it from the same pass, noting the position of its source row.
+        """
+        if df.empty:
+            return
+        self.events += len(df)
+        if "Operation" in df.columns:
+            self.operations.update(value_counts(df["Operation"]).to_dict())
+
+        operations = (
+            df["Operation"].to_numpy(dtype=object)
+            if "Operation" in df.columns
+            else np.full(len(df), "Unknown", dtype=object)
+        )
+        users = first_present(df, EXCHANGE_USER_COLUMNS)
+        client_ips = first_present(df, EXCHANGE_IP_FIELDS)
+        blobs = df["AuditData"].tolist() if "AuditData" in df.columns else [None] * len(df)
+
+        rows = zip(operations, users, client_ips, blobs, strict=True)
+        for position, (operation, user, client_ip, blob) in enumerate(rows):
+            record = None
+            if isinstance(blob, (dict, str, bytes)):
+                try:
+                    record = parse_audit_record(blob)
+                except (json.JSONDecodeError, TypeError):
+                    record = None
+
+            # Fall back to the mailbox owner recorded in AuditData, which the timeline doesn't
+            mailbox = user
+            if not mailbox and record is not None:
+                if "MailboxOwnerUPN" in record:
+                    mailbox = record["MailboxOwnerUPN"]
+                elif "UserId" in record:
+                    mailbox = record["UserId"]
+
+            # Email details are only worked out while the operation still needs samples
+            wants_details = bool(mailbox) and (
+                len(self.details.get(operation, ())) < EXCHANGE_DETAILS_PER_OPERATION
+            )
+            wants_event = timeline is not None and bool(user)
+            details: list[dict[str, Any]] = []
+            event = None
+            if record is not None and (wants_details or wants_event):
+                try:
+                    details, event = exchange_items(operation, record)
+                except (json.JSONDecodeError, TypeError):
+                    pass
+
+            if mailbox:
+                self.user_operations[mailbox, operation] += 1
+                self._add_details(operation, details)
+
+            if wants_event and event is not None:
+                subject, folder = event
+                if not client_ip:
+                    client_ip = next((record[k] for k in EXCHANGE_IP_FIELDS if record.get(k)), "")
+                timeline.append({
+                    "timestamp": record.get("CreationTime", ""),
+                    "operation": operation,
+                    "subject": subject,
+                    "folder": folder,
+                    "user": user,
+                    "Workload": record.get("Workload", ""),
+                    "ClientIP": client_ip,
+                    "row": position,
+                })
+
+    def merge(self, other: ExchangeActivity) -> None:
+        """Merge the totals of another Exchange summary into this one."""
+        super().merge(other)
+        for operation, details in other.details.items():
+            self._add_details(operation, details)
+
+    def _add_details(self, operation: str, details: list[dict[str, Any]]) -> None:
+        kept = self.details.setdefault(operation, [])
+        kept.extend(details[: EXCHANGE_DETAILS_PER_OPERATION - len(kept)])
+
+    def result(self, user_mapping: dict[str, str]) -> dict[str, Any]:
+        """Build the Exchange analysis response from the totals."""
+        # Get operations by user with details
+        users_by_operation: dict[str, list[tuple[str, int]]] = {}
+        for (user, operation), count in self.user_operations.items():
+            users_by_operation.setdefault(operation, []).append((user, count))
+
+        user_operations: dict[str, dict[str, int]] = {}
+        for operation, users in users_by_operation.items():
+            for user, count in users:
+                user_operations.setdefault(user, {})[operation] = count
+
+        # Populate operations_by_user
+        operations_by_user = {}
+        for user, operations_dict in user_operations.items():
+            display_name = user_mapping.get(user, user)
+            operations_by_user[display_name] = {
+                "total": sum(operations_dict.values()),
+                "operations": operations_dict
+            }
+
+        return {
+            "total_operations": self.events,
+            "unique_mailboxes": len(user_operations),
+            "operations_by_type": dict(self.operations.most_common()),
+            "operations_by_user": operations_by_user,
+            "operation_details": self.details,
+        }
+
+
+def first_present(df: DataFrame, columns: tuple[str, ...]) -> np.ndarray:
+    """Get, for each row, the value of the first of the columns that holds one, or None."""
+    values = np.full(len(df), None, dtype=object)
+    missing = np.ones(len(df), dtype=bool)
+    for column in columns:
+        if column not in df.columns or not missing.any():
+            continue
+        column_values = df[column].to_numpy(dtype=object)
+        present = missing & df[column].notna().to_numpy() & (column_values != "")
+        values[present] = column_values[present]
+        missing &= ~present
+    return values
+
+
+def exchange_items(
+    operation: str, record: dict[str, Any]
+) -> tuple[list[dict[str, Any]], tuple[str, str] | None]:
+    """Extract the email details and the timeline subject and folder of one Exchange event.
+
+    MailItemsAccessed events list up to three of the items they touched, and inbox rule changes
+    describe the rule from their parameters. Other operations take their subject and folder from
+    the item or first affected item. The timeline entry is None when there is nothing to show.
+    """
+    timestamp = record.get("CreationTime", "")
+
+    # Special handling for MailItemsAccessed with Folders structure
+    if operation == "MailItemsAccessed" and record.get("Folders"):
+        details = []
+        for folder_item in record["Folders"]:
+            folder_path = folder_item.get("Path", "")
+            for item in folder_item.get("FolderItems", [])[: 3 - len(details)]:
+                details.append({
+                    "timestamp": timestamp,
+                    "subject": item.get("Subject", ""),
+                    "folder": folder_path,
+                    "size": item.get("SizeInBytes", 0),
+                })
+            if len(details) >= 3:
+                break
+        # The timeline shows one representative item per operation
+        event = (details[0]["subject"], details[0]["folder"]) if details else None
+        return details, event
+
+    # Special handling for New-InboxRule and Set-InboxRule - extract from Parameters
+    is_rule = operation in ["New-InboxRule", "Set-InboxRule"]
+    if is_rule:
+        parameters = record.get("Parameters", [])
+        param_dict = {}
+        if isinstance(parameters, list):
+            for param in parameters:
+                if isinstance(param, dict):
+                    param_dict[param.get("Name", "")] = param.get("Value", "")
+
+        rule_name = param_dict.get("Name", "")
+        rule_from = param_dict.get("From", "")
+        rule_id = param_dict.get("Identity", "")
+        event = (
+            f"Rule: {rule_name}" if rule_name else "Inbox Rule",
+            f"From: {rule_from}" if rule_from else "",
+        )
+
+        # Rule changes without parameters get their details like any other operation
+        if "Parameters" in record:
+            if not (rule_name or rule_from):
+                return [], event
+            return [{
+                "timestamp": timestamp,
+                "subject": f"Rule: {rule_name}" if rule_name else "Inbox Rule Change",
+                "folder": f"From: {rule_from}" if rule_from else rule_id or "N/A",
+                "size": 0,
+            }], event
+
+    subject, folder, size = exchange_item(record)
+    details = []
+    if subject or folder or size:
+        details.append({"timestamp": timestamp, "subject": subject, "folder": folder, "size": size})
+    return details, event if is_rule else (subject, folder)
+
+
+def exchange_item(record: dict[str, Any]) -> tuple[str, str, int]:
+    """Get the subject, folder, and size of the item an Exchange event acted on."""
+    subject = record.get("Subject")
+
+    # Try Item field first (for SendAs, Send, MailItemsAccessed when Item present)
+    if "Item" in record:
+        item = record["Item"]
+    # Otherwise try AffectedItems (for HardDelete, SoftDelete, Move, etc.)
+    elif record.get("AffectedItems"):
+        item = record["AffectedItems"][0]
+    else:
+        return subject or "", "", 0
+
+    subject = subject or item.get("Subject", "")
+    return subject or "", item.get("ParentFolder", {}).get("Path", ""), item.get("SizeInBytes", 0)
@@ -0,0 +1,137 @@
+# type: ignore[reportAssignmentType]
+
+from __future__ import annotations
+
+import io
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import pandas as pd
+
+from .analysis import filter_rows
+from .responses import encode_json
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+    from logging import Logger
+
+    from pandas import DataFrame
+
+    from purrrr.exchange import ExchangeOperations
+
+    from .analysis import SessionSegment
+
+# Formats events can be exported in, with the content type of each
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# Events encoded at once while exporting, which bounds the memory an export holds at any time
+EXPORT_CHUNK_ROWS = 5000
+
+
+def frame_chunks(
+    df: DataFrame, rows: np.ndarray | None = None, size: int = EXPORT_CHUNK_ROWS
+) -> Iterator[DataFrame]:
+    """Split the given rows of a frame, or all of them, into frames of at most `size` rows.
+
+    Chunks are taken from the frame as they are needed, so the selected rows are never copied
+    all at once.
+    """
+    if rows is None:
+        for start in range(0, len(df), size):
+            yield df.iloc[start : start + size]
+    else:
+        for start in range(0, len(rows), size):
+            yield df.take(rows[start : start + size])
+
+
+def export_chunks(chunks: Iterable[DataFrame], fmt: str, columns: list[str]) -> Iterator[bytes]:
+    """Encode frames of events as NDJSON lines or CSV rows, yielding the bytes of each frame.
+
+    Every chunk is written with the same columns, missing ones left empty, so chunks from files
+    with different columns still make up one consistent CSV. Parsed AuditData records are
+    written as JSON text in CSV cells.
+    """
+    if fmt not in EXPORT_FORMATS:
+        msg = f"Unknown export format: {fmt}"
+        raise ValueError(msg)
+
+    if fmt == "csv":
+        yield pd.DataFrame(columns=columns).to_csv(index=False, lineterminator="\r\n").encode()
+
+    for chunk in chunks:
+        chunk = chunk.reindex(columns=columns)
+        if fmt == "ndjson":
+            yield b"".join(encode_json(record) + b"\n" for record in chunk.to_dict("records"))
+            continue
+
+        if "AuditData" in chunk.columns:
+            chunk = chunk.assign(AuditData=chunk["AuditData"].map(_json_text))
+        buffer = io.StringIO()
+        chunk.to_csv(buffer, header=False, index=False, lineterminator="\r\n")
+        yield buffer.getvalue().encode()
+
+
+def _json_text(value: object) -> object:
+    """Render a parsed record as JSON text, leaving text and missing values as they are."""
+    return encode_json(value).decode() if isinstance(value, (dict, list)) else value
+
+
+def exchange_chunks(
+    segments: list[SessionSegment],
+    params: dict[str, Any],
+    exchange: ExchangeOperations,
+    logger: Logger | None = None,
+) -> Iterator[DataFrame]:
+    """Get the Exchange events of segments matching the filters, processed, in time order.
+
+    Only the positions and dates of the matching events are gathered and sorted up front, when
+    this is called, so invalid filters raise before any chunk is consumed; the events themselves
+    are taken and processed a chunk at a time as the chunks are consumed. Events without a
+    readable date are left out, since their place in time is unknown.
+    """
+    numbers, rows, dates = [], [], []
+    for number, segment in enumerate(segments):
+        df = segment.df
+        selected = filter_rows(segment, params, logger)
+        if selected is None:
+            selected = np.arange(len(df))
+        if "Workload" in df.columns:
+            selected = selected[df["Workload"].to_numpy()[selected] == "Exchange"]
+        numbers.append(np.full(len(selected), number))
+        rows.append(selected)
+        days = pd.to_datetime(df["CreationDate"].to_numpy()[selected], errors="coerce", utc=True)
+        dates.append(days.tz_localize(None).to_numpy())
+
+    if not segments:
+        return iter(())
+    numbers, rows, dates = np.concatenate(numbers), np.concatenate(rows), np.concatenate(dates)
+    order = np.argsort(dates, kind="stable")
+    order = order[~np.isnat(dates[order])]
+    return _exchange_events(segments, numbers, rows, dates, order, exchange)
+
+
+def _exchange_events(
+    segments: list[SessionSegment],
+    numbers: np.ndarray,
+    rows: np.ndarray,
+    dates: np.ndarray,
+    order: np.ndarray,
+    exchange: ExchangeOperations,
+) -> Iterator[DataFrame]:
+    """Take and process the selected Exchange events in chunks, in the given order."""
+    for start in range(0, len(order), EXPORT_CHUNK_ROWS):
+        chunk = order[start : start + EXPORT_CHUNK_ROWS]
+        # Take each segment's events of the chunk at once, then put them back in time order
+        parts = []
+        for number in np.unique(numbers[chunk]):
+            positions = np.flatnonzero(numbers[chunk] == number)
+            part = segments[number].df.take(rows[chunk[positions]])
+            parts.append(part.set_axis(positions))
+        events = pd.concat(parts).sort_index() if len(parts) > 1 else parts[0]
+        events = events.assign(CreationDate=pd.DatetimeIndex(dates[chunk]))
+        events = exchange.process_exchange_events(events)
+        if not events.empty:
+            yield events
@@ -0,0 +1,152 @@
+# type: ignore[reportAssignmentType]
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from pandas import DataFrame, Timestamp
+
+    from purrrr.network import IPFilter
+
+# Columns indexed for the analysis filters, by the filter that reads them
+FILTER_COLUMNS = {
+    "user": "UserId",
+    "operation": "Operation",
+    "file": "SourceFileName",
+    "ip": "ClientIP",
+}
+
+# Beyond this many matching values, rows are found from each row's value code rather than by
+# merging the row IDs of every value, which stops paying off once most values match
+MAX_POSTING_LISTS = 256
+
+
+class ColumnIndex:
+    """The row IDs of each distinct value of a column, so a filter can fetch its rows directly.
+
+    Rows are grouped by value in one array, each value's IDs in ascending order, and located
+    through the start of each value's group. Filters are evaluated once per distinct value rather
+    than once per row, then turned into row IDs.
+    """
+
+    def __init__(self, values: pd.Series, sort: bool = False) -> None:
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            codes = values.cat.codes.to_numpy()
+            self.values = values.cat.categories
+        else:
+            codes, self.values = pd.factorize(values, sort=sort)
+        self._codes = codes
+        self._order = np.argsort(codes, kind="stable").astype(np.int32)
+        # Missing values have code -1, so their rows come before the start of the first value
+        self._starts = np.searchsorted(codes[self._order], np.arange(len(self.values) + 1))
+
+    def memory_usage(self) -> int:
+        """Get the number of bytes held by the index."""
+        return self._codes.nbytes + self._order.nbytes + self._starts.nbytes
+
+    def select(self, keep: np.ndarray, missing: bool = False) -> np.ndarray:
+        """Get the sorted row IDs of the values marked in `keep`, and of missing values if set."""
+        codes = np.flatnonzero(keep)
+        if len(codes) > MAX_POSTING_LISTS:
+            by_code = np.append(keep, missing)  # Code -1 looks up the last entry
+            return np.flatnonzero(by_code[self._codes]).astype(np.int32)
+
+        parts = [self._order[self._starts[code] : self._starts[code + 1]] for code in codes]
+        if missing:
+            parts.append(self._order[: self._starts[0]])
+        if not parts:
+            return np.empty(0, dtype=np.int32)
+        return parts[0] if len(parts) == 1 else np.sort(np.concatenate(parts))
+
+    def between(self, start: object, end: object) -> np.ndarray:
+        """Get the sorted row IDs of the values from `start` to `end` included.
+
+        Only meaningful for an index built with sorted values.
+        """
+        first = self._starts[self.values.searchsorted(start, side="left")]
+        last = self._starts[self.values.searchsorted(end, side="right")]
+        return np.sort(self._order[first:last])
+
+
+class FilterIndex:
+    """Inverted indexes over the filterable columns of an immutable frame.
+
+    Users, operations, file names, and client IPs each map to the rows holding them, and days to
+    the rows of each day, so analysis filters intersect row ID sets found through the distinct
+    values instead of scanning every row of the frame on each request. Filters on columns the
+    frame doesn't have are ignored.
+    """
+
+    def __init__(self, df: DataFrame) -> None:
+        self.size = len(df)
+        self.columns = {
+            name: ColumnIndex(df[column])
+            for name, column in FILTER_COLUMNS.items()
+            if column in df.columns
+        }
+        self.days = None
+        if "CreationDate" in df.columns:
+            dates = pd.to_datetime(df["CreationDate"], errors="coerce", utc=True)
+            self.days = ColumnIndex(dates.dt.tz_localize(None).dt.normalize(), sort=True)
+
+    def memory_usage(self) -> int:
+        """Get the number of bytes held by the indexes."""
+        size = sum(index.memory_usage() for index in self.columns.values())
+        return size + (self.days.memory_usage() if self.days is not None else 0)
+
+    def rows(
+        self,
+        user: str = "",
+        actions: Iterable[str] = (),
+        files: str = "",
+        ip_filter: IPFilter | None = None,
+        days: tuple[Timestamp, Timestamp] | None = None,
+    ) -> np.ndarray | None:
+        """Get the sorted IDs of the rows matching every filter given, or None for all rows.
+
+        Args:
+            user: Pattern to look for in the user, ignoring case.
+            actions: Operations to keep, matched exactly.
+            files: Pattern to look for in the file name, ignoring case.
+            ip_filter: Include and exclude IP patterns checked against the client IP.
+            days: First and last days to keep, the last one included in full.
+        """
+        selections = []
+
+        if user and (index := self.columns.get("user")) is not None:
+            selections.append(index.select(_contains(index.values, user)))
+
+        if actions and (index := self.columns.get("operation")) is not None:
+            selections.append(index.select(index.values.isin(list(actions))))
+
+        if files and (index := self.columns.get("file")) is not None:
+            selections.append(index.select(_contains(index.values, files)))
+
+        if ip_filter and (index := self.columns.get("ip")) is not None:
+            keep = ip_filter.mask(pd.Series(index.values, dtype=object))
+            selections.append(index.select(keep, missing=bool(ip_filter.mask([None])[0])))
+
+        if days is not None and self.days is not None:
+            start, end = (day.normalize() for day in days)
+            selections.append(self.days.between(start, end))
+
+        if not selections:
+            return None
+
+        # Intersect the smallest sets first, so each step works on as few IDs as possible
+        selections.sort(key=len)
+        rows = selections[0]
+        for selection in selections[1:]:
+            rows = np.intersect1d(rows, selection, assume_unique=True)
+        return rows
+
+
+def _contains(values: pd.Index, pattern: str) -> np.ndarray:
+    """Check which values contain a regular expression, ignoring case."""
+    return pd.Series(values, dtype=object).str.contains(pattern, case=False, na=False).to_numpy()
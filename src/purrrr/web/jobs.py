@@ -0,0 +1,102 @@
+# type: ignore[reportAssignmentType]
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from logging import Logger
+
+    from purrrr.web.shared import SessionIndex
+
+# Job states, in the order a successful job moves through them
+QUEUED = "queued"
+PARSING = "parsing"
+PRECOMPUTING = "precomputing"
+READY = "ready"
+FAILED = "failed"
+
+FINISHED_STATES = frozenset({READY, FAILED})
+
+
+@dataclass
+class Job:
+    """Progress of loading an upload into a session in the background."""
+
+    id: str
+    state: str = QUEUED
+    filename: str = ""
+    rows: int = 0
+    bytes_read: int = 0
+    total_bytes: int = 0
+    error: str | None = None
+    result: dict[str, Any] | None = None
+
+    @property
+    def finished(self) -> bool:
+        """Whether the job has succeeded or failed."""
+        return self.state in FINISHED_STATES
+
+
+class JobQueue:
+    """Background upload jobs run on a thread pool, with their progress kept in an index.
+
+    Jobs are keyed by the session they load, so a session has at most one upload in progress.
+    Progress is written to the index as the job runs, so with a shared index any worker process
+    can report on a job started by another.
+    """
+
+    def __init__(self, index: SessionIndex, workers: int, logger: Logger | None = None) -> None:
+        self.index = index
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="purrrr-job")
+        self._logger = logger
+        self._lock = threading.Lock()
+
+    def get(self, job_id: str) -> Job | None:
+        """Get the latest progress of a job, or None if it is unknown or expired."""
+        record = self.index.get(job_id, touch=False)
+        return Job(**record) if record else None
+
+    def running(self, job_id: str) -> Job | None:
+        """Get a job if it is still queued or running."""
+        job = self.get(job_id)
+        return job if job is not None and not job.finished else None
+
+    def submit(
+        self, job_id: str, work: Callable[[Job], dict[str, Any]], **details: Any
+    ) -> Job | None:
+        """Queue `work` to run in the background, or return None if the job is already running.
+
+        The work function reports progress with `update` and returns the job's result.
+        """
+        with self._lock:
+            if self.running(job_id) is not None:
+                return None
+            job = Job(job_id, **details)
+            self.update(job)
+
+        self._executor.submit(self._run, job, work)
+        return job
+
+    def update(self, job: Job, **changes: Any) -> None:
+        """Apply changes to a job and publish its progress."""
+        for name, value in changes.items():
+            setattr(job, name, value)
+        self.index.put(job.id, asdict(job))
+
+    def _run(self, job: Job, work: Callable[[Job], dict[str, Any]]) -> None:
+        try:
+            result = work(job)
+        except Exception as e:
+            self._log("error", "Job %s failed: %s", job.id, e)
+            self.update(job, state=FAILED, error=str(e))
+        else:
+            self.update(job, state=READY, result=result)
+
+    def _log(self, level: str, msg: str, *args: Any) -> None:
+        if self._logger is not None:
+            getattr(self._logger, level)(msg, *args)
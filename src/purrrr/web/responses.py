@@ -0,0 +1,180 @@
+# type: ignore[reportAssignmentType]
+
+from __future__ import annotations
+
+import datetime
+import gzip
+import json
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import pandas as pd
+from flask import Response, request
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import brotli
+
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+if TYPE_CHECKING:
+    from flask import Flask
+
+# Bodies smaller than this are sent as they are, since compressing them saves next to nothing
+MIN_COMPRESS_BYTES = 1024
+
+# Content types worth compressing
+COMPRESSIBLE_TYPES = frozenset({
+    "application/json",
+    "application/javascript",
+    "text/css",
+    "text/csv",
+    "text/html",
+    "text/javascript",
+    "text/plain",
+})
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Encoding for bodies compressed once and stored, such as cached analysis results
+STORED_ENCODING = "br" if BROTLI_AVAILABLE else "gzip"
+
+
+def _default(value: Any) -> Any:
+    """Convert the values orjson doesn't handle natively, and refuse anything else."""
+    if value is pd.NaT or value is pd.NA:
+        return None
+    if isinstance(value, (pd.Timestamp, datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, pd.Timedelta):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (set, frozenset, pd.Index, pd.Series)):
+        return list(value)
+    msg = f"Object of type {type(value).__name__} is not JSON serializable"
+    raise TypeError(msg)
+
+
+def encode_json(value: Any) -> bytes:
+    """Serialize a value to JSON, including numpy arrays and numpy and pandas scalars.
+
+    Values orjson can't take, such as dictionaries keyed by numpy scalars, are converted to plain
+    Python values first and go through the standard library encoder, which is slower.
+    """
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(
+                value,
+                default=_default,
+                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+            )
+        except orjson.JSONEncodeError:
+            pass
+    return json.dumps(_plain(value), default=_default, ensure_ascii=False).encode()
+
+
+def _plain(value: Any) -> Any:
+    """Recursively convert numpy values and dictionary keys for the standard library encoder."""
+    if isinstance(value, dict):
+        return {_plain_key(k): _plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return value
+
+
+def _plain_key(key: Any) -> Any:
+    if isinstance(key, np.generic):
+        key = key.item()
+    return key if isinstance(key, (str, int, float, bool)) or key is None else str(key)
+
+
+class FastJSONProvider(JSONProvider):
+    """Flask JSON provider that serializes with orjson when it is installed."""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return encode_json(obj).decode()
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if ORJSON_AVAILABLE:
+            return orjson.loads(s)
+        return json.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(encode_json(obj), mimetype="application/json")
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """Compress a body with a content encoding, `br` or `gzip`."""
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def decompress(data: bytes, encoding: str) -> bytes:
+    """Decompress a body compressed with `compress`."""
+    if encoding == "br":
+        return brotli.decompress(data)
+    return gzip.decompress(data)
+
+
+def accepted_encodings() -> list[str]:
+    """Get the encodings the current request accepts that can be produced, best first."""
+    accept = request.accept_encodings
+    candidates = ["br", "gzip"] if BROTLI_AVAILABLE else ["gzip"]
+    return [encoding for encoding in candidates if accept[encoding] > 0]
+
+
+def compress_response(response: Response) -> Response:
+    """Compress a response body with the best encoding the client accepts.
+
+    Streamed and already-encoded responses, and bodies too small to benefit, are left alone.
+    """
+    response.vary.add("Accept-Encoding")
+    if (
+        response.direct_passthrough
+        or response.is_streamed
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESSIBLE_TYPES
+        or not 200 <= response.status_code < 300
+    ):
+        return response
+
+    data = response.get_data()
+    if len(data) < MIN_COMPRESS_BYTES or not (encodings := accepted_encodings()):
+        return response
+
+    response.set_data(compress(data, encodings[0]))
+    response.headers["Content-Encoding"] = encodings[0]
+    return response
+
+
+def encoded_json_response(data: bytes, encoding: str, status: int = 200) -> Response:
+    """Serve JSON that was compressed ahead of time, as is if the client accepts its encoding."""
+    if encoding in accepted_encodings():
+        response = Response(data, status=status, mimetype="application/json")
+        response.headers["Content-Encoding"] = encoding
+    else:
+        # compress_response re-encodes it if the client accepts another encoding
+        response = Response(decompress(data, encoding), status=status, mimetype="application/json")
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+def install_responses(app: Flask) -> None:
+    """Serialize an app's JSON responses with orjson and compress its responses."""
+    app.json = FastJSONProvider(app)
+    app.after_request(compress_response)
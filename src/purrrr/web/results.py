@@ -0,0 +1,124 @@
+# type: ignore[reportAssignmentType]
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from datetime import timedelta
+    from logging import Logger
+
+
+def canonical_params(params: dict[str, Any]) -> str:
+    """Render analysis parameters as canonical JSON, so equivalent requests share a cache entry.
+
+    Empty values are dropped since they don't filter anything, keys are sorted, and lists of
+    values are sorted since filters treat them as sets.
+    """
+
+    def canonical(value: Any) -> Any:
+        if isinstance(value, dict):
+            return {k: canonical(v) for k, v in value.items() if v not in (None, "", [], {})}
+        if isinstance(value, (list, tuple)):
+            items = [canonical(item) for item in value]
+            return sorted(items) if all(isinstance(item, str) for item in items) else items
+        return value
+
+    return json.dumps(canonical(params), sort_keys=True, separators=(",", ":"), default=str)
+
+
+class ResultCache:
+    """Encoded analysis results cached by session, dataset version, analysis, and parameters.
+
+    Results are kept in this process within `max_bytes`, evicting the least recently used, and in
+    Redis when a client is given, so other worker processes and restarts can reuse them. Keys
+    include the session's dataset version, so results computed before the data changed are never
+    served again; `invalidate` also frees them right away.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        redis: Any = None,
+        ttl: timedelta | None = None,
+        prefix: str = "purrrr:result:",
+        logger: Logger | None = None,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.redis = redis
+        self.ttl = int(ttl.total_seconds()) if ttl is not None else None
+        self.prefix = prefix
+        self._logger = logger
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def key(self, session_id: str, version: Any, analysis: str, params: dict[str, Any]) -> str:
+        """Build the cache key of an analysis of one version of a session's data."""
+        digest = hashlib.sha256(canonical_params(params).encode()).hexdigest()[:32]
+        return f"{self.prefix}{session_id}:{version}:{analysis}:{digest}"
+
+    def get(self, key: str) -> bytes | None:
+        """Get a cached result, from this process or else from Redis."""
+        with self._lock:
+            if (data := self._entries.get(key)) is not None:
+                self._entries.move_to_end(key)
+                return data
+
+        if self.redis is None:
+            return None
+        try:
+            data = self.redis.get(key)
+        except Exception as e:
+            self._log("warning", "Unable to read cached result from Redis: %s", e)
+            return None
+        if data is not None:
+            self._store_local(key, data)
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """Cache a result in this process and in Redis."""
+        self._store_local(key, data)
+        if self.redis is None:
+            return
+        try:
+            self.redis.set(key, data, ex=self.ttl)
+        except Exception as e:
+            self._log("warning", "Unable to cache result in Redis: %s", e)
+
+    def invalidate(self, session_id: str) -> None:
+        """Remove every cached result of a session, whatever its version."""
+        session_prefix = f"{self.prefix}{session_id}:"
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(session_prefix)]:
+                self._bytes -= len(self._entries.pop(key))
+
+        if self.redis is None:
+            return
+        try:
+            keys = list(self.redis.scan_iter(match=f"{session_prefix}*", count=1000))
+            if keys:
+                self.redis.delete(*keys)
+        except Exception as e:
+            self._log("warning", "Unable to invalidate cached results in Redis: %s", e)
+        self._log("debug", "Invalidated cached results for session %s", session_id)
+
+    def _store_local(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            if (previous := self._entries.pop(key, None)) is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = data
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def _log(self, level: str, msg: str, *args: Any) -> None:
+        if self._logger is not None:
+            getattr(self._logger, level)(msg, *args)
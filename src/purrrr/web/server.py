@@ -0,0 +1,45 @@
+# type: ignore[reportAssignmentType]
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+try:
+    from gunicorn.app.base import BaseApplication
+
+    GUNICORN_AVAILABLE = True
+except ImportError:
+    GUNICORN_AVAILABLE = False
+
+if TYPE_CHECKING:
+    from flask import Flask
+
+# Seconds a worker may spend on one request, generous enough for large uploads and analyses
+WORKER_TIMEOUT = 900
+
+
+def serve(app: Flask, host: str, port: int, workers: int, **options: Any) -> None:
+    """Serve the app from a number of pre-forked worker processes using gunicorn.
+
+    The app is loaded once in the parent and inherited by each worker when it forks, so anything
+    set up at import time, such as the session store, is shared configuration rather than state.
+    Extra keyword arguments are passed through as gunicorn settings.
+
+    Raises:
+        ValueError: If gunicorn is not installed.
+    """
+    if not GUNICORN_AVAILABLE:
+        msg = "The gunicorn package is required to serve with several workers"
+        raise ValueError(msg)
+
+    settings = {"bind": f"{host}:{port}", "workers": workers, "timeout": WORKER_TIMEOUT, **options}
+
+    class _Server(BaseApplication):
+        def load_config(self) -> None:
+            for key, value in settings.items():
+                self.cfg.set(key, value)
+
+        def load(self) -> Flask:
+            return app
+
+    _Server().run()
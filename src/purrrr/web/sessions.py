@@ -0,0 +1,281 @@
+# type: ignore[reportAssignmentType]
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Generic, Protocol, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+    from datetime import timedelta
+    from logging import Logger
+
+    from pandas import DataFrame
+
+    from purrrr.ingest import FrameCache
+    from purrrr.web.shared import SharedFrameStore
+
+# Rows sampled to estimate the size of columns holding nested objects such as decoded AuditData
+NESTED_SAMPLE_ROWS = 1000
+
+
+class SpillableSession(Protocol):
+    """A session whose data can be measured, written out as frames, and rebuilt from them."""
+
+    df: DataFrame
+
+    def frames(self) -> list[tuple[str, DataFrame]]:
+        """Get the session's data as immutable segments, each an (ID, frame) pair."""
+
+    def memory_usage(self) -> int:
+        """Get the approximate number of bytes the session holds in memory."""
+
+    def spill_state(self) -> dict[str, Any]:
+        """Get the JSON-serializable state needed to rebuild the session alongside its frame."""
+
+
+S = TypeVar("S", bound=SpillableSession)
+
+
+def _object_size(value: Any) -> int:
+    """Measure an object along with the dictionaries and lists nested inside it."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_object_size(k) + _object_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(_object_size(item) for item in value)
+    return size
+
+
+def frame_memory(df: DataFrame) -> int:
+    """Get the deep memory footprint of a frame in bytes.
+
+    Pandas counts only the outer object of each cell, which badly undercounts columns of decoded
+    records, so those are measured on a sample of rows and scaled up.
+    """
+    usage = df.memory_usage(index=True, deep=True)
+    total = int(usage.sum())
+
+    for column in df.columns:
+        if df[column].dtype != object or df.empty:
+            continue
+        sample = df[column].iloc[:: max(len(df) // NESTED_SAMPLE_ROWS, 1)].tolist()
+        if not any(isinstance(value, (dict, list)) for value in sample):
+            continue
+        nested = sum(_object_size(value) for value in sample) * len(df) / len(sample)
+        total += int(nested) - int(usage[column])
+
+    return total
+
+
+@dataclass
+class _Entry(Generic[S]):
+    session: S | None  # None while spilled to disk
+    size: int
+    last_access: float
+    version: int | None = None  # Dataset version in the shared store
+
+
+class SessionStore(MutableMapping[str, S]):
+    """Analysis sessions kept in memory within a byte budget.
+
+    Each session's memory footprint is measured when it is stored. Once the resident sessions
+    exceed `max_bytes`, the least recently used ones are spilled to `spill` as one Parquet frame
+    and rebuilt with `restore` on their next access, or dropped if there is nowhere to spill them.
+    The most recently stored session is always kept resident, even if it is over budget on its own.
+    Sessions not accessed for `ttl` expire and are removed, wherever they are.
+
+    With a `shared` store, every session stored is also written there and memory holds only a
+    per-process cache of them. Any worker process can then serve any session: a cached copy is
+    used while its version matches the shared one and reloaded once another worker replaces it,
+    and sessions over budget are simply dropped from the cache. Expiry is left to the shared
+    store's index, and iterating or counting covers only the sessions cached in this process.
+    Sessions are shared as their segments, so storing a session again after appending to it only
+    writes the new segments.
+
+    Sessions that are modified in place must be stored again so their size is re-measured and,
+    with a shared store, so other workers see the change.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        ttl: timedelta | None = None,
+        spill: FrameCache | None = None,
+        restore: Callable[[list[tuple[str, DataFrame]], dict[str, Any]], S] | None = None,
+        logger: Logger | None = None,
+        shared: SharedFrameStore | None = None,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.ttl = ttl.total_seconds() if ttl is not None and shared is None else None
+        self.spill = spill if restore is not None and shared is None else None
+        self.shared = shared if restore is not None else None
+        self._restore = restore
+        self._logger = logger
+        self._entries: OrderedDict[str, _Entry[S]] = OrderedDict()
+        self._resident_bytes = 0
+        self._lock = threading.RLock()
+
+    @property
+    def resident_bytes(self) -> int:
+        """Get the measured size of the sessions currently held in memory."""
+        return self._resident_bytes
+
+    def __getitem__(self, session_id: str) -> S:
+        with self._lock:
+            self._expire()
+            if self.shared is not None:
+                return self._get_shared(session_id)
+
+            entry = self._entries[session_id]
+            entry.last_access = time.monotonic()
+            self._entries.move_to_end(session_id)
+
+            if entry.session is None:
+                entry.session = self._reload(session_id)
+                entry.size = entry.session.memory_usage()
+                self._resident_bytes += entry.size
+                self._evict()
+
+            return entry.session
+
+    def __setitem__(self, session_id: str, session: S) -> None:
+        with self._lock:
+            version = None
+            if self.shared is not None:
+                version = self.shared.save(session_id, session.frames(), session.spill_state())
+
+            self._remove(session_id)
+            entry = _Entry(session, session.memory_usage(), time.monotonic(), version)
+            self._entries[session_id] = entry
+            self._resident_bytes += entry.size
+            self._expire()
+            self._evict()
+
+    def __delitem__(self, session_id: str) -> None:
+        with self._lock:
+            if session_id not in self:
+                raise KeyError(session_id)
+            self._remove(session_id)
+            if self.shared is not None:
+                self.shared.delete(session_id)
+
+    def __contains__(self, session_id: object) -> bool:
+        with self._lock:
+            self._expire()
+            if self.shared is not None:
+                return isinstance(session_id, str) and self.shared.version(session_id) is not None
+            if (entry := self._entries.get(session_id)) is None:
+                return False
+            if entry.session is not None:
+                return True
+            return self.spill is not None and session_id in self.spill
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            self._expire()
+            return iter(list(self._entries))
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._expire()
+            return len(self._entries)
+
+    def _remove(self, session_id: str) -> None:
+        if (entry := self._entries.pop(session_id, None)) is None:
+            return
+        if entry.session is not None:
+            self._resident_bytes -= entry.size
+        elif self.spill is not None:
+            self.spill.discard(session_id)
+
+    def _expire(self) -> None:
+        if self.ttl is None:
+            return
+        cutoff = time.monotonic() - self.ttl
+        expired = [sid for sid, entry in self._entries.items() if entry.last_access < cutoff]
+        for session_id in expired:
+            self._remove(session_id)
+            self._log("info", "Session %s expired", session_id)
+
+    def _evict(self) -> None:
+        """Spill or drop least recently used sessions until the resident ones fit the budget."""
+        newest = next(reversed(self._entries), None)
+        for session_id, entry in list(self._entries.items()):
+            if self._resident_bytes <= self.max_bytes:
+                break
+            if entry.session is None or session_id == newest:
+                continue
+            if self.shared is not None:
+                self._remove(session_id)  # Still available from the shared store
+                continue
+
+            spilled = self._spill(session_id, entry.session)
+            self._resident_bytes -= entry.size
+            entry.session = None
+            if not spilled:
+                del self._entries[session_id]
+                self._log("warning", "Session %s dropped to stay within memory budget", session_id)
+
+        if self._resident_bytes > self.max_bytes:
+            self._log(
+                "warning",
+                "Session memory at %d MB exceeds the %d MB budget",
+                self._resident_bytes // (1024 * 1024),
+                self.max_bytes // (1024 * 1024),
+            )
+
+    def _spill(self, session_id: str, session: S) -> bool:
+        if self.spill is None:
+            return False
+        try:
+            self.spill.store(session_id, session.df, session.spill_state())
+        except (OSError, ValueError, TypeError) as e:
+            self._log("warning", "Unable to spill session %s: %s", session_id, e)
+            return False
+        if session_id not in self.spill:
+            return False  # No Parquet support, or evicted by the spill directory's own budget
+        self._log("info", "Session %s spilled to disk", session_id)
+        return True
+
+    def _get_shared(self, session_id: str) -> S:
+        """Get a session from the local cache, reloading it if the shared copy has moved on."""
+        if (version := self.shared.version(session_id)) is None:
+            self._remove(session_id)
+            raise KeyError(session_id)
+
+        entry = self._entries.get(session_id)
+        if entry is None or entry.version != version:
+            if (loaded := self.shared.load(session_id)) is None:
+                self._remove(session_id)
+                raise KeyError(session_id)
+            frames, state, version = loaded
+            session = self._restore(frames, state)
+            self._remove(session_id)
+            entry = _Entry(session, session.memory_usage(), time.monotonic(), version)
+            self._entries[session_id] = entry
+            self._resident_bytes += entry.size
+            self._evict()
+
+        entry.last_access = time.monotonic()
+        self._entries.move_to_end(session_id)
+        return entry.session
+
+    def _reload(self, session_id: str) -> S:
+        if self.spill is None or (loaded := self.spill.load(session_id)) is None:
+            del self._entries[session_id]
+            raise KeyError(session_id)
+        self.spill.discard(session_id)
+        self._log("info", "Session %s reloaded from disk", session_id)
+        df, state = loaded
+        return self._restore([(uuid.uuid4().hex, df)], state)
+
+    def _log(self, level: str, msg: str, *args: Any) -> None:
+        if self._logger is not None:
+            getattr(self._logger, level)(msg, *args)
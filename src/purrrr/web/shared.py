@@ -0,0 +1,246 @@
+# type: ignore[reportAssignmentType]
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Protocol
+
+from purrrr.ingest import PYARROW_AVAILABLE, frame_to_table, table_to_frame
+
+if PYARROW_AVAILABLE:
+    import pyarrow as pa
+
+if TYPE_CHECKING:
+    from logging import Logger
+
+    from pandas import DataFrame
+
+# Session and segment IDs become file names, so only these characters are accepted
+_SESSION_ID = re.compile(r"[A-Za-z0-9_-]{1,128}")
+
+# Segment files not in the index are left alone for this long, in case a save is in progress
+ORPHAN_GRACE_SECONDS = 300
+
+
+class SessionIndex(Protocol):
+    """Where the shared store records each session's current version, segments, and state."""
+
+    def get(self, session_id: str, touch: bool = True) -> dict[str, Any] | None:
+        """Get a session's record, or None if it is unknown or expired.
+
+        Reads count as activity and push back the session's expiry unless `touch` is False.
+        """
+
+    def put(self, session_id: str, record: dict[str, Any]) -> None:
+        """Create or replace a session's record."""
+
+    def delete(self, session_id: str) -> None:
+        """Remove a session's record."""
+
+
+class MemorySessionIndex:
+    """Records kept in this process, for a single worker."""
+
+    def __init__(self, ttl: float | None) -> None:
+        self._ttl = ttl
+        self._records: dict[str, tuple[float, dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str, touch: bool = True) -> dict[str, Any] | None:
+        with self._lock:
+            if (item := self._records.get(session_id)) is None:
+                return None
+            accessed, record = item
+            if self._ttl and time.monotonic() - accessed > self._ttl:
+                del self._records[session_id]
+                return None
+            if touch:
+                self._records[session_id] = (time.monotonic(), record)
+            return record
+
+    def put(self, session_id: str, record: dict[str, Any]) -> None:
+        with self._lock:
+            self._records[session_id] = (time.monotonic(), record)
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._records.pop(session_id, None)
+
+
+class RedisSessionIndex:
+    """Session records kept in Redis, expiring through Redis key TTLs."""
+
+    def __init__(self, client: Any, ttl: float | None, prefix: str = "purrrr:session:") -> None:
+        self._client = client
+        self._ttl = int(ttl) if ttl else None
+        self._prefix = prefix
+
+    def get(self, session_id: str, touch: bool = True) -> dict[str, Any] | None:
+        key = self._prefix + session_id
+        if (raw := self._client.get(key)) is None:
+            return None
+        if touch and self._ttl:
+            self._client.expire(key, self._ttl)
+        return json.loads(raw)
+
+    def put(self, session_id: str, record: dict[str, Any]) -> None:
+        self._client.set(self._prefix + session_id, json.dumps(record, default=str), ex=self._ttl)
+
+    def delete(self, session_id: str) -> None:
+        self._client.delete(self._prefix + session_id)
+
+
+class FileSessionIndex:
+    """Session records kept as JSON files, for running several workers without Redis.
+
+    Expiry is tracked through file modification times, refreshed on every read.
+    """
+
+    def __init__(self, directory: Path, ttl: float | None) -> None:
+        self._directory = directory
+        self._ttl = ttl
+
+    def _path(self, session_id: str) -> Path:
+        return self._directory / f"{session_id}.json"
+
+    def get(self, session_id: str, touch: bool = True) -> dict[str, Any] | None:
+        if not _SESSION_ID.fullmatch(session_id):
+            return None
+        path = self._path(session_id)
+        try:
+            if self._ttl and time.time() - path.stat().st_mtime > self._ttl:
+                path.unlink(missing_ok=True)
+                return None
+            record = json.loads(path.read_text(encoding="utf-8"))
+            if touch:
+                os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return record
+
+    def put(self, session_id: str, record: dict[str, Any]) -> None:
+        self._directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self._directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(record, f, default=str)
+        os.replace(tmp_name, self._path(session_id))
+
+    def delete(self, session_id: str) -> None:
+        self._path(session_id).unlink(missing_ok=True)
+
+
+class SharedFrameStore:
+    """Session datasets shared by every worker process through a common directory.
+
+    A session is stored as its immutable segments, one Arrow IPC file each. A save writes the
+    segments that don't have a file yet and then points the session's index record at the new
+    list, so appending a file to a session writes only that file's events, readers never see a
+    partial file, and they can compare versions to tell when their copy is stale. Files are
+    memory-mapped on load, letting workers share the operating system's page cache.
+    """
+
+    def __init__(self, directory: Path, index: SessionIndex, logger: Logger | None = None) -> None:
+        if not PYARROW_AVAILABLE:
+            msg = "The pyarrow package is required to share sessions between workers"
+            raise ValueError(msg)
+        self.directory = directory
+        self.index = index
+        self._logger = logger
+
+    def _path(self, session_id: str, segment_id: str) -> Path:
+        return self.directory / f"{session_id}.{segment_id}.arrow"
+
+    def version(self, session_id: str) -> int | None:
+        """Get the current dataset version of a session, or None if there is none."""
+        if not _SESSION_ID.fullmatch(session_id):
+            return None
+        record = self.index.get(session_id)
+        return record["version"] if record else None
+
+    def save(
+        self, session_id: str, frames: list[tuple[str, DataFrame]], state: dict[str, Any]
+    ) -> int:
+        """Write a session's segments and state as a new version, returning the version.
+
+        Segments already written by an earlier save are left as they are.
+        """
+        ids = [session_id, *(segment_id for segment_id, _ in frames)]
+        if invalid := [value for value in ids if not _SESSION_ID.fullmatch(value)]:
+            msg = f"Invalid session or segment ID: {invalid[0]!r}"
+            raise ValueError(msg)
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for segment_id, df in frames:
+            if not self._path(session_id, segment_id).exists():
+                self._write(self._path(session_id, segment_id), df)
+
+        # Dropped segments may still be being read by another worker, so the sweep removes them
+        version = time.time_ns()
+        segments = [segment_id for segment_id, _ in frames]
+        rows = sum(len(df) for _, df in frames)
+        record = {"version": version, "segments": segments, "rows": rows, "state": state}
+        self.index.put(session_id, record)
+        self.sweep()
+        return version
+
+    def _write(self, path: Path, df: DataFrame) -> None:
+        table = frame_to_table(df)
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            with pa.OSFile(tmp_name, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+            os.replace(tmp_name, path)
+        finally:
+            Path(tmp_name).unlink(missing_ok=True)
+
+    def load(
+        self, session_id: str
+    ) -> tuple[list[tuple[str, DataFrame]], dict[str, Any], int] | None:
+        """Load a session's current segments, state, and version, or None if it has none."""
+        if not _SESSION_ID.fullmatch(session_id) or not (record := self.index.get(session_id)):
+            return None
+        frames = []
+        for segment_id in record.get("segments", []):
+            try:
+                with pa.memory_map(str(self._path(session_id, segment_id))) as source:
+                    table = pa.ipc.open_file(source).read_all()
+                df, _ = table_to_frame(table)
+            except (OSError, ValueError, pa.ArrowException) as e:
+                self._log("warning", "Unable to load shared session %s: %s", session_id, e)
+                return None
+            frames.append((segment_id, df))
+        return frames, record.get("state", {}), record["version"]
+
+    def delete(self, session_id: str) -> None:
+        """Remove a session's record and segments."""
+        if not _SESSION_ID.fullmatch(session_id):
+            return
+        self.index.delete(session_id)
+        for path in self.directory.glob(f"{session_id}.*.arrow"):
+            path.unlink(missing_ok=True)
+
+    def sweep(self) -> None:
+        """Remove segments whose sessions have expired or no longer include them."""
+        cutoff = time.time() - ORPHAN_GRACE_SECONDS
+        for path in self.directory.glob("*.arrow"):
+            session_id, _, segment_id = path.stem.rpartition(".")
+            try:
+                if path.stat().st_mtime > cutoff:
+                    continue
+            except OSError:
+                continue
+            record = self.index.get(session_id, touch=False)
+            if record is None or segment_id not in record.get("segments", []):
+                path.unlink(missing_ok=True)
+                self._log("debug", "Removed stale shared session file %s", path.name)
+
+    def _log(self, level: str, msg: str, *args: Any) -> None:
+        if self._logger is not None:
+            getattr(self._logger, level)(msg, *args)
@@ -0,0 +1,217 @@
+# type: ignore[reportAssignmentType]
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+    from pandas import DataFrame
+
+    from purrrr.network import IPFilter
+
+# Fields of each timeline event, which are also the keys it can be sorted by
+TIMELINE_FIELDS = ("timestamp", "operation", "subject", "folder", "user", "Workload", "ClientIP")
+
+# Fields matched exactly, ignoring case, when filtering on a list of values
+_FACET_FIELDS = ("operation", "user", "Workload")
+
+# Page size used when a request doesn't ask for one, and the largest accepted
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+
+
+class Timeline:
+    """A session's chronology of events, indexed for filtering, sorting, and paging on the server.
+
+    Events are held as columns, each with its distinct values factorized once, so filters compare
+    integer codes rather than strings. The order for each sort key and direction is computed on
+    first use and kept, so a page is cut from a pre-sorted index instead of sorting the events
+    per request.
+    Each event records the position of the source row it came from in `row`.
+    """
+
+    def __init__(self, events: DataFrame, times: pd.Series | None = None) -> None:
+        self.events = events.reset_index(drop=True)
+        if times is None:
+            times = pd.to_datetime(
+                self.events["timestamp"], format="ISO8601", errors="coerce", utc=True
+            ).dt.tz_localize(None)
+        self._times = times.reset_index(drop=True)
+        self._codes: dict[str, tuple[np.ndarray, pd.Index]] = {}
+        self._orders: dict[tuple[str, bool], np.ndarray] = {}
+
+    @classmethod
+    def from_records(cls, records: Iterable[dict[str, Any]]) -> Timeline:
+        """Build a timeline from event records holding the timeline fields and a source `row`."""
+        events = pd.DataFrame.from_records(list(records), columns=["row", *TIMELINE_FIELDS])
+        events["row"] = events["row"].astype(np.int64)
+        for field in TIMELINE_FIELDS:
+            events[field] = events[field].fillna("").astype(str)
+        return cls(events)
+
+    @classmethod
+    def concat(cls, parts: Iterable[tuple[Timeline, int]]) -> Timeline:
+        """Combine the timelines of consecutive segments of a dataset into one.
+
+        Each part comes with the position of its segment's first row in the whole dataset, which
+        is added to the source rows of its events. Parsed timestamps are reused, while factorized
+        values and sort orders are rebuilt on first use.
+        """
+        parts = list(parts)
+        if not parts:
+            return cls.from_records([])
+        if len(parts) == 1 and parts[0][1] == 0:
+            return parts[0][0]
+        events = pd.concat(
+            [part.events.assign(row=part.events["row"] + offset) for part, offset in parts],
+            ignore_index=True,
+        )
+        return cls(events, pd.concat([part._times for part, _ in parts], ignore_index=True))
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def memory_usage(self) -> int:
+        """Get the approximate number of bytes held by the events and their indexes."""
+        size = int(self.events.memory_usage(index=True, deep=True).sum())
+        size += sum(codes.nbytes for codes, _ in self._codes.values())
+        return size + sum(order.nbytes for order in self._orders.values())
+
+    def _factorized(self, field: str) -> tuple[np.ndarray, pd.Index]:
+        if field not in self._codes:
+            self._codes[field] = pd.factorize(self.events[field], sort=True)
+        return self._codes[field]
+
+    def order(self, sort: str = "timestamp", descending: bool = False) -> np.ndarray:
+        """Get the event positions sorted by a field, with ties kept in source order."""
+        if sort not in TIMELINE_FIELDS:
+            msg = f"Unknown sort key: {sort}"
+            raise ValueError(msg)
+
+        if (sort, descending) not in self._orders:
+            if sort == "timestamp":
+                # Unparseable timestamps sort as the earliest
+                keys = self._times.to_numpy(dtype="datetime64[ns]").view(np.int64)
+            else:
+                keys, _ = self._factorized(sort)
+            # Bitwise NOT reverses the order of the keys without overflowing, unlike negation
+            keys = ~keys if descending else keys
+            self._orders[sort, descending] = np.argsort(keys, kind="stable")
+
+        return self._orders[sort, descending]
+
+    def values(self, field: str) -> list[str]:
+        """Get the distinct non-empty values of a field, sorted."""
+        _, uniques = self._factorized(field)
+        return [value for value in uniques if value]
+
+    def counts(
+        self, fields: Sequence[str], mask: np.ndarray | None = None, limit: int | None = None
+    ) -> tuple[DataFrame, int]:
+        """Count the events of each combination of values of some fields, most frequent first.
+
+        Each event's combination is folded into a single integer from the fields' value codes,
+        so the counting is one vectorized pass whatever the number of fields. Returns the `limit`
+        most frequent combinations, with their `count`, and the number of distinct combinations.
+        """
+        factorized = [self._factorized(field) for field in fields]
+        keys = np.zeros(len(self.events), dtype=np.int64)
+        for codes, uniques in factorized:
+            keys = keys * len(uniques) + codes
+        if mask is not None:
+            keys = keys[mask]
+
+        combinations, counts = np.unique(keys, return_counts=True)
+        top = np.argsort(-counts, kind="stable")[:limit]
+        combinations = combinations[top]
+
+        # Unfold each combination back into its value codes, last field first
+        columns = {}
+        for field, (_, uniques) in reversed(list(zip(fields, factorized, strict=True))):
+            columns[field] = uniques[combinations % len(uniques)]
+            combinations = combinations // len(uniques)
+        frame = pd.DataFrame({field: columns[field] for field in fields})
+        frame["count"] = counts[top]
+        return frame, len(counts)
+
+    def mask(
+        self,
+        facets: dict[str, Iterable[str]] | None = None,
+        text: str = "",
+        ip_filter: IPFilter | None = None,
+        start: str = "",
+        end: str = "",
+        rows: np.ndarray | None = None,
+    ) -> np.ndarray | None:
+        """Get a boolean array of the events matching every filter given, or None for all.
+
+        Args:
+            facets: Values to keep per operation, user, or Workload field, matched ignoring case.
+            text: Text to look for in the subject or folder, ignoring case.
+            ip_filter: Include and exclude IP patterns checked against the client IP.
+            start: First day to keep, as YYYY-MM-DD.
+            end: Last day to keep, as YYYY-MM-DD, included in full.
+            rows: Positions of the source rows to keep events from.
+        """
+        keep = np.ones(len(self.events), dtype=bool)
+        filtered = False
+
+        for field, wanted in (facets or {}).items():
+            if field not in _FACET_FIELDS:
+                continue
+            wanted = {str(value).lower() for value in wanted if value}
+            if not wanted:
+                continue
+            codes, uniques = self._factorized(field)
+            matching = np.flatnonzero([value.lower() in wanted for value in uniques])
+            keep &= np.isin(codes, matching)
+            filtered = True
+
+        if text:
+            text = text.lower()
+            subject_codes, subjects = self._factorized("subject")
+            folder_codes, folders = self._factorized("folder")
+            in_subject = np.array([text in value.lower() for value in subjects], dtype=bool)
+            in_folder = np.array([text in value.lower() for value in folders], dtype=bool)
+            keep &= in_subject[subject_codes] | in_folder[folder_codes]
+            filtered = True
+
+        if ip_filter:
+            keep &= ip_filter.mask(self.events["ClientIP"].replace("", None))
+            filtered = True
+
+        if start:
+            keep &= (self._times >= pd.Timestamp(start)).to_numpy()
+            filtered = True
+        if end:
+            keep &= (self._times < pd.Timestamp(end) + pd.Timedelta(days=1)).to_numpy()
+            filtered = True
+
+        if rows is not None:
+            keep &= np.isin(self.events["row"].to_numpy(), rows)
+            filtered = True
+
+        return keep if filtered else None
+
+    def page(
+        self,
+        offset: int = 0,
+        limit: int | None = DEFAULT_PAGE_SIZE,
+        sort: str = "timestamp",
+        descending: bool = True,
+        mask: np.ndarray | None = None,
+    ) -> tuple[DataFrame, int]:
+        """Get one page of events in sorted order, along with how many events match in total.
+
+        A `limit` of None returns every matching event from `offset` on.
+        """
+        order = self.order(sort, descending)
+        if mask is not None:
+            order = order[mask[order]]
+        stop = None if limit is None else offset + limit
+        return self.events.iloc[order[offset:stop]], len(order)
@@ -0,0 +1,11 @@
+"""Shared setup for the purrrr test suite."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+# Make the package importable without installing it, as the benchmarks do
+src_path = Path(__file__).resolve().parent.parent / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
@@ -0,0 +1,140 @@
+"""Streaming zip reader against the standard library's zipfile."""
+
+from __future__ import annotations
+
+import io
+import struct
+import zipfile
+
+import pytest
+
+from purrrr.ingest import iter_csv_members, read_audit_log
+
+MEMBERS = {
+    "2024-01-01.csv": b"RecordId,Operation\r\n"
+    + b"".join(b"%d,FileAccessed\r\n" % i for i in range(5000)),
+    "readme.txt": b"not a log",
+    "nested/2024-01-02.CSV": b"RecordId,Operation\r\n1,FileDeleted\r\n",
+    "empty.csv": b"",
+}
+
+
+class Unseekable(io.RawIOBase):
+    """A write-only or read-only stream without seeking, like a socket or a pipe."""
+
+    def __init__(self, data: bytes = b"") -> None:
+        super().__init__()
+        self.data = bytearray(data)
+        self._offset = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def readable(self) -> bool:
+        return True
+
+    def write(self, data: bytes) -> int:
+        self.data += data
+        return len(data)
+
+    def readinto(self, buffer: bytearray | memoryview) -> int:
+        # Hand data out in small reads, so records straddle read boundaries
+        size = min(len(buffer), 1000, len(self.data) - self._offset)
+        buffer[:size] = self.data[self._offset : self._offset + size]
+        self._offset += size
+        return size
+
+
+def build_zip(
+    compression: int = zipfile.ZIP_DEFLATED,
+    streamed: bool = False,
+    zip64: bool = False,
+    members: dict[str, bytes] = MEMBERS,
+) -> bytes:
+    """Write members to a zip, optionally streamed with trailing data descriptors."""
+    target = Unseekable() if streamed else io.BytesIO()
+    with zipfile.ZipFile(target, "w", compression=compression) as archive:
+        for name, data in members.items():
+            with archive.open(name, "w", force_zip64=zip64) as member:
+                member.write(data)
+    return bytes(target.data) if streamed else target.getvalue()
+
+
+def read_members(data: bytes) -> list[bytes]:
+    """Read every CSV member of a zip through the streaming reader, from an unseekable source."""
+    return [member.read() for member in iter_csv_members(Unseekable(data), "logs.zip")]
+
+
+def expected_members(data: bytes) -> list[bytes]:
+    """Read the CSV members of a zip with zipfile, in archive order."""
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        names = [n for n in archive.namelist() if n.lower().endswith(".csv")]
+        return [archive.read(name) for name in names]
+
+
+@pytest.mark.parametrize(
+    ("compression", "streamed", "zip64"),
+    [
+        (zipfile.ZIP_DEFLATED, False, False),
+        (zipfile.ZIP_STORED, False, False),
+        (zipfile.ZIP_DEFLATED, True, False),
+        (zipfile.ZIP_DEFLATED, False, True),
+        (zipfile.ZIP_DEFLATED, True, True),
+        (zipfile.ZIP_STORED, False, True),
+    ],
+)
+def test_members_match_zipfile(compression: int, streamed: bool, zip64: bool) -> None:
+    """Every CSV member reads back as zipfile reads it, with data descriptors and Zip64 too."""
+    data = build_zip(compression, streamed, zip64)
+    assert read_members(data) == expected_members(data)
+    assert len(read_members(data)) == 3
+
+
+def test_members_can_be_skipped_unread() -> None:
+    """Members left unread are skipped, so the next one still starts in the right place."""
+    data = build_zip(streamed=True)
+    members = iter_csv_members(Unseekable(data), "logs.zip")
+    next(members).read(10)
+    assert next(members).read() == MEMBERS["nested/2024-01-02.CSV"]
+
+
+def test_stored_member_with_data_descriptor_is_rejected() -> None:
+    """Stored members of a streamed zip have no size to find their end by."""
+    data = build_zip(zipfile.ZIP_STORED, streamed=True)
+    with pytest.raises(ValueError, match="cannot be streamed"):
+        read_members(data)
+
+
+@pytest.mark.parametrize("compression", [zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED])
+def test_crc_mismatch_is_detected(compression: int) -> None:
+    """A member whose data doesn't match its CRC raises rather than yielding bad rows."""
+    data = bytearray(build_zip(compression))
+    crc_offset = 14  # Position of the CRC in the first local header
+    crc = struct.unpack_from("<I", data, crc_offset)[0]
+    struct.pack_into("<I", data, crc_offset, crc ^ 1)
+    with pytest.raises(ValueError, match="CRC"):
+        read_members(bytes(data))
+
+
+def test_encrypted_member_is_rejected() -> None:
+    """Encrypted members are refused rather than read as garbage."""
+    data = bytearray(build_zip())
+    flags = struct.unpack_from("<H", data, 6)[0]
+    struct.pack_into("<H", data, 6, flags | 0x01)
+    with pytest.raises(ValueError, match="Encrypted"):
+        read_members(bytes(data))
+
+
+def test_truncated_archive_is_rejected() -> None:
+    """An archive cut short raises instead of ending the member early."""
+    data = build_zip(streamed=True)
+    with pytest.raises(ValueError, match="ended unexpectedly"):
+        read_members(data[: len(data) // 3])
+
+
+def test_read_audit_log_merges_zip_members() -> None:
+    """Every CSV in the archive is parsed into one frame, in archive order."""
+    members = {name: data for name, data in MEMBERS.items() if data}
+    df = read_audit_log(Unseekable(build_zip(streamed=True, members=members)), name="logs.zip")
+    assert len(df) == 5001
+    assert df["Operation"].iloc[-1] == "FileDeleted"
@@ -0,0 +1,101 @@
+"""Round trips of prepared frames through the Parquet cache."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from purrrr.ingest import PYARROW_AVAILABLE, FrameCache, categorize, parse_audit_record
+
+pytestmark = pytest.mark.skipif(not PYARROW_AVAILABLE, reason="pyarrow is not installed")
+
+
+@pytest.fixture
+def frame() -> pd.DataFrame:
+    """A prepared frame mixing categorical, decoded JSON, mixed, and plain columns."""
+    df = pd.DataFrame({
+        "CreationDate": pd.to_datetime(["2024-01-01 10:00", "2024-01-01 11:30", "2024-01-02 9:00"]),
+        "Operation": ["FileAccessed", "FileDeleted", "FileAccessed"],
+        "UserId": ["a@contoso.com", "b@contoso.com", None],
+        "SourceFileName": ["report.xlsx", "", "notes.txt"],
+        "AppAccessContext": [{"ClientAppId": "1"}, {}, {"AADSessionId": "x", "Nested": [1, 2]}],
+        "Mixed": ["plain text", {"key": "value"}, None],
+        "Numbers": [1, 2, 3],
+        "IsManagedDevice": [True, False, True],
+        "AuditData": [{"Id": "1", "Operation": "FileAccessed"}, '{"Id": "2"}', {"Id": "3"}],
+    })
+    return categorize(df)
+
+
+def test_round_trip_restores_values(tmp_path: Path, frame: pd.DataFrame) -> None:
+    """Every column comes back with its values, categoricals and JSON included."""
+    cache = FrameCache(tmp_path, 1024 * 1024)
+    cache.store("key", frame, {"source_columns": ["RecordId", "AuditData"]})
+    assert "key" in cache
+
+    loaded = cache.load("key")
+    assert loaded is not None
+    df, metadata = loaded
+    assert metadata == {"source_columns": ["RecordId", "AuditData"]}
+    assert list(df.columns) == list(frame.columns)
+
+    for column in ("Operation", "UserId"):
+        assert isinstance(df[column].dtype, pd.CategoricalDtype)
+        assert df[column].astype(object).where(df[column].notna(), None).tolist() == (
+            frame[column].astype(object).where(frame[column].notna(), None).tolist()
+        )
+    for column in ("SourceFileName", "AppAccessContext", "Mixed", "Numbers", "IsManagedDevice"):
+        assert df[column].tolist() == frame[column].tolist()
+    assert df["CreationDate"].tolist() == frame["CreationDate"].tolist()
+
+    # AuditData stays as JSON text until an analyzer decodes it
+    assert all(isinstance(value, str) for value in df["AuditData"])
+    assert [parse_audit_record(v) for v in df["AuditData"]] == [
+        parse_audit_record(v) for v in frame["AuditData"]
+    ]
+
+
+def test_strings_that_look_like_json_stay_strings(tmp_path: Path) -> None:
+    """Text in a mixed column isn't mistaken for encoded JSON when the frame is loaded."""
+    frame = pd.DataFrame({"Mixed": ['{"a": 1}', "[1, 2]", "null", {"a": 1}]})
+    cache = FrameCache(tmp_path, 1024 * 1024)
+    cache.store("key", frame)
+    loaded = cache.load("key")
+    assert loaded is not None
+    assert loaded[0]["Mixed"].tolist() == frame["Mixed"].tolist()
+
+
+def test_unreadable_entry_is_a_miss(tmp_path: Path, frame: pd.DataFrame) -> None:
+    """A corrupt entry is ignored and removed rather than raising."""
+    cache = FrameCache(tmp_path, 1024 * 1024)
+    cache.store("key", frame)
+    (tmp_path / "key.parquet").write_bytes(b"not parquet")
+    assert cache.load("key") is None
+    assert "key" not in cache
+
+
+def test_keys_follow_file_contents(tmp_path: Path) -> None:
+    """Copies of a file share a key, while edited contents or variants get a new one."""
+    first, copy, edited = (tmp_path / name for name in ("a.csv", "b.csv", "c.csv"))
+    first.write_bytes(b"RecordId\n1\n")
+    copy.write_bytes(b"RecordId\n1\n")
+    edited.write_bytes(b"RecordId\n2\n")
+    assert FrameCache.key_for(first) == FrameCache.key_for(copy)
+    assert FrameCache.key_for(first) != FrameCache.key_for(edited)
+    assert FrameCache.key_for(first) != FrameCache.key_for(first, "web")
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path: Path, frame: pd.DataFrame) -> None:
+    """Storing past the size limit drops the oldest entries first."""
+    cache = FrameCache(tmp_path, 1024 * 1024)
+    cache.store("old", frame)
+    entry_size = (tmp_path / "old.parquet").stat().st_size
+    cache.max_bytes = entry_size * 2
+
+    cache.store("middle", frame)
+    cache.store("new", frame)
+    assert "old" not in cache
+    assert "middle" in cache
+    assert "new" in cache
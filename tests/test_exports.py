@@ -0,0 +1,254 @@
+"""Streamed event exports against the events the analysis filters select."""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import random
+from typing import TYPE_CHECKING, Any
+
+import pandas as pd
+import pytest
+
+from purrrr.ingest import read_audit_log
+from purrrr.web import EXPORT_CHUNK_ROWS, export_chunks, frame_chunks
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+    from flask.testing import FlaskClient
+
+USERS = [f"user{i}@contoso.com" for i in range(8)]
+IPS = ["10.0.0.1", "10.0.0.2", "10.0.1.9", "2001:db8::1"]
+EXCHANGE_OPERATIONS = ["MailItemsAccessed", "Send", "HardDelete", "New-InboxRule", "Update"]
+
+
+def audit_record(rng: random.Random, number: int) -> dict[str, Any]:
+    """Build the AuditData of one SharePoint or Exchange event."""
+    user = rng.choice(USERS)
+    day, hour, minute = rng.randint(1, 9), rng.randint(0, 23), rng.randint(0, 59)
+    timestamp = f"2024-03-{day:02d}T{hour:02d}:{minute:02d}:00"
+    if rng.random() < 0.4:
+        name = f"doc{rng.randrange(50)}.docx"
+        return {
+            "CreationTime": timestamp,
+            "Operation": rng.choice(["FileAccessed", "FileDownloaded", "FileDeleted"]),
+            "UserId": user,
+            "Workload": "SharePoint",
+            "ClientIP": rng.choice(IPS),
+            "ObjectId": f"https://contoso.sharepoint.com/sites/Team/Shared Documents/{name}",
+            "SourceFileName": name,
+        }
+
+    operation = rng.choice(EXCHANGE_OPERATIONS)
+    record = {
+        "CreationTime": timestamp,
+        "Operation": operation,
+        "UserId": user,
+        "MailboxOwnerUPN": user,
+        "Workload": "Exchange",
+        "ClientIPAddress": rng.choice(IPS),
+        "ClientInfoString": rng.choice(["Client=OWA;Mozilla", "Client=REST"]),
+    }
+    if operation == "MailItemsAccessed":
+        items = [
+            {"Subject": f"subject {i}", "SizeInBytes": 100 * i, "InternetMessageId": f"<m{i}@x>"}
+            for i in range(rng.randrange(4))
+        ]
+        record["Folders"] = [{"Path": "\\Inbox", "FolderItems": items}]
+    elif operation == "New-InboxRule":
+        record["Parameters"] = [{"Name": "Name", "Value": "rule"}, {"Name": "From", "Value": "x@y"}]
+    elif operation in {"Send", "Update"}:
+        record["Item"] = {
+            "Subject": f"hello {number}",
+            "ParentFolder": {"Path": "\\Sent Items"},
+            "SizeInBytes": 1234,
+            "InternetMessageId": f"<id{number % 7}@x>",
+        }
+    else:
+        record["AffectedItems"] = [
+            {"Subject": f"deleted {number}", "ParentFolder": {"Path": "\\Inbox"}}
+        ]
+    return record
+
+
+def write_log(path: Path, size: int, seed: int) -> Path:
+    """Write an audit log export of `size` random events."""
+    rng = random.Random(seed)
+    with path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(
+            ["RecordId", "CreationDate", "RecordType", "Operation", "UserId", "AuditData"]
+        )
+        for number in range(size):
+            record = audit_record(rng, number)
+            writer.writerow([
+                f"{seed}-{number}",
+                record["CreationTime"],
+                1,
+                record["Operation"],
+                record["UserId"],
+                json.dumps(record),
+            ])
+    return path
+
+
+@pytest.fixture(scope="module")
+def flask_app():
+    """The web application, imported only by the tests that need it."""
+    from purrrr import flask_app
+
+    return flask_app
+
+
+@pytest.fixture(scope="module")
+def session_id(flask_app, tmp_path_factory: pytest.TempPathFactory) -> Iterator[str]:
+    """A session of two uploaded files, the first spanning several export chunks."""
+    directory = tmp_path_factory.mktemp("logs")
+    first = read_audit_log(write_log(directory / "first.csv", EXPORT_CHUNK_ROWS + 700, seed=1))
+    second = read_audit_log(write_log(directory / "second.csv", 900, seed=2))
+
+    session = flask_app.AnalysisSession(first)
+    session.append(second)
+    flask_app.sessions["export-test"] = session
+    yield "export-test"
+    del flask_app.sessions["export-test"]
+
+
+@pytest.fixture
+def client(flask_app) -> FlaskClient:
+    """A test client of the web application."""
+    return flask_app.app.test_client()
+
+
+FILTERS = [
+    {},
+    {"user": "user1"},
+    {"actions": "Send, FileAccessed"},
+    {"actions": ["MailItemsAccessed", "FileDeleted"], "ips": "10.0.0.*"},
+    {"files": "doc1", "start_date": "2024-03-02", "end_date": "2024-03-04"},
+]
+
+
+def test_frame_chunks_take_the_given_rows() -> None:
+    """Chunks cover exactly the selected rows, in order and at most `size` at a time."""
+    df = pd.DataFrame({"n": range(10)})
+    chunks = list(frame_chunks(df, pd.Index([1, 2, 5, 7, 9]).to_numpy(), size=2))
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert pd.concat(chunks)["n"].tolist() == [1, 2, 5, 7, 9]
+    assert pd.concat(frame_chunks(df, size=3))["n"].tolist() == list(range(10))
+
+
+def test_csv_chunks_share_columns() -> None:
+    """Chunks with different columns make one CSV, with records written as JSON text."""
+    chunks = [
+        pd.DataFrame({"a": [1], "AuditData": [{"k": "v"}]}),
+        pd.DataFrame({"b": ["x"], "a": [2]}),
+    ]
+    text = b"".join(export_chunks(chunks, "csv", ["a", "b", "AuditData"])).decode()
+    assert text.splitlines() == ["a,b,AuditData", '1,,"{""k"":""v""}"', "2,x,"]
+    with pytest.raises(ValueError, match="Unknown export format"):
+        list(export_chunks(chunks, "xml", ["a"]))
+
+
+@pytest.mark.parametrize("params", FILTERS)
+def test_ndjson_export_matches_filtered_events(
+    flask_app, client: FlaskClient, session_id: str, params: dict[str, Any]
+) -> None:
+    """Each exported line is one of the filtered events, in session order."""
+    response = client.post(f"/api/export/{session_id}", json=params)
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+
+    expected = flask_app.sessions[session_id].filtered(params)
+    records = [json.loads(line) for line in response.data.splitlines()]
+    assert [record["RecordId"] for record in records] == expected["RecordId"].tolist()
+    assert [record["AuditData"] for record in records] == expected["AuditData"].tolist()
+
+
+@pytest.mark.parametrize("params", FILTERS)
+def test_csv_export_matches_filtered_events(
+    flask_app, client: FlaskClient, session_id: str, params: dict[str, Any]
+) -> None:
+    """The CSV export holds the requested columns of the filtered events."""
+    query = {**params, "format": "csv", "columns": "RecordId,UserId,AuditData,NoSuchColumn"}
+    if isinstance(query.get("actions"), list):
+        query["actions"] = ",".join(query["actions"])
+    response = client.get(f"/api/export/{session_id}", query_string=query)
+    assert response.status_code == 200
+
+    exported = pd.read_csv(io.BytesIO(response.data), dtype=str, keep_default_na=False)
+    expected = flask_app.sessions[session_id].filtered(params)
+    assert list(exported.columns) == ["RecordId", "UserId", "AuditData"]
+    assert exported["RecordId"].tolist() == expected["RecordId"].tolist()
+    assert exported["UserId"].tolist() == expected["UserId"].astype(str).tolist()
+    assert [json.loads(value) for value in exported["AuditData"]] == expected["AuditData"].tolist()
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"format": "xml"},
+        {"user": "("},
+        {"files": ["doc"]},
+        {"actions": [1]},
+        {"start_date": "2024-03-01", "end_date": "soon"},
+        {"columns": 3},
+    ],
+)
+def test_bad_requests_fail_before_streaming(
+    client: FlaskClient, session_id: str, params: dict[str, Any]
+) -> None:
+    """Invalid formats and filters get a 400 rather than a truncated download."""
+    response = client.post(f"/api/export/{session_id}", json=params)
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+
+def test_unknown_session(client: FlaskClient) -> None:
+    """Exporting a session that doesn't exist is a 404."""
+    assert client.get("/api/export/no-such-session").status_code == 404
+
+
+@pytest.mark.parametrize("params", FILTERS)
+def test_exchange_export_matches_command_line_csv(
+    flask_app,
+    client: FlaskClient,
+    session_id: str,
+    params: dict[str, Any],
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """The streamed Exchange CSV is the one the command line writes for the same events."""
+    from purrrr.exchange import ExchangeOperations
+    from purrrr.tools import OutputFormatter
+
+    # Small chunks, so events and rows are streamed across several of each
+    monkeypatch.setattr("purrrr.web.exports.EXPORT_CHUNK_ROWS", 500)
+    monkeypatch.setattr("purrrr.exchange.exchange_ops.EXCHANGE_CSV_CHUNK_ROWS", 700)
+
+    response = client.post(f"/api/export/{session_id}/exchange", json=params)
+    assert response.status_code == 200
+    assert response.mimetype == "text/csv"
+
+    session = flask_app.sessions[session_id]
+    events = session.filtered(params)
+    events = events.assign(CreationDate=pd.to_datetime(events["CreationDate"]))
+    formatter = OutputFormatter(session.config, flask_app.logger)
+    exchange = ExchangeOperations(session.config, formatter, flask_app.logger)
+    expected = tmp_path / "exchange.csv"
+    exchange.generate_exchange_activity_csv(exchange.process_exchange_events(events), str(expected))
+
+    exported = pd.read_csv(io.BytesIO(response.data), dtype=str, keep_default_na=False)
+    if expected.exists():
+        assert exported.equals(pd.read_csv(expected, dtype=str, keep_default_na=False))
+    else:
+        assert exported.empty
+
+
+def test_exchange_export_rejects_bad_filters(client: FlaskClient, session_id: str) -> None:
+    """Invalid filters get a 400 before any of the Exchange CSV is sent."""
+    response = client.post(f"/api/export/{session_id}/exchange", json={"user": "[a-"})
+    assert response.status_code == 400
@@ -0,0 +1,148 @@
+"""Inverted-index analysis filters against the column scans they replaced."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from purrrr.ingest import categorize
+from purrrr.network import IPFilter
+from purrrr.web import AnalysisSession, FilterIndex, check_filters, filter_rows
+
+OPERATIONS = [
+    "FileAccessed",
+    "FileDownloaded",
+    "FileDeleted",
+    "FileUploaded",
+    "Send",
+    "Set-Mailbox",
+]
+
+
+def make_events(size: int = 3000, seed: int = 7) -> pd.DataFrame:
+    """Build events with enough distinct users to exercise both ways of selecting rows."""
+    rng = np.random.default_rng(seed)
+    users = np.array([f"user{i}@contoso.com" for i in range(400)] + [None], dtype=object)
+    files = np.array(["report.xlsx", "Notes.TXT", "budget 2024.xlsx", "", None], dtype=object)
+    ips = np.array(
+        ["10.0.0.1", "10.0.0.2", "10.0.1.5", "192.168.1.20", "2001:db8::7", "bad", None],
+        dtype=object,
+    )
+    start = pd.Timestamp("2024-03-01")
+    return categorize(
+        pd.DataFrame({
+            "CreationDate": start + pd.to_timedelta(rng.integers(0, 10 * 86400, size), unit="s"),
+            "Operation": rng.choice(OPERATIONS, size),
+            "UserId": rng.choice(users, size),
+            "SourceFileName": rng.choice(files, size),
+            "ClientIP": rng.choice(ips, size),
+        })
+    )
+
+
+def baseline_filter(df: pd.DataFrame, params: dict[str, Any]) -> pd.DataFrame:
+    """Filter events by scanning their columns, as the analyses did before the indexes.
+
+    The end date is included in full, as the index-based filters intentionally do.
+    """
+    if params.get("user"):
+        df = df[df["UserId"].astype(object).str.contains(params["user"], case=False, na=False)]
+    if params.get("actions"):
+        actions = params["actions"]
+        if isinstance(actions, str):
+            actions = [a.strip() for a in actions.split(",")]
+        df = df[df["Operation"].isin(actions)]
+    if params.get("files"):
+        names = df["SourceFileName"].astype(object)
+        df = df[names.str.contains(params["files"], case=False, na=False)]
+    df = IPFilter.from_patterns(params.get("ips"), params.get("exclude_ips")).apply(df)
+    if params.get("start_date") and params.get("end_date"):
+        start = pd.Timestamp(params["start_date"]).normalize()
+        end = pd.Timestamp(params["end_date"]).normalize() + pd.Timedelta(days=1)
+        df = df[(df["CreationDate"] >= start) & (df["CreationDate"] < end)]
+    return df
+
+
+PARAMS = [
+    {},
+    {"user": "user1"},
+    {"user": "USER3"},
+    {"user": "@contoso"},
+    {"user": r"user1\d@"},
+    {"actions": "FileAccessed, FileDeleted"},
+    {"actions": ["Send", "Set-Mailbox"]},
+    {"actions": "NoSuchOperation"},
+    {"files": "xlsx"},
+    {"files": "notes"},
+    {"ips": "10.0.0.*"},
+    {"ips": "10.0.0.0/23", "exclude_ips": "10.0.0.2"},
+    {"exclude_ips": "10.*"},
+    {"ips": "*"},
+    {"start_date": "2024-03-03", "end_date": "2024-03-05"},
+    {"start_date": "2024-03-03", "end_date": ""},
+    {
+        "user": "user2",
+        "actions": "FileAccessed,FileDownloaded",
+        "files": "report",
+        "ips": "10.*",
+        "start_date": "2024-03-02",
+        "end_date": "2024-03-08",
+    },
+]
+
+
+@pytest.mark.parametrize("params", PARAMS)
+def test_index_rows_match_column_scans(params: dict[str, Any]) -> None:
+    """The indexes select exactly the rows the column scans kept, in order."""
+    df = make_events()
+    session = AnalysisSession(df)
+    rows = filter_rows(session.segments[0], params)
+    expected = baseline_filter(df, params).index.to_numpy()
+    assert np.array_equal(np.arange(len(df)) if rows is None else rows, expected)
+
+
+@pytest.mark.parametrize("params", PARAMS)
+def test_segments_filter_like_one_frame(params: dict[str, Any]) -> None:
+    """Filtering a session's segments one by one gives the events of the whole log filtered."""
+    first, second = make_events(seed=1), make_events(1500, seed=2)
+    session = AnalysisSession(first)
+    session.append(second)
+
+    combined = pd.concat([first, second], ignore_index=True)
+    expected = baseline_filter(combined, params)
+    filtered = session.filtered(params)
+    assert len(filtered) == len(expected)
+    assert filtered["CreationDate"].tolist() == expected["CreationDate"].tolist()
+    assert filtered["UserId"].astype(object).tolist() == expected["UserId"].astype(object).tolist()
+
+
+def test_missing_columns_are_ignored() -> None:
+    """Filters on columns a log doesn't have leave its events alone."""
+    df = pd.DataFrame({"Operation": ["Send", "FileAccessed"]})
+    index = FilterIndex(df)
+    assert index.rows(user="someone", files="x", ip_filter=IPFilter.from_patterns("10.*")) is None
+    assert index.rows(actions=["Send"]).tolist() == [0]
+
+
+@pytest.mark.parametrize(
+    ("params", "message"),
+    [
+        ({"user": "("}, "Invalid pattern"),
+        ({"files": 3}, "must be a string"),
+        ({"actions": [1, 2]}, "list of strings"),
+        ({"start_date": "2024-01-01", "end_date": "someday"}, "Invalid date"),
+    ],
+)
+def test_check_filters_rejects_bad_input(params: dict[str, Any], message: str) -> None:
+    """Malformed filters are reported up front instead of failing part way through."""
+    with pytest.raises(ValueError, match=message):
+        check_filters(params)
+
+
+def test_check_filters_accepts_valid_input() -> None:
+    """Every filter in its accepted forms passes the check."""
+    for params in PARAMS:
+        check_filters(params)
@@ -0,0 +1,121 @@
+"""Compiled IP filters against the shell-style matching they replaced."""
+
+from __future__ import annotations
+
+import fnmatch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from purrrr.network import IPFilter
+
+IPS = [
+    "10.0.0.1",
+    "10.0.0.255",
+    "10.0.1.7",
+    "10.20.3.4",
+    "10.200.3.4",
+    "192.168.1.10",
+    "172.16.5.5",
+    "2001:db8::1",
+    "2001:db8:1::42",
+    "fe80::1",
+    "not-an-ip",
+    None,
+]
+
+
+def baseline_mask(ips: list[object], include: list[str], exclude: list[str]) -> list[bool]:
+    """Filter IPs the way the shell-style patterns did, matching each value's text."""
+    return [
+        (not include or any(fnmatch.fnmatch(str(ip), p) for p in include))
+        and not any(fnmatch.fnmatch(str(ip), p) for p in exclude)
+        for ip in ips
+    ]
+
+
+@pytest.mark.parametrize(
+    ("include", "exclude"),
+    [
+        (["10.0.0.1"], []),
+        (["10.0.*"], []),
+        (["10.20.*"], []),
+        (["10.*", "192.168.1.*"], ["10.0.0.*"]),
+        (["*"], []),
+        ([], ["10.*"]),
+        (["10.*.3.4"], []),
+        (["2001:db8::1"], []),
+        (["2001:db8:*"], ["*::42"]),
+        (["not-*"], []),
+    ],
+)
+def test_patterns_match_like_fnmatch(include: list[str], exclude: list[str]) -> None:
+    """Wildcards and exact addresses select the same IPs as fnmatch, missing ones included."""
+    ip_filter = IPFilter.from_patterns(include, exclude)
+    ips = pd.Series(IPS, dtype=object)
+    assert ip_filter.mask(ips).tolist() == baseline_mask(IPS, include, exclude)
+
+
+def test_patterns_can_be_comma_separated() -> None:
+    """A comma-separated string compiles to the same filter as a list."""
+    ips = pd.Series(IPS, dtype=object)
+    from_string = IPFilter.from_patterns("10.0.*, 192.168.1.10", "10.0.0.255")
+    from_list = IPFilter.from_patterns(["10.0.*", "192.168.1.10"], ["10.0.0.255"])
+    assert np.array_equal(from_string.mask(ips), from_list.mask(ips))
+
+
+def test_cidr_blocks() -> None:
+    """IPv4 and IPv6 CIDR blocks match the addresses inside them only."""
+    ip_filter = IPFilter.from_patterns(["10.0.0.0/24", "2001:db8::/48"])
+    assert ip_filter.mask(IPS).tolist() == [
+        True, True, False, False, False, False, False, True, False, False, False, False
+    ]
+    exclude = IPFilter.from_patterns(exclude=["172.16.0.0/12"])
+    assert exclude.mask(["172.31.0.1", "172.32.0.1"]).tolist() == [False, True]
+
+
+def test_overlapping_ranges_are_merged() -> None:
+    """Overlapping and nested patterns behave as their union, kept as disjoint ranges."""
+    ip_filter = IPFilter.from_patterns(["10.0.0.0/16", "10.0.1.*", "10.0.255.255", "10.1.0.0/16"])
+    assert ip_filter.include is not None
+    assert len(ip_filter.include.starts) == 2
+    assert ip_filter.mask(["10.0.3.3", "10.1.255.1", "10.2.0.0", "9.255.255.255"]).tolist() == [
+        True,
+        True,
+        False,
+        False,
+    ]
+
+
+def test_ipv6_addresses_are_compared_as_addresses() -> None:
+    """Differently written forms of the same IPv6 address match each other."""
+    ip_filter = IPFilter.from_patterns(["2001:0DB8:0000::1"])
+    assert ip_filter.mask(["2001:db8::1", "2001:db8::2"]).tolist() == [True, False]
+
+
+def test_ports_and_brackets_are_ignored() -> None:
+    """Addresses logged with a port or in brackets match as the address alone."""
+    ip_filter = IPFilter.from_patterns(["10.0.0.0/24", "2001:db8::1"])
+    ips = ["10.0.0.9:443", "10.0.1.9:443", "[2001:db8::1]:5000", "[2001:db8::1]", "[fe80::1]:80"]
+    assert ip_filter.mask(ips).tolist() == [True, False, True, True, False]
+
+
+def test_missing_ips() -> None:
+    """Missing IPs are matched as the text 'nan', so only catch-all patterns select them."""
+    ips = pd.Series([None, np.nan, "10.0.0.1"], dtype=object)
+    assert IPFilter.from_patterns(["*"]).mask(ips).tolist() == [True, True, True]
+    assert IPFilter.from_patterns(["10.*"]).mask(ips).tolist() == [False, False, True]
+    assert IPFilter.from_patterns(exclude=["10.*"]).mask(ips).tolist() == [True, True, False]
+
+
+def test_empty_filter_keeps_everything() -> None:
+    """A filter without patterns is falsy and leaves frames untouched."""
+    ip_filter = IPFilter.from_patterns("", [" "])
+    df = pd.DataFrame({"ClientIP": IPS})
+    assert not ip_filter
+    assert ip_filter.apply(df) is df
+    assert IPFilter.from_patterns("10.0.0.*").apply(df)["ClientIP"].tolist() == [
+        "10.0.0.1",
+        "10.0.0.255",
+    ]
@@ -0,0 +1,100 @@
+"""Vectorized path cleaning against the original row-by-row implementation."""
+
+from __future__ import annotations
+
+import re
+
+import pandas as pd
+import pytest
+
+from purrrr import main
+
+OBJECT_IDS = [
+    "https://contoso.sharepoint.com/sites/Finance/Shared Documents/Q1/report.xlsx",
+    "https://contoso.sharepoint.com/sites/Finance/Shared Documents/Q1/report.xlsx",
+    "https://contoso.sharepoint.com//sites//HR///policies/handbook.pdf",
+    "https://contoso.sharepoint.com/https://contoso.sharepoint.com/sites/Ops/plan.docx",
+    "https://fabrikam.sharepoint.com/sites/Legal/contract.pdf",
+    "https://contoso-my.sharepoint.com/personal/jane_doe_contoso_com/Documents/notes.txt",
+    "https://contoso-my.sharepoint.com/personal/john_smith_fabrikam_com/Documents/a.txt",
+    "https://contoso-my.sharepoint.com/personal/admin",
+    "https://contoso.sharepoint.com/sites/Finance/Shared Documents/Q1/",
+    "",
+]
+FILENAMES = [
+    "report.xlsx",
+    "other.xlsx",
+    "handbook.pdf",
+    "plan.docx",
+    "contract.pdf",
+    "notes.txt",
+    "",
+    "",
+    "report.xlsx",
+    "orphan.txt",
+]
+
+
+def baseline_clean_path(row: pd.Series) -> str:
+    """Clean one row's path the way the original per-row implementation did."""
+    if not (object_id := row.get("ObjectId", "")):
+        return ""
+
+    config = main.config
+    if "-my.sharepoint.com/personal/" in object_id:
+        user_and_path = object_id.split("/personal/")[1].split("/", 1)
+        username = user_and_path[0]
+        if "_" in username and config.email_domain:
+            domain_with_underscores = config.email_domain.replace(".", "_")
+            if username.endswith(domain_with_underscores):
+                username = username[: -len(domain_with_underscores) - 1] + "@" + config.email_domain
+        if len(user_and_path) > 1:
+            return f"OneDrive ≫ {username}/{user_and_path[1]}"
+        return f"OneDrive ≫ {username}"
+
+    path = object_id
+    if config.sharepoint_domains:
+        for domain in config.sharepoint_domains:
+            while domain in path:
+                path = path.replace(domain, "/", 1)
+    else:
+        path = re.sub(r"https?://[^/]+\.sharepoint\.com/", "/", path)
+
+    while "//" in path:
+        path = path.replace("//", "/")
+    path = path.lstrip("/")
+
+    filename = row.get("SourceFileName", "")
+    if filename and path.endswith(filename):
+        path = path[: -len(filename)].rstrip("/")
+    return path
+
+
+@pytest.mark.parametrize(
+    ("sharepoint_domains", "email_domain"),
+    [
+        (None, None),
+        (["https://contoso.sharepoint.com/"], "contoso.com"),
+        (["https://contoso.sharepoint.com/", "https://fabrikam.sharepoint.com/"], "fabrikam.com"),
+    ],
+)
+def test_clean_paths_match_row_by_row(
+    monkeypatch: pytest.MonkeyPatch, sharepoint_domains: list[str] | None, email_domain: str | None
+) -> None:
+    """Every row gets the same clean path as the per-row implementation gave it."""
+    monkeypatch.setattr(main.config, "sharepoint_domains", sharepoint_domains)
+    monkeypatch.setattr(main.config, "email_domain", email_domain)
+    df = pd.DataFrame({"ObjectId": OBJECT_IDS, "SourceFileName": FILENAMES})
+
+    expected = df.apply(baseline_clean_path, axis=1).tolist()
+    assert main.clean_paths(df["ObjectId"], df["SourceFileName"]).tolist() == expected
+    assert main.extract_path_information(df.copy())["CleanPath"].astype(str).tolist() == expected
+
+
+def test_extract_path_information_treats_missing_values_as_empty() -> None:
+    """Rows without an ObjectId get an empty path, and a missing file name is not stripped."""
+    df = pd.DataFrame({
+        "ObjectId": [None, "https://contoso.sharepoint.com/sites/A/b.txt"],
+        "SourceFileName": ["b.txt", None],
+    })
+    assert main.extract_path_information(df)["CleanPath"].tolist() == ["", "sites/A/b.txt"]
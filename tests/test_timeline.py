@@ -0,0 +1,149 @@
+"""Server-side timeline ordering, paging, and filtering against plain Python."""
+
+from __future__ import annotations
+
+import random
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from purrrr.network import IPFilter
+from purrrr.web import TIMELINE_FIELDS, Timeline
+
+
+def make_records(size: int = 400, seed: int = 3) -> list[dict[str, Any]]:
+    """Build timeline events with many ties, empty values, and unreadable timestamps."""
+    rng = random.Random(seed)
+    records = []
+    for row in range(size):
+        day, hour = rng.randrange(1, 6), rng.randrange(3)
+        records.append({
+            "row": row,
+            "timestamp": rng.choice([f"2024-03-0{day}T0{hour}:00:00", "", "not a date"]),
+            "operation": rng.choice(["MailItemsAccessed", "Send", "HardDelete", "New-InboxRule"]),
+            "subject": rng.choice(["Invoice", "invoice overdue", "Hello", ""]),
+            "folder": rng.choice(["\\Inbox", "\\Sent Items", "\\Archive\\Invoices", ""]),
+            "user": rng.choice(["a@contoso.com", "B@contoso.com", "c@contoso.com"]),
+            "Workload": rng.choice(["Exchange", "exchange", ""]),
+            "ClientIP": rng.choice(["10.0.0.1", "10.0.1.1", "192.168.0.4", ""]),
+        })
+    return records
+
+
+def sort_key(record: dict[str, Any], field: str) -> Any:
+    """Sort events as the timeline does, with unreadable timestamps first."""
+    if field != "timestamp":
+        return record[field]
+    parsed = pd.to_datetime(record["timestamp"], errors="coerce")
+    return pd.Timestamp.min if pd.isna(parsed) else parsed
+
+
+def matches(record: dict[str, Any], params: dict[str, Any]) -> bool:
+    """Check one event against the timeline filters, the way the browser used to."""
+    for field in ("operation", "user", "Workload"):
+        wanted = {value.lower() for value in params.get(field, [])}
+        if wanted and record[field].lower() not in wanted:
+            return False
+    text = params.get("text", "").lower()
+    if text and text not in record["subject"].lower() and text not in record["folder"].lower():
+        return False
+    if params.get("ips") and not IPFilter.from_patterns(params["ips"]).matches(
+        record["ClientIP"] or None
+    ):
+        return False
+    timestamp = pd.to_datetime(record["timestamp"], errors="coerce")
+    if params.get("start") and not timestamp >= pd.Timestamp(params["start"]):
+        return False
+    if params.get("end") and not timestamp < pd.Timestamp(params["end"]) + pd.Timedelta(days=1):
+        return False
+    return not ("rows" in params and record["row"] not in params["rows"])
+
+
+def test_descending_ties_keep_source_order() -> None:
+    """Events sharing a timestamp stay in source order in both directions."""
+    timeline = Timeline.from_records([
+        {"row": 0, "timestamp": "2024-03-01T10:00:00"},
+        {"row": 1, "timestamp": "2024-03-01T10:00:00"},
+        {"row": 2, "timestamp": "2024-03-02T10:00:00"},
+    ])
+    assert timeline.order(descending=True).tolist() == [2, 0, 1]
+    assert timeline.order().tolist() == [0, 1, 2]
+
+
+@pytest.mark.parametrize("descending", [False, True])
+@pytest.mark.parametrize("field", TIMELINE_FIELDS)
+def test_order_matches_stable_sort(field: str, descending: bool) -> None:
+    """Every sort key orders events as Python's stable sort does, in either direction."""
+    records = make_records()
+    expected = sorted(
+        range(len(records)), key=lambda i: sort_key(records[i], field), reverse=descending
+    )
+    timeline = Timeline.from_records(records)
+    assert timeline.order(field, descending).tolist() == expected
+
+
+def test_unknown_sort_key_is_rejected() -> None:
+    """Sorting by a field events don't have raises instead of returning them unordered."""
+    with pytest.raises(ValueError, match="Unknown sort key"):
+        Timeline.from_records(make_records(5)).order("AuditData")
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {},
+        {"operation": ["send", "HardDelete"]},
+        {"user": ["b@contoso.com"], "Workload": ["EXCHANGE"]},
+        {"text": "invoice"},
+        {"ips": "10.0.*"},
+        {"start": "2024-03-02", "end": "2024-03-03"},
+        {"end": "2024-03-01"},
+        {"rows": {1, 5, 8, 13, 21, 34, 55, 89, 144, 233, 377}},
+        {"operation": ["Send"], "text": "inbox", "ips": "10.0.0.1", "start": "2024-03-02"},
+    ],
+)
+def test_mask_matches_per_event_filters(params: dict[str, Any]) -> None:
+    """Filters keep exactly the events that pass them one by one."""
+    records = make_records()
+    timeline = Timeline.from_records(records)
+    mask = timeline.mask(
+        facets={field: params.get(field, []) for field in ("operation", "user", "Workload")},
+        text=params.get("text", ""),
+        ip_filter=IPFilter.from_patterns(params.get("ips")),
+        start=params.get("start", ""),
+        end=params.get("end", ""),
+        rows=np.array(sorted(params["rows"])) if "rows" in params else None,
+    )
+    expected = [matches(record, params) for record in records]
+    assert (mask is None and all(expected)) or mask.tolist() == expected
+
+
+@pytest.mark.parametrize(("offset", "limit"), [(0, 50), (40, 25), (390, 50), (0, None), (500, 10)])
+def test_pages_slice_the_filtered_order(offset: int, limit: int | None) -> None:
+    """Pages are consecutive slices of the sorted events that match, with the total count."""
+    records = make_records()
+    timeline = Timeline.from_records(records)
+    mask = timeline.mask(facets={"operation": ["Send", "HardDelete"]})
+    kept = [i for i in timeline.order("subject", descending=True) if mask[i]]
+
+    page, total = timeline.page(offset, limit, sort="subject", descending=True, mask=mask)
+    stop = None if limit is None else offset + limit
+    assert total == len(kept)
+    assert page["row"].tolist() == kept[offset:stop]
+
+
+def test_concat_offsets_source_rows() -> None:
+    """Combined segment timelines point at rows of the whole dataset and sort as one."""
+    first, second = make_records(30, seed=1), make_records(20, seed=2)
+    combined = Timeline.concat(
+        [(Timeline.from_records(first), 0), (Timeline.from_records(second), 100)]
+    )
+    shifted = first + [{**record, "row": record["row"] + 100} for record in second]
+
+    assert combined.events["row"].tolist() == [record["row"] for record in shifted]
+    expected = sorted(
+        range(len(shifted)), key=lambda i: sort_key(shifted[i], "timestamp"), reverse=True
+    )
+    assert combined.order(descending=True).tolist() == expected
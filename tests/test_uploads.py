@@ -0,0 +1,124 @@
+"""Multipart uploads read as they arrive and parsed from a growing spool."""
+
+from __future__ import annotations
+
+import io
+import threading
+import time
+from typing import TYPE_CHECKING
+
+import pytest
+from werkzeug.datastructures import FileStorage
+from werkzeug.test import encode_multipart
+
+from purrrr.ingest import MultipartStream, UploadSpool, read_audit_log
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+LOG = b"RecordId,Operation\r\n" + b"".join(b"%d,FileAccessed\r\n" % i for i in range(20_000))
+
+
+class SlowStream(io.RawIOBase):
+    """A request body arriving a little at a time, optionally failing part way through."""
+
+    def __init__(self, data: bytes, block: int = 4096, fail_at: int | None = None) -> None:
+        super().__init__()
+        self._data = data
+        self._block = block
+        self._fail_at = fail_at
+        self._offset = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: bytearray | memoryview) -> int:
+        if self._fail_at is not None and self._offset >= self._fail_at:
+            msg = "Client disconnected"
+            raise OSError(msg)
+        time.sleep(0.0005)
+        size = min(len(buffer), self._block, len(self._data) - self._offset)
+        buffer[:size] = self._data[self._offset : self._offset + size]
+        self._offset += size
+        return size
+
+
+def test_parts_match_form_fields() -> None:
+    """Each part of a multipart body is read back with its name, file name, and data."""
+    boundary, body = encode_multipart({
+        "file": FileStorage(io.BytesIO(LOG), "log.csv"),
+        "user_map_file": FileStorage(io.BytesIO(b"upn,name\r\na@b,A\r\n"), "map.csv"),
+        "note": "hello",
+    })
+    parts = [
+        (part.name, part.filename, part.read())
+        for part in MultipartStream(SlowStream(body), boundary.encode()).parts()
+    ]
+    assert parts == [
+        ("file", "log.csv", LOG),
+        ("user_map_file", "map.csv", b"upn,name\r\na@b,A\r\n"),
+        ("note", None, b"hello"),
+    ]
+
+
+def test_unread_parts_are_skipped() -> None:
+    """Parts the caller doesn't read are drained, so the next part still starts cleanly."""
+    boundary, body = encode_multipart({
+        "file": FileStorage(io.BytesIO(LOG), "log.csv"),
+        "note": "hi",
+    })
+    parts = MultipartStream(io.BytesIO(body), boundary.encode()).parts()
+    next(parts).read(10)
+    assert next(parts).read() == b"hi"
+
+
+def test_spool_is_parsed_while_it_is_written(tmp_path: Path) -> None:
+    """Parsing starts before the upload has finished arriving and reads all of it."""
+    spool = UploadSpool(tmp_path / "log.csv", expected_bytes=len(LOG))
+    writer = threading.Thread(target=spool.fill, args=(SlowStream(LOG),))
+    writer.start()
+
+    totals = []
+
+    def progress(_: int) -> None:
+        totals.append(spool.total_bytes)
+
+    with spool.open() as raw:
+        df = read_audit_log(raw, chunk_size=2000, progress=progress)
+    writer.join()
+
+    assert len(df) == 20_000
+    assert df["RecordId"].tolist() == list(range(20_000))
+    assert spool.bytes_read == spool.total_bytes == len(LOG)
+    assert totals[0] == len(LOG)  # Expected size reported before the upload was complete
+
+
+def test_spool_is_unlinked_unless_kept(tmp_path: Path) -> None:
+    """Temporary spools leave no file behind, while kept ones keep the upload."""
+    UploadSpool(tmp_path / "temporary.csv").fill(io.BytesIO(LOG))
+    kept = UploadSpool(tmp_path / "kept.csv", keep=True)
+    kept.fill(io.BytesIO(LOG))
+    assert [path.name for path in tmp_path.iterdir()] == ["kept.csv"]
+    assert (tmp_path / "kept.csv").read_bytes() == LOG
+
+
+def test_failed_upload_fails_the_parser(tmp_path: Path) -> None:
+    """A transfer that breaks off raises in the parser instead of leaving it waiting."""
+    spool = UploadSpool(tmp_path / "log.csv")
+
+    def fill() -> None:
+        with pytest.raises(OSError, match="Client disconnected"):
+            spool.fill(SlowStream(LOG, fail_at=len(LOG) // 2))
+
+    writer = threading.Thread(target=fill)
+    writer.start()
+    with pytest.raises(OSError, match="Upload failed: Client disconnected"), spool.open() as raw:
+        read_audit_log(raw, chunk_size=2000)
+    writer.join()
+
+
+def test_discarded_spool_reads_nothing(tmp_path: Path) -> None:
+    """A spool given up before parsing starts fails any read straight away."""
+    spool = UploadSpool(tmp_path / "log.csv")
+    spool.discard()
+    assert not list(tmp_path.iterdir())